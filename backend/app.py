@@ -5,6 +5,7 @@ Main Flask application entry point
 """
 
 import os
+import click
 from flask import Flask
 from app import create_app, db
 
@@ -21,6 +22,7 @@ def make_shell_context():
     from app.models.virtual_class import VirtualClass, ClassBooking
     from app.models.private_event import PrivateEventInquiry, EventPackage, EventTestimonial
     from app.models.location import Location, ContactInquiry
+    from app.models.tag import Tag
     
     return {
         'db': db,
@@ -38,15 +40,132 @@ def make_shell_context():
         'EventPackage': EventPackage,
         'EventTestimonial': EventTestimonial,
         'Location': Location,
-        'ContactInquiry': ContactInquiry
+        'ContactInquiry': ContactInquiry,
+        'Tag': Tag
     }
 
 @app.cli.command()
 def init_db():
     """Initialize the database with tables"""
+    from flask_migrate import stamp
+    from app.services import search
+    
     db.create_all()
+    # The tables now match the latest revision; later schema changes arrive via `flask db upgrade`
+    stamp()
+    search.rebuild()
     print("Database tables created successfully!")
 
+@app.cli.command()
+def reindex_search():
+    """Rebuild the cocktail and ingredient search indexes"""
+    from app.services import search
+    
+    search.rebuild()
+    print("Search indexes rebuilt successfully!")
+
+@app.cli.command()
+def recompute_ratings():
+    """Recompute the review aggregates stored on every cocktail"""
+    from app.services import ratings
+    
+    updated = ratings.recompute_all()
+    print(f"Rating aggregates recomputed for {updated} cocktails!")
+
+@app.cli.command()
+def recount_favorites():
+    """Recompute the favorite count stored on every cocktail"""
+    from app.services import favorites
+    
+    updated = favorites.recompute_all()
+    print(f"Favorite counts recomputed for {updated} cocktails!")
+
+@app.cli.command()
+def recount_bookings():
+    """Recompute the confirmed booking count stored on every virtual class"""
+    from app.services import bookings
+    
+    updated = bookings.recompute_all()
+    print(f"Confirmed bookings recounted for {updated} classes!")
+
+@app.cli.command()
+def sync_tags():
+    """Backfill the normalized cocktail tag tables from the JSON tag fields"""
+    from app.services import tags
+    
+    synced = tags.sync_all()
+    print(f"Tags synced for {synced} cocktails!")
+
+@app.cli.command()
+def recompute_nutrition():
+    """Recompute the per-serving nutrition stored on every cocktail"""
+    from app.services import nutrition
+    
+    updated = nutrition.recompute_all()
+    print(f"Nutrition recomputed for {updated} cocktails!")
+
+@app.cli.command()
+def rebuild_similarities():
+    """Recompute the similar-cocktail lists of every cocktail"""
+    from app.services import similarity
+    
+    rebuilt = similarity.rebuild()
+    print(f"Similar cocktails recomputed for {rebuilt} cocktails!")
+
+@app.cli.command()
+def sync_seasons():
+    """Backfill the ingredient and cocktail season masks from peak_season_months"""
+    from app.services import seasons
+    
+    ingredients, cocktails = seasons.sync_all()
+    print(f"Season masks synced for {ingredients} ingredients and {cocktails} cocktails!")
+
+@app.cli.command()
+@click.argument('email')
+def grant_admin(email):
+    """Give the user with EMAIL access to the admin routes"""
+    from app.models.user import User
+    
+    user = User.query.filter_by(email=email).first()
+    if user is None:
+        raise click.ClickException(f'No user with email {email}')
+    user.is_admin = True
+    db.session.commit()
+    print(f"{user.username} can now use the admin routes!")
+
+@app.cli.group()
+def catalog():
+    """Bulk import and export of ingredients, cocktails and event packages"""
+
+@catalog.command('import')
+@click.argument('kind', type=click.Choice(['ingredients', 'cocktails', 'packages']))
+@click.argument('source', type=click.File('r', encoding='utf-8'))
+@click.option('--format', 'fmt', type=click.Choice(['ndjson', 'csv']), help='Defaults to csv for .csv files, else ndjson')
+@click.option('--batch-size', default=1000, show_default=True, help='Records validated and written per batch')
+def import_catalog(kind, source, fmt, batch_size):
+    """Upsert records by slug from an NDJSON or CSV file ('-' for stdin)"""
+    from app.services import catalog_io
+    
+    fmt = fmt or catalog_io.infer_format(source.name)
+    result = catalog_io.import_records(kind, catalog_io.read_records(source, fmt), batch_size=batch_size)
+    for error in result.errors:
+        print(error)
+    print(f"Imported {kind}: {result.inserted} inserted, {result.updated} updated, {result.skipped} skipped!")
+
+@catalog.command('export')
+@click.argument('kind', type=click.Choice(['ingredients', 'cocktails', 'packages']))
+@click.option('-o', '--output', type=click.File('w', encoding='utf-8'), default='-', help='Output file (default stdout)')
+@click.option('--format', 'fmt', type=click.Choice(['ndjson', 'csv']), help='Defaults to csv for .csv files, else ndjson')
+@click.option('--batch-size', default=1000, show_default=True, help='Rows fetched per round trip')
+def export_catalog(kind, output, fmt, batch_size):
+    """Stream every record as NDJSON or CSV"""
+    from app.services import catalog_io
+    
+    fmt = fmt or catalog_io.infer_format(output.name)
+    written = catalog_io.write_records(output, kind, catalog_io.export_records(kind, batch_size=batch_size), fmt)
+    if output.name != '<stdout>':
+        print(f"Exported {written} {kind}!")
+
 @app.cli.command()
 def seed_db():
     """Seed the database with sample data"""
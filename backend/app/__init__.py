@@ -1,3 +1,4 @@
+import os
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
@@ -19,7 +20,7 @@ def create_app(config_name='default'):
     
     # Initialize extensions with app
     db.init_app(app)
-    migrate.init_app(app, db)
+    migrate.init_app(app, db, directory=os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations'))
     jwt.init_app(app)
     cors.init_app(app, resources={
         r"/api/*": {
@@ -46,6 +47,7 @@ def create_app(config_name='default'):
     from app.routes.subscriptions import subscriptions_ns
     from app.routes.classes import classes_ns
     from app.routes.users import users_ns
+    from app.routes.suggest import suggest_ns
     from app.routes.private_events import private_events_bp
     from app.routes.location import location_bp
     
@@ -55,12 +57,25 @@ def create_app(config_name='default'):
     api.add_namespace(subscriptions_ns, path='/subscriptions')
     api.add_namespace(classes_ns, path='/classes')
     api.add_namespace(users_ns, path='/users')
+    api.add_namespace(suggest_ns, path='/suggest')
     
     # Register new blueprints
     app.register_blueprint(private_events_bp)
     app.register_blueprint(location_bp)
     
     # Import models to ensure they are registered with SQLAlchemy
-    from app.models import user, cocktail, ingredient, subscription, virtual_class, private_event, location
+    from app.models import user, cocktail, ingredient, subscription, virtual_class, private_event, location, tag
+    
+    # Initialize services that keep derived data in sync with the models
+    from app.services import search, ratings, bookings, dashboard, cache, tags, nutrition, pantry, similarity, interactions, catalog, seasons, suggest, identity, passwords
+    search.init_app(app)
+    cache.init_app(app)
+    pantry.init_app(app)
+    interactions.init_app(app)
+    catalog.init_app(app)
+    suggest.init_app(app)
+    identity.init_app(app)
+    passwords.init_app(app)
+    similarity.init_app(app)
     
     return app
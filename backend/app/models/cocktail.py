@@ -1,5 +1,7 @@
 from datetime import datetime
+from sqlalchemy.orm import joinedload, selectinload
 from app import db
+from app.utils.fields import serialize
 
 class Cocktail(db.Model):
     """Cocktail model for healthy cocktail recipes"""
@@ -40,6 +42,34 @@ class Cocktail(db.Model):
     meta_title = db.Column(db.String(60))
     meta_description = db.Column(db.String(160))
     
+    # Review aggregates over approved reviews (maintained by app.services.ratings)
+    rating_count = db.Column(db.Integer, nullable=False, default=0, server_default='0', index=True)
+    rating_sum = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    average_rating = db.Column(db.Float, nullable=False, default=0.0, server_default='0', index=True)
+    rating_1_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_2_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_3_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_4_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rating_5_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    
+    # Users who favorited the cocktail (maintained by app.services.favorites)
+    favorite_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    
+    # Per-serving nutrition computed from the recipe (maintained by app.services.nutrition)
+    nutrition_calories = db.Column(db.Integer)
+    nutrition_protein_g = db.Column(db.Float)
+    nutrition_carbs_g = db.Column(db.Float)
+    nutrition_fiber_g = db.Column(db.Float)
+    nutrition_sugar_g = db.Column(db.Float)
+    nutrition_fat_g = db.Column(db.Float)
+    nutrition_sodium_mg = db.Column(db.Float)
+    nutrition_micronutrients = db.Column(db.JSON)  # {"vitamin_c": 12.5, "potassium": 80.1}
+    nutrition_complete = db.Column(db.Boolean, default=False)  # False if a unit couldn't be converted
+    nutrition_computed_at = db.Column(db.DateTime)
+    
+    # Months in which every non-optional ingredient is in season (maintained by app.services.seasons)
+    season_mask = db.Column(db.Integer, nullable=False, default=4095, server_default='4095', index=True)
+    
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -48,45 +78,83 @@ class Cocktail(db.Model):
     ingredients = db.relationship('CocktailIngredient', backref='cocktail', lazy='dynamic', cascade='all, delete-orphan')
     reviews = db.relationship('CocktailReview', backref='cocktail', lazy='dynamic')
     
-    def to_dict(self, include_ingredients=True):
-        """Convert cocktail to dictionary"""
-        data = {
-            'id': self.id,
-            'name': self.name,
-            'slug': self.slug,
-            'description': self.description,
-            'instructions': self.instructions,
-            'calories_per_serving': self.calories_per_serving,
-            'servings': self.servings,
-            'prep_time_minutes': self.prep_time_minutes,
-            'health_benefits': self.health_benefits or [],
-            'dietary_tags': self.dietary_tags or [],
-            'wellness_category': self.wellness_category,
-            'difficulty_level': self.difficulty_level,
-            'flavor_profile': self.flavor_profile or [],
-            'color_hex': self.color_hex,
-            'image_url': self.image_url,
-            'video_url': self.video_url,
-            'is_featured': self.is_featured,
-            'is_seasonal': self.is_seasonal,
-            'is_premium': self.is_premium,
-            'meta_title': self.meta_title,
-            'meta_description': self.meta_description,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+    # Ordered, loadable view of the recipe lines (the dynamic relationship above can't be eager-loaded)
+    recipe_lines = db.relationship('CocktailIngredient', viewonly=True,
+                                   order_by='(CocktailIngredient.order_index, CocktailIngredient.id)')
+    
+    @classmethod
+    def recipe_loader(cls):
+        """Loader option fetching recipe lines and their ingredients in one extra query"""
+        return selectinload(cls.recipe_lines).joinedload(CocktailIngredient.ingredient)
+    
+    @classmethod
+    def query_with_recipe(cls):
+        """Query that serializes with include_ingredients=True in two round trips"""
+        return cls.query.options(cls.recipe_loader())
+    
+    # Keys of to_dict, and the columns read by keys that aren't a column of the same name
+    serialized_fields = (
+        'id', 'name', 'slug', 'description', 'instructions', 'calories_per_serving', 'servings',
+        'prep_time_minutes', 'health_benefits', 'dietary_tags', 'wellness_category', 'difficulty_level',
+        'flavor_profile', 'color_hex', 'image_url', 'video_url', 'is_featured', 'is_seasonal', 'is_premium',
+        'meta_title', 'meta_description', 'average_rating', 'rating_count', 'favorite_count', 'nutrition',
+        'created_at', 'updated_at'
+    )
+    detailed_fields = serialized_fields + ('ingredients',)
+    field_columns = {
+        'average_rating': ('rating_sum', 'rating_count'),
+        'nutrition': (
+            'nutrition_calories', 'nutrition_protein_g', 'nutrition_carbs_g', 'nutrition_fiber_g',
+            'nutrition_sugar_g', 'nutrition_fat_g', 'nutrition_sodium_mg', 'nutrition_micronutrients',
+            'nutrition_complete', 'nutrition_computed_at'
+        ),
+        'ingredients': ()
+    }
+    
+    def to_dict(self, include_ingredients=True, fields=None):
+        """Convert cocktail to dictionary, limited to ``fields`` when given"""
+        data = serialize(self, self.serialized_fields, fields, {
+            'health_benefits': lambda: self.health_benefits or [],
+            'dietary_tags': lambda: self.dietary_tags or [],
+            'flavor_profile': lambda: self.flavor_profile or [],
+            'average_rating': self.get_average_rating,
+            'rating_count': lambda: self.rating_count or 0,
+            'favorite_count': lambda: self.favorite_count or 0,
+            'nutrition': self.get_nutrition,
+            'created_at': lambda: self.created_at.isoformat() if self.created_at else None,
+            'updated_at': lambda: self.updated_at.isoformat() if self.updated_at else None
+        })
         
-        if include_ingredients:
-            data['ingredients'] = [ing.to_dict() for ing in self.ingredients]
+        if include_ingredients and (fields is None or 'ingredients' in fields):
+            data['ingredients'] = [ing.to_dict() for ing in self.recipe_lines]
             
         return data
     
+    def get_nutrition(self):
+        """Computed per-serving nutrition, or None until it has been computed"""
+        if self.nutrition_computed_at is None:
+            return None
+        return {
+            'calories': self.nutrition_calories,
+            'protein_g': self.nutrition_protein_g,
+            'carbs_g': self.nutrition_carbs_g,
+            'fiber_g': self.nutrition_fiber_g,
+            'sugar_g': self.nutrition_sugar_g,
+            'fat_g': self.nutrition_fat_g,
+            'sodium_mg': self.nutrition_sodium_mg,
+            'micronutrients': self.nutrition_micronutrients or {},
+            'is_complete': bool(self.nutrition_complete)
+        }
+    
     def get_average_rating(self):
-        """Calculate average rating from reviews"""
-        reviews = self.reviews.filter_by(is_approved=True).all()
-        if not reviews:
+        """Average rating of approved reviews"""
+        if not self.rating_count:
             return 0
-        return sum(review.rating for review in reviews) / len(reviews)
+        return self.rating_sum / self.rating_count
+    
+    def get_rating_histogram(self):
+        """Number of approved reviews per star rating"""
+        return {stars: getattr(self, f'rating_{stars}_count') or 0 for stars in range(1, 6)}
     
     def __repr__(self):
         return f'<Cocktail {self.name}>'
@@ -130,15 +198,18 @@ class CocktailReview(db.Model):
     __tablename__ = 'cocktail_reviews'
     
     id = db.Column(db.Integer, primary_key=True)
-    cocktail_id = db.Column(db.Integer, db.ForeignKey('cocktails.id'), nullable=False)
+    # active_history keeps the previous values around for the cocktail's rating aggregates
+    cocktail_id = db.column_property(
+        db.Column(db.Integer, db.ForeignKey('cocktails.id'), nullable=False), active_history=True
+    )
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     
-    rating = db.Column(db.Integer, nullable=False)  # 1-5 stars
+    rating = db.column_property(db.Column(db.Integer, nullable=False), active_history=True)  # 1-5 stars
     title = db.Column(db.String(100))
     comment = db.Column(db.Text)
     
     # Moderation
-    is_approved = db.Column(db.Boolean, default=False)
+    is_approved = db.column_property(db.Column(db.Boolean, default=False), active_history=True)
     
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -163,3 +234,15 @@ class CocktailReview(db.Model):
     
     def __repr__(self):
         return f'<CocktailReview {self.cocktail_id}:{self.user_id}>'
+
+class CocktailSimilarity(db.Model):
+    """Precomputed nearest neighbours of a cocktail (maintained by app.services.similarity)"""
+    __tablename__ = 'cocktail_similarities'
+    
+    cocktail_id = db.Column(db.Integer, db.ForeignKey('cocktails.id', ondelete='CASCADE'), primary_key=True)
+    rank = db.Column(db.Integer, primary_key=True)  # 1 = most similar
+    similar_id = db.Column(db.Integer, db.ForeignKey('cocktails.id', ondelete='CASCADE'), nullable=False, index=True)
+    score = db.Column(db.Float, nullable=False)  # Cosine similarity, 0-1
+    
+    def __repr__(self):
+        return f'<CocktailSimilarity {self.cocktail_id}:{self.similar_id}>'
@@ -1,5 +1,6 @@
 from datetime import datetime
 from app import db
+from app.utils.fields import serialize
 
 class Ingredient(db.Model):
     """Ingredient model for healthy cocktail components"""
@@ -47,6 +48,8 @@ class Ingredient(db.Model):
     # Availability and seasonality
     is_seasonal = db.Column(db.Boolean, default=False)
     peak_season_months = db.Column(db.JSON)  # Array of month numbers
+    # 12-bit mask of peak_season_months, bit 0 = January (maintained by app.services.seasons)
+    season_mask = db.Column(db.Integer, nullable=False, default=4095, server_default='4095', index=True)
     availability_regions = db.Column(db.JSON)  # Array of regions
     
     # Preparation and storage
@@ -74,53 +77,32 @@ class Ingredient(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
-    def to_dict(self, include_detailed=False):
-        """Convert ingredient to dictionary"""
-        data = {
-            'id': self.id,
-            'name': self.name,
-            'slug': self.slug,
-            'description': self.description,
-            'category': self.category,
-            'subcategory': self.subcategory,
-            'origin': self.origin,
-            'health_benefits': self.health_benefits or [],
-            'flavor_profile': self.flavor_profile or [],
-            'color_hex': self.color_hex,
-            'is_organic': self.is_organic,
-            'is_fair_trade': self.is_fair_trade,
-            'is_local': self.is_local,
-            'is_seasonal': self.is_seasonal,
-            'image_url': self.image_url,
-            'is_premium': self.is_premium
-        }
-        
-        if include_detailed:
-            data.update({
-                'calories_per_100g': self.calories_per_100g,
-                'protein_g': self.protein_g,
-                'carbs_g': self.carbs_g,
-                'fiber_g': self.fiber_g,
-                'sugar_g': self.sugar_g,
-                'fat_g': self.fat_g,
-                'sodium_mg': self.sodium_mg,
-                'vitamins': self.vitamins or {},
-                'minerals': self.minerals or {},
-                'antioxidant_level': self.antioxidant_level,
-                'glycemic_index': self.glycemic_index,
-                'aroma_notes': self.aroma_notes or [],
-                'sustainability_score': self.sustainability_score,
-                'peak_season_months': self.peak_season_months or [],
-                'preparation_methods': self.preparation_methods or [],
-                'storage_instructions': self.storage_instructions,
-                'shelf_life_days': self.shelf_life_days,
-                'meta_title': self.meta_title,
-                'meta_description': self.meta_description,
-                'created_at': self.created_at.isoformat() if self.created_at else None,
-                'updated_at': self.updated_at.isoformat() if self.updated_at else None
-            })
-            
-        return data
+    # Keys of to_dict, without and with include_detailed
+    serialized_fields = (
+        'id', 'name', 'slug', 'description', 'category', 'subcategory', 'origin', 'health_benefits',
+        'flavor_profile', 'color_hex', 'is_organic', 'is_fair_trade', 'is_local', 'is_seasonal',
+        'image_url', 'is_premium'
+    )
+    detailed_fields = serialized_fields + (
+        'calories_per_100g', 'protein_g', 'carbs_g', 'fiber_g', 'sugar_g', 'fat_g', 'sodium_mg',
+        'vitamins', 'minerals', 'antioxidant_level', 'glycemic_index', 'aroma_notes', 'sustainability_score',
+        'peak_season_months', 'preparation_methods', 'storage_instructions', 'shelf_life_days',
+        'meta_title', 'meta_description', 'created_at', 'updated_at'
+    )
+    
+    def to_dict(self, include_detailed=False, fields=None):
+        """Convert ingredient to dictionary, limited to ``fields`` when given"""
+        return serialize(self, self.detailed_fields if include_detailed else self.serialized_fields, fields, {
+            'health_benefits': lambda: self.health_benefits or [],
+            'flavor_profile': lambda: self.flavor_profile or [],
+            'vitamins': lambda: self.vitamins or {},
+            'minerals': lambda: self.minerals or {},
+            'aroma_notes': lambda: self.aroma_notes or [],
+            'peak_season_months': lambda: self.peak_season_months or [],
+            'preparation_methods': lambda: self.preparation_methods or [],
+            'created_at': lambda: self.created_at.isoformat() if self.created_at else None,
+            'updated_at': lambda: self.updated_at.isoformat() if self.updated_at else None
+        })
     
     def get_nutritional_summary(self):
         """Get a summary of key nutritional information"""
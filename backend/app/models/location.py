@@ -4,6 +4,7 @@ Location and Contact models for SOBRE - Premium Healthy Cocktails
 
 from datetime import datetime
 from app import db
+from app.utils.fields import serialize
 from sqlalchemy.dialects.postgresql import JSON
 
 
@@ -55,32 +56,20 @@ class Location(db.Model):
     def __repr__(self):
         return f'<Location {self.name} - {self.city}>'
     
-    def to_dict(self):
-        """Convert model to dictionary for JSON serialization"""
-        return {
-            'id': self.id,
-            'name': self.name,
-            'slug': self.slug,
-            'description': self.description,
-            'street_address': self.street_address,
-            'city': self.city,
-            'postal_code': self.postal_code,
-            'country': self.country,
-            'latitude': self.latitude,
-            'longitude': self.longitude,
-            'phone': self.phone,
-            'email': self.email,
-            'website': self.website,
-            'business_hours': self.business_hours,
-            'social_media': self.social_media,
-            'parking_info': self.parking_info,
-            'public_transport_info': self.public_transport_info,
-            'driving_directions': self.driving_directions,
-            'is_active': self.is_active,
-            'is_primary': self.is_primary,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None
-        }
+    # Keys of to_dict
+    serialized_fields = (
+        'id', 'name', 'slug', 'description', 'street_address', 'city', 'postal_code', 'country',
+        'latitude', 'longitude', 'phone', 'email', 'website', 'business_hours', 'social_media',
+        'parking_info', 'public_transport_info', 'driving_directions', 'is_active', 'is_primary',
+        'created_at', 'updated_at'
+    )
+    
+    def to_dict(self, fields=None):
+        """Convert model to dictionary for JSON serialization, limited to ``fields`` when given"""
+        return serialize(self, self.serialized_fields, fields, {
+            'created_at': lambda: self.created_at.isoformat() if self.created_at else None,
+            'updated_at': lambda: self.updated_at.isoformat() if self.updated_at else None
+        })
 
 
 class ContactInquiry(db.Model):
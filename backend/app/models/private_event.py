@@ -37,7 +37,7 @@ class PrivateEventInquiry(db.Model):
     
     # Admin notes
     admin_notes = db.Column(db.Text)
-    estimated_quote = db.Column(db.Decimal(10, 2))
+    estimated_quote = db.Column(db.Numeric(10, 2))
     
     def __repr__(self):
         return f'<PrivateEventInquiry {self.contact_name} - {self.event_type} on {self.event_date}>'
@@ -73,7 +73,7 @@ class EventPackage(db.Model):
     name = db.Column(db.String(50), nullable=False)
     slug = db.Column(db.String(50), unique=True, nullable=False)
     description = db.Column(db.Text)
-    price_per_person = db.Column(db.Decimal(10, 2), nullable=False)
+    price_per_person = db.Column(db.Numeric(10, 2), nullable=False)
     
     # Package features
     features = db.Column(JSON)  # Array of features included
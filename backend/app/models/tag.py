@@ -0,0 +1,42 @@
+"""
+Tag vocabulary models for SOBRE - Premium Healthy Cocktails
+"""
+
+from datetime import datetime
+from app import db
+
+
+class Tag(db.Model):
+    """Normalized vocabulary entry for cocktail dietary tags, health benefits and flavors"""
+    __tablename__ = 'tags'
+    __table_args__ = (
+        db.UniqueConstraint('kind', 'slug', name='uq_tags_kind_slug'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)  # dietary, health_benefit, flavor
+    slug = db.Column(db.String(120), nullable=False)
+    name = db.Column(db.String(120), nullable=False)  # Display form as first seen
+
+    # Timestamps
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        """Convert tag to dictionary"""
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'slug': self.slug,
+            'name': self.name
+        }
+
+    def __repr__(self):
+        return f'<Tag {self.kind}:{self.slug}>'
+
+
+# Association table for cocktail tags, kept in sync with the cocktails' JSON tag fields
+cocktail_tags = db.Table('cocktail_tags',
+    db.Column('cocktail_id', db.Integer, db.ForeignKey('cocktails.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('tag_id', db.Integer, db.ForeignKey('tags.id', ondelete='CASCADE'), primary_key=True),
+    db.Index('ix_cocktail_tags_tag_id_cocktail_id', 'tag_id', 'cocktail_id')
+)
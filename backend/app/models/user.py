@@ -1,7 +1,7 @@
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
 from flask_jwt_extended import create_access_token, create_refresh_token
 from app import db
+from app.services import passwords
 
 class User(db.Model):
     """User model for authentication and profile management"""
@@ -24,6 +24,7 @@ class User(db.Model):
     is_active = db.Column(db.Boolean, default=True)
     is_verified = db.Column(db.Boolean, default=False)
     is_premium = db.Column(db.Boolean, default=False)
+    is_admin = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())  # Staff access to admin routes
     
     # Timestamps
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -37,12 +38,16 @@ class User(db.Model):
     class_bookings = db.relationship('ClassBooking', backref='user', lazy='dynamic')
     
     def set_password(self, password):
-        """Hash and set password"""
-        self.password_hash = generate_password_hash(password)
+        """Hash and set password (in the password hashing pool)"""
+        self.password_hash = passwords.hash_password(password)
     
     def check_password(self, password):
-        """Check if provided password matches hash"""
-        return check_password_hash(self.password_hash, password)
+        """Check if provided password matches hash (in the password hashing pool)"""
+        return passwords.verify_password(self.password_hash, password)
+    
+    def password_needs_rehash(self):
+        """Check if the stored hash predates the configured hashing parameters"""
+        return passwords.needs_rehash(self.password_hash)
     
     def generate_tokens(self):
         """Generate JWT access and refresh tokens"""
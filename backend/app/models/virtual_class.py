@@ -1,5 +1,7 @@
 from datetime import datetime
+from sqlalchemy.orm import contains_eager
 from app import db
+from app.utils.fields import serialize
 
 class VirtualClass(db.Model):
     """Virtual mixology class model"""
@@ -21,6 +23,8 @@ class VirtualClass(db.Model):
     
     # Capacity and pricing
     max_participants = db.Column(db.Integer, default=20)
+    # Confirmed bookings, kept by app.services.bookings so capacity is enforced in one UPDATE
+    confirmed_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     price = db.Column(db.Float, default=0.0)  # 0 for free classes
     currency = db.Column(db.String(3), default='USD')
     
@@ -64,58 +68,43 @@ class VirtualClass(db.Model):
     # Relationships
     bookings = db.relationship('ClassBooking', backref='virtual_class', lazy='dynamic')
     
-    def to_dict(self, include_meeting_details=False):
-        """Convert virtual class to dictionary"""
-        data = {
-            'id': self.id,
-            'title': self.title,
-            'description': self.description,
-            'instructor_name': self.instructor_name,
-            'instructor_bio': self.instructor_bio,
-            'instructor_image_url': self.instructor_image_url,
-            'scheduled_datetime': self.scheduled_datetime.isoformat() if self.scheduled_datetime else None,
-            'duration_minutes': self.duration_minutes,
-            'timezone': self.timezone,
-            'max_participants': self.max_participants,
-            'price': self.price,
-            'currency': self.currency,
-            'difficulty_level': self.difficulty_level,
-            'cocktails_featured': self.cocktails_featured or [],
-            'ingredients_needed': self.ingredients_needed or [],
-            'equipment_needed': self.equipment_needed or [],
-            'image_url': self.image_url,
-            'promo_video_url': self.promo_video_url,
-            'status': self.status,
-            'is_premium': self.is_premium,
-            'is_recorded': self.is_recorded,
-            'is_featured': self.is_featured,
-            'tags': self.tags or [],
-            'current_participants': self.bookings.filter_by(status='confirmed').count(),
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
-        
-        if include_meeting_details:
-            data.update({
-                'meeting_platform': self.meeting_platform,
-                'meeting_url': self.meeting_url,
-                'meeting_id': self.meeting_id,
-                'meeting_password': self.meeting_password,
-                'recipe_pdf_url': self.recipe_pdf_url,
-                'shopping_list_url': self.shopping_list_url,
-                'preparation_notes': self.preparation_notes
-            })
-            
-        return data
+    # Keys of to_dict, without and with include_meeting_details
+    serialized_fields = (
+        'id', 'title', 'description', 'instructor_name', 'instructor_bio', 'instructor_image_url',
+        'scheduled_datetime', 'duration_minutes', 'timezone', 'max_participants', 'price', 'currency',
+        'difficulty_level', 'cocktails_featured', 'ingredients_needed', 'equipment_needed', 'image_url',
+        'promo_video_url', 'status', 'is_premium', 'is_recorded', 'is_featured', 'tags',
+        'current_participants', 'created_at'
+    )
+    meeting_fields = serialized_fields + (
+        'meeting_platform', 'meeting_url', 'meeting_id', 'meeting_password', 'recipe_pdf_url',
+        'shopping_list_url', 'preparation_notes'
+    )
+    field_columns = {'current_participants': ('confirmed_count',)}
+    
+    def to_dict(self, include_meeting_details=False, fields=None):
+        """Convert virtual class to dictionary, limited to ``fields`` when given"""
+        return serialize(self, self.meeting_fields if include_meeting_details else self.serialized_fields, fields, {
+            'scheduled_datetime': lambda: self.scheduled_datetime.isoformat() if self.scheduled_datetime else None,
+            'cocktails_featured': lambda: self.cocktails_featured or [],
+            'ingredients_needed': lambda: self.ingredients_needed or [],
+            'equipment_needed': lambda: self.equipment_needed or [],
+            'tags': lambda: self.tags or [],
+            'current_participants': lambda: self.confirmed_count or 0,
+            'created_at': lambda: self.created_at.isoformat() if self.created_at else None
+        })
     
     def is_full(self):
         """Check if class is at capacity"""
-        confirmed_bookings = self.bookings.filter_by(status='confirmed').count()
-        return confirmed_bookings >= self.max_participants
+        if self.max_participants is None:
+            return False
+        return (self.confirmed_count or 0) >= self.max_participants
     
     def spots_remaining(self):
         """Calculate remaining spots"""
-        confirmed_bookings = self.bookings.filter_by(status='confirmed').count()
-        return max(0, self.max_participants - confirmed_bookings)
+        if self.max_participants is None:
+            return None
+        return max(0, self.max_participants - (self.confirmed_count or 0))
     
     def __repr__(self):
         return f'<VirtualClass {self.title}>'
@@ -126,10 +115,15 @@ class ClassBooking(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    virtual_class_id = db.Column(db.Integer, db.ForeignKey('virtual_classes.id'), nullable=False)
+    virtual_class_id = db.column_property(
+        db.Column(db.Integer, db.ForeignKey('virtual_classes.id'), nullable=False), active_history=True
+    )
     
     # Booking details
-    status = db.Column(db.String(20), default='pending')  # pending, confirmed, cancelled, completed
+    # active_history keeps the previous values around for the class's confirmed count
+    status = db.column_property(
+        db.Column(db.String(20), default='pending'), active_history=True
+    )  # pending, confirmed, cancelled, completed
     booking_reference = db.Column(db.String(20), unique=True, nullable=False)
     
     # Payment information
@@ -150,6 +144,11 @@ class ClassBooking(db.Model):
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     cancelled_at = db.Column(db.DateTime)
     
+    @classmethod
+    def query_with_class(cls):
+        """Query that serializes bookings and their classes in one joined round trip"""
+        return cls.query.join(cls.virtual_class).options(contains_eager(cls.virtual_class))
+    
     def to_dict(self):
         """Convert booking to dictionary"""
         return {
@@ -166,16 +165,5 @@ class ClassBooking(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None
         }
     
-    def generate_booking_reference(self):
-        """Generate unique booking reference"""
-        import string
-        import random
-        
-        chars = string.ascii_uppercase + string.digits
-        while True:
-            ref = ''.join(random.choice(chars) for _ in range(8))
-            if not ClassBooking.query.filter_by(booking_reference=ref).first():
-                return ref
-    
     def __repr__(self):
         return f'<ClassBooking {self.booking_reference}>'
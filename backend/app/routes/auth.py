@@ -1,10 +1,12 @@
 from flask import request, jsonify
 from flask_restx import Namespace, Resource, fields
-from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, current_user
 from marshmallow import Schema, fields as ma_fields, validate, ValidationError
 from datetime import datetime
 from app import db
 from app.models.user import User
+from app.services.identity import current_user_model
+from app.services.passwords import PasswordPoolBusy
 
 # Create namespace for authentication
 auth_ns = Namespace('auth', description='Authentication operations')
@@ -102,6 +104,9 @@ class UserRegistration(Resource):
             
         except ValidationError as e:
             auth_ns.abort(400, str(e.messages))
+        except PasswordPoolBusy:
+            db.session.rollback()
+            auth_ns.abort(503, 'Too many sign-ups right now, please try again')
         except Exception as e:
             db.session.rollback()
             auth_ns.abort(500, 'Registration failed')
@@ -127,6 +132,10 @@ class UserLogin(Resource):
             if not user.is_active:
                 auth_ns.abort(401, 'Account is deactivated')
             
+            # Upgrade a hash made with older parameters while the password is at hand
+            if user.password_needs_rehash():
+                user.set_password(data['password'])
+            
             # Update last login
             user.last_login = datetime.utcnow()
             db.session.commit()
@@ -142,6 +151,9 @@ class UserLogin(Resource):
             
         except ValidationError as e:
             auth_ns.abort(400, str(e.messages))
+        except PasswordPoolBusy:
+            db.session.rollback()
+            auth_ns.abort(503, 'Too many sign-ins right now, please try again')
         except Exception as e:
             auth_ns.abort(500, 'Login failed')
 
@@ -152,14 +164,8 @@ class TokenRefresh(Resource):
     def post(self):
         """Refresh access token using refresh token"""
         try:
-            current_user_id = get_jwt_identity()
-            user = User.query.get(current_user_id)
-            
-            if not user or not user.is_active:
-                auth_ns.abort(401, 'Invalid user')
-            
-            # Generate new access token
-            access_token = create_access_token(identity=user.id)
+            # The user lookup loader has already rejected missing and deactivated users
+            access_token = create_access_token(identity=current_user.id)
             
             return {
                 'access_token': access_token
@@ -176,8 +182,7 @@ class UserProfile(Resource):
     def get(self):
         """Get current user profile"""
         try:
-            current_user_id = get_jwt_identity()
-            user = User.query.get(current_user_id)
+            user = current_user_model()
             
             if not user:
                 auth_ns.abort(404, 'User not found')
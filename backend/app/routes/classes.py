@@ -5,6 +5,10 @@ from datetime import datetime
 from app import db
 from app.models.virtual_class import VirtualClass, ClassBooking
 from app.models.user import User
+from app.services.bookings import ClassFull
+from app.utils.pagination import InvalidCursor, keyset_paginate
+from app.utils.fields import InvalidFields, field_options, parse_fields
+from app.utils.references import add_with_reference
 
 # Create namespace for virtual classes
 classes_ns = Namespace('classes', description='Virtual mixology class operations')
@@ -32,10 +36,15 @@ class_booking_model = classes_ns.model('ClassBooking', {
     'virtual_class': fields.Nested(virtual_class_model, description='Class details')
 })
 
+virtual_class_page_model = classes_ns.model('VirtualClassPage', {
+    'classes': fields.List(fields.Nested(virtual_class_model), description='Classes on this page'),
+    'pagination': fields.Raw(description='Page numbers, or next_cursor in cursor mode')
+})
+
 @classes_ns.route('/')
 class VirtualClassList(Resource):
     @classes_ns.doc('list_virtual_classes')
-    @classes_ns.marshal_list_with(virtual_class_model)
+    @classes_ns.response(200, 'Success', virtual_class_page_model)
     def get(self):
         """Get list of upcoming virtual classes"""
         try:
@@ -43,9 +52,13 @@ class VirtualClassList(Resource):
             per_page = min(request.args.get('per_page', 10, type=int), 50)
             difficulty = request.args.get('difficulty')
             is_premium = request.args.get('premium', type=bool)
+            cursor = request.args.get('cursor')
+            fields = parse_fields(request.args.get('fields'), VirtualClass.serialized_fields)
             
             # Only show future classes
-            query = VirtualClass.query.filter(
+            query = VirtualClass.query.options(
+                *field_options(VirtualClass, fields, VirtualClass.scheduled_datetime)
+            ).filter(
                 VirtualClass.scheduled_datetime > datetime.utcnow(),
                 VirtualClass.status == 'scheduled'
             )
@@ -55,17 +68,30 @@ class VirtualClassList(Resource):
             if is_premium is not None:
                 query = query.filter_by(is_premium=is_premium)
             
+            if cursor is not None:
+                classes = keyset_paginate(
+                    query, [(VirtualClass.scheduled_datetime, False), (VirtualClass.id, False)], cursor, per_page
+                )
+                return {
+                    'classes': [cls.to_dict(fields=fields) for cls in classes.items],
+                    'pagination': classes.to_dict()
+                }
+            
             query = query.order_by(VirtualClass.scheduled_datetime)
             classes = query.paginate(page=page, per_page=per_page, error_out=False)
             
             return {
-                'classes': [cls.to_dict() for cls in classes.items],
+                'classes': [cls.to_dict(fields=fields) for cls in classes.items],
                 'pagination': {
                     'page': page,
                     'pages': classes.pages,
                     'total': classes.total
                 }
             }
+        except InvalidCursor:
+            classes_ns.abort(400, 'Invalid cursor')
+        except InvalidFields as e:
+            classes_ns.abort(400, str(e))
         except Exception as e:
             classes_ns.abort(500, 'Failed to fetch classes')
 
@@ -75,8 +101,11 @@ class VirtualClassDetail(Resource):
     def get(self, class_id):
         """Get detailed virtual class information"""
         try:
-            virtual_class = VirtualClass.query.get_or_404(class_id)
-            return virtual_class.to_dict()
+            fields = parse_fields(request.args.get('fields'), VirtualClass.serialized_fields)
+            virtual_class = VirtualClass.query.options(*field_options(VirtualClass, fields)).get_or_404(class_id)
+            return virtual_class.to_dict(fields=fields)
+        except InvalidFields as e:
+            classes_ns.abort(400, str(e))
         except Exception as e:
             classes_ns.abort(500, 'Failed to fetch class details')
 
@@ -86,33 +115,37 @@ class ClassBookingResource(Resource):
     @classes_ns.doc('book_virtual_class')
     def post(self, class_id):
         """Book a virtual class"""
+        current_user_id = get_jwt_identity()
+        virtual_class = VirtualClass.query.get_or_404(class_id)
+        
+        # Check if user already booked this class
+        booking = ClassBooking.query.filter_by(
+            user_id=current_user_id,
+            virtual_class_id=class_id
+        ).first()
+        
+        if booking and booking.status != 'cancelled':
+            classes_ns.abort(400, 'You have already booked this class')
+        
+        # Early answer only; the confirmed count UPDATE is what enforces capacity
+        if virtual_class.is_full():
+            classes_ns.abort(400, 'Class is fully booked')
+        
         try:
-            current_user_id = get_jwt_identity()
-            virtual_class = VirtualClass.query.get_or_404(class_id)
-            
-            # Check if class is full
-            if virtual_class.is_full():
-                classes_ns.abort(400, 'Class is fully booked')
+            if booking:
+                # Rebooking after a cancellation takes a seat again
+                booking.status = 'confirmed'
+                booking.cancelled_at = None
+                booking.amount_paid = virtual_class.price
+            else:
+                booking = ClassBooking(
+                    user_id=current_user_id,
+                    virtual_class_id=class_id,
+                    amount_paid=virtual_class.price,
+                    status='confirmed'  # In production, this would be 'pending' until payment
+                )
+                add_with_reference(booking, 'booking_reference')
             
-            # Check if user already booked this class
-            existing_booking = ClassBooking.query.filter_by(
-                user_id=current_user_id,
-                virtual_class_id=class_id
-            ).first()
-            
-            if existing_booking:
-                classes_ns.abort(400, 'You have already booked this class')
-            
-            # Create booking
-            booking = ClassBooking(
-                user_id=current_user_id,
-                virtual_class_id=class_id,
-                booking_reference=ClassBooking().generate_booking_reference(),
-                amount_paid=virtual_class.price,
-                status='confirmed'  # In production, this would be 'pending' until payment
-            )
-            
-            db.session.add(booking)
             db.session.commit()
             
             return {
@@ -120,9 +153,41 @@ class ClassBookingResource(Resource):
                 'booking': booking.to_dict()
             }, 201
             
+        except ClassFull:
+            db.session.rollback()
+            classes_ns.abort(400, 'Class is fully booked')
         except Exception as e:
             db.session.rollback()
             classes_ns.abort(500, 'Failed to book class')
+    
+    @jwt_required()
+    @classes_ns.doc('cancel_class_booking')
+    def delete(self, class_id):
+        """Cancel the current user's booking of a virtual class"""
+        current_user_id = get_jwt_identity()
+        booking = ClassBooking.query.filter(
+            ClassBooking.user_id == current_user_id,
+            ClassBooking.virtual_class_id == class_id,
+            ClassBooking.status.in_(('pending', 'confirmed'))
+        ).first()
+        
+        if not booking:
+            classes_ns.abort(404, 'Booking not found')
+        
+        try:
+            # Releases the seat through the class's confirmed count
+            booking.status = 'cancelled'
+            booking.cancelled_at = datetime.utcnow()
+            db.session.commit()
+            
+            return {
+                'message': 'Booking cancelled successfully',
+                'booking': booking.to_dict()
+            }
+            
+        except Exception as e:
+            db.session.rollback()
+            classes_ns.abort(500, 'Failed to cancel booking')
 
 @classes_ns.route('/my-bookings')
 class UserBookings(Resource):
@@ -133,7 +198,7 @@ class UserBookings(Resource):
         """Get current user's class bookings"""
         try:
             current_user_id = get_jwt_identity()
-            bookings = ClassBooking.query.filter_by(user_id=current_user_id).order_by(
+            bookings = ClassBooking.query_with_class().filter(ClassBooking.user_id == current_user_id).order_by(
                 ClassBooking.created_at.desc()
             ).all()
             
@@ -1,11 +1,21 @@
-from flask import request, jsonify
+from flask import request, jsonify, current_app
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from marshmallow import Schema, fields as ma_fields, validate, ValidationError
+from sqlalchemy import select
 from app import db
 from app.models.cocktail import Cocktail, CocktailIngredient, CocktailReview
 from app.models.ingredient import Ingredient
-from app.models.user import User
+from app.services import search as search_service
+from app.services.cache import cached
+from app.services import tags as tags_service
+from app.services import pantry as pantry_service
+from app.services import similarity as similarity_service
+from app.services import favorites as favorites_service
+from app.services import seasons as seasons_service
+from app.services.facets import facet_counts
+from app.utils.pagination import InvalidCursor, keyset_paginate
+from app.utils.fields import InvalidFields, field_options, parse_fields
 
 # Create namespace for cocktails
 cocktails_ns = Namespace('cocktails', description='Cocktail operations')
@@ -25,7 +35,9 @@ cocktail_model = cocktails_ns.model('Cocktail', {
     'difficulty_level': fields.String(description='Difficulty level'),
     'is_featured': fields.Boolean(description='Featured cocktail'),
     'is_premium': fields.Boolean(description='Premium cocktail'),
-    'image_url': fields.String(description='Image URL')
+    'image_url': fields.String(description='Image URL'),
+    'average_rating': fields.Float(description='Average approved rating'),
+    'rating_count': fields.Integer(description='Number of approved ratings')
 })
 
 cocktail_ingredient_model = cocktails_ns.model('CocktailIngredient', {
@@ -45,53 +57,116 @@ cocktail_review_model = cocktails_ns.model('CocktailReview', {
     'created_at': fields.String(description='Review date')
 })
 
+cocktail_page_model = cocktails_ns.model('CocktailPage', {
+    'cocktails': fields.List(fields.Nested(cocktail_model), description='Cocktails on this page'),
+    'pagination': fields.Raw(description='Page numbers, or next_cursor in cursor mode')
+})
+
+cocktail_review_page_model = cocktails_ns.model('CocktailReviewPage', {
+    'reviews': fields.List(fields.Nested(cocktail_review_model), description='Reviews on this page'),
+    'pagination': fields.Raw(description='Page numbers, or next_cursor in cursor mode'),
+    'average_rating': fields.Float(description='Average approved rating'),
+    'rating_count': fields.Integer(description='Number of approved ratings'),
+    'rating_histogram': fields.Raw(description='Approved ratings per star value')
+})
+
+def filter_cocktails(args):
+    """Build the active-cocktail query for the catalog filters in ``args``
+
+    Returns the query and, when a search term was given, the matching ids in
+    relevance order.
+    """
+    category = args.get('category')
+    difficulty = args.get('difficulty')
+    dietary_tags = args.getlist('dietary_tags')
+    health_benefits = args.getlist('health_benefits')
+    flavors = args.getlist('flavors')
+    tag_match = 'any' if args.get('tag_match') == 'any' else 'all'
+    is_featured = args.get('featured', type=bool)
+    is_premium = args.get('premium', type=bool)
+    min_rating = args.get('min_rating', type=float)
+    in_season = seasons_service.month_number(args.get('in_season'))
+    search = args.get('search')
+    matching_ids = None
+    
+    # Build query
+    query = Cocktail.query.filter_by(is_active=True)
+    
+    if category:
+        query = query.filter_by(wellness_category=category)
+    
+    if difficulty:
+        query = query.filter_by(difficulty_level=difficulty)
+    
+    # Tag filters are lookups on the normalized cocktail_tags index
+    for kind, values in (('dietary', dietary_tags), ('health_benefit', health_benefits), ('flavor', flavors)):
+        criterion = tags_service.tag_filter(kind, values, match=tag_match)
+        if criterion is not None:
+            query = query.filter(criterion)
+    
+    if is_featured is not None:
+        query = query.filter_by(is_featured=is_featured)
+    
+    if is_premium is not None:
+        query = query.filter_by(is_premium=is_premium)
+    
+    if min_rating is not None:
+        query = query.filter(Cocktail.average_rating >= min_rating)
+    
+    # Every non-optional ingredient in season, tested against the stored month mask
+    if in_season is not None:
+        query = query.filter(seasons_service.in_season(Cocktail.season_mask, in_season))
+    
+    if search:
+        matching_ids = search_service.search_ids(
+            'cocktails', search, limit=current_app.config['SEARCH_MAX_RESULTS']
+        )
+        query = query.filter(Cocktail.id.in_(matching_ids))
+    
+    return query, matching_ids
+
 @cocktails_ns.route('/')
 class CocktailList(Resource):
     @cocktails_ns.doc('list_cocktails')
-    @cocktails_ns.marshal_list_with(cocktail_model)
+    @cocktails_ns.response(200, 'Success', cocktail_page_model)
     def get(self):
         """Get list of cocktails with filtering options"""
         try:
             # Get query parameters
             page = request.args.get('page', 1, type=int)
             per_page = min(request.args.get('per_page', 12, type=int), 50)
-            category = request.args.get('category')
-            difficulty = request.args.get('difficulty')
-            dietary_tags = request.args.getlist('dietary_tags')
-            is_featured = request.args.get('featured', type=bool)
-            is_premium = request.args.get('premium', type=bool)
-            search = request.args.get('search')
-            
-            # Build query
-            query = Cocktail.query.filter_by(is_active=True)
-            
-            if category:
-                query = query.filter_by(wellness_category=category)
-            
-            if difficulty:
-                query = query.filter_by(difficulty_level=difficulty)
-            
-            if dietary_tags:
-                for tag in dietary_tags:
-                    query = query.filter(Cocktail.dietary_tags.contains([tag]))
-            
-            if is_featured is not None:
-                query = query.filter_by(is_featured=is_featured)
-            
-            if is_premium is not None:
-                query = query.filter_by(is_premium=is_premium)
-            
-            if search:
-                search_term = f"%{search}%"
-                query = query.filter(
-                    db.or_(
-                        Cocktail.name.ilike(search_term),
-                        Cocktail.description.ilike(search_term)
-                    )
-                )
+            sort = request.args.get('sort', 'featured')
+            cursor = request.args.get('cursor')
+            fields = parse_fields(request.args.get('fields'), Cocktail.serialized_fields)
             
-            # Order by featured first, then by creation date
-            query = query.order_by(Cocktail.is_featured.desc(), Cocktail.created_at.desc())
+            query, matching_ids = filter_cocktails(request.args)
+            
+            # Rating sorts read the stored aggregates, so they cost no extra queries
+            if sort == 'rating':
+                sort_keys = [(Cocktail.average_rating, True), (Cocktail.rating_count, True)]
+            elif sort == 'reviews':
+                sort_keys = [(Cocktail.rating_count, True)]
+            else:
+                sort_keys = []
+            
+            # Order by featured first, then by creation date (id keeps cursor positions unique)
+            sort_keys += [(Cocktail.is_featured, True), (Cocktail.created_at, True), (Cocktail.id, True)]
+            
+            # Unrequested columns stay unloaded; cursor pages still need their sort keys
+            query = query.options(*field_options(Cocktail, fields, *[column for column, _ in sort_keys]))
+            
+            if cursor is not None:
+                # Cursor mode skips COUNT(*) and OFFSET; search matches follow the sort keys
+                results = keyset_paginate(query, sort_keys, cursor, per_page)
+                return {
+                    'cocktails': [cocktail.to_dict(include_ingredients=False, fields=fields) for cocktail in results.items],
+                    'pagination': results.to_dict()
+                }
+            
+            # Rank search matches by relevance, with the usual ordering as a tie-breaker
+            if matching_ids:
+                query = query.order_by(search_service.rank_order(Cocktail.id, matching_ids))
+            query = query.order_by(*[column.desc() if descending else column for column, descending in sort_keys])
             
             # Paginate results
             cocktails = query.paginate(
@@ -99,7 +174,7 @@ class CocktailList(Resource):
             )
             
             return {
-                'cocktails': [cocktail.to_dict(include_ingredients=False) for cocktail in cocktails.items],
+                'cocktails': [cocktail.to_dict(include_ingredients=False, fields=fields) for cocktail in cocktails.items],
                 'pagination': {
                     'page': page,
                     'pages': cocktails.pages,
@@ -110,30 +185,138 @@ class CocktailList(Resource):
                 }
             }
             
+        except InvalidCursor:
+            cocktails_ns.abort(400, 'Invalid cursor')
+        except InvalidFields as e:
+            cocktails_ns.abort(400, str(e))
         except Exception as e:
             cocktails_ns.abort(500, 'Failed to fetch cocktails')
 
+@cocktails_ns.route('/facets')
+class CocktailFacets(Resource):
+    @cocktails_ns.doc('get_cocktail_facets')
+    @cached('cocktails', 'cocktail_ingredients', 'ingredients')
+    def get(self):
+        """Get per-facet cocktail counts for the current filters"""
+        try:
+            query, _ = filter_cocktails(request.args)
+            return facet_counts(query)
+            
+        except Exception as e:
+            cocktails_ns.abort(500, 'Failed to fetch facets')
+
+@cocktails_ns.route('/makeable')
+class MakeableCocktails(Resource):
+    @cocktails_ns.doc('get_makeable_cocktails')
+    def get(self):
+        """Get cocktails that can be made from the given ingredients, or nearly"""
+        values = [value for param in request.args.getlist('ingredients') for value in param.split(',')]
+        try:
+            ingredient_ids = {int(value) for value in values if value.strip()}
+        except ValueError:
+            cocktails_ns.abort(400, 'Ingredients must be a comma-separated list of ingredient IDs')
+        if not ingredient_ids:
+            cocktails_ns.abort(400, 'At least one ingredient is required')
+        
+        try:
+            max_missing = min(max(request.args.get('max_missing', 2, type=int), 0), 2)
+            limit = min(request.args.get('limit', 50, type=int), 200)
+            fields = parse_fields(request.args.get('fields'), Cocktail.serialized_fields)
+            
+            page, counts = pantry_service.match(ingredient_ids, max_missing=max_missing, limit=limit)
+            
+            cocktails = {
+                cocktail.id: cocktail
+                for cocktail in Cocktail.query.options(*field_options(Cocktail, fields)).filter(
+                    Cocktail.id.in_([match.cocktail_id for match in page])
+                )
+            }
+            missing_ids = {ingredient_id for match in page for ingredient_id in match.missing_ingredient_ids}
+            ingredients = {
+                ingredient.id: ingredient
+                for ingredient in Ingredient.query.filter(Ingredient.id.in_(missing_ids))
+            } if missing_ids else {}
+            
+            results = []
+            for match in page:
+                cocktail = cocktails.get(match.cocktail_id)
+                if cocktail is None:
+                    continue
+                data = cocktail.to_dict(include_ingredients=False, fields=fields)
+                data['missing_count'] = len(match.missing_ingredient_ids)
+                data['missing_ingredients'] = [
+                    {'id': ingredient_id, 'name': ingredients[ingredient_id].name, 'slug': ingredients[ingredient_id].slug}
+                    for ingredient_id in match.missing_ingredient_ids if ingredient_id in ingredients
+                ]
+                results.append(data)
+            
+            return {
+                'cocktails': results,
+                'counts': {str(missing): total for missing, total in counts.items()},
+                'total': sum(counts.values())
+            }
+            
+        except InvalidFields as e:
+            cocktails_ns.abort(400, str(e))
+        except Exception as e:
+            cocktails_ns.abort(500, 'Failed to match cocktails')
+
 @cocktails_ns.route('/<int:cocktail_id>')
 class CocktailDetail(Resource):
     @cocktails_ns.doc('get_cocktail')
-    @cocktails_ns.marshal_with(cocktail_model)
+    @cocktails_ns.response(200, 'Success', cocktail_model)
     def get(self, cocktail_id):
         """Get detailed cocktail information"""
         try:
-            cocktail = Cocktail.query.filter_by(id=cocktail_id, is_active=True).first()
+            fields = parse_fields(request.args.get('fields'), Cocktail.detailed_fields)
+            query = Cocktail.query_with_recipe() if fields is None or 'ingredients' in fields else Cocktail.query
+            cocktail = query.options(*field_options(Cocktail, fields)).filter_by(id=cocktail_id, is_active=True).first()
             
-            if not cocktail:
-                cocktails_ns.abort(404, 'Cocktail not found')
-            
-            return cocktail.to_dict(include_ingredients=True)
+            if cocktail is not None:
+                return cocktail.to_dict(include_ingredients=True, fields=fields)
             
+        except InvalidFields as e:
+            cocktails_ns.abort(400, str(e))
         except Exception as e:
             cocktails_ns.abort(500, 'Failed to fetch cocktail')
+        
+        cocktails_ns.abort(404, 'Cocktail not found')
+
+@cocktails_ns.route('/<int:cocktail_id>/similar')
+class SimilarCocktails(Resource):
+    @cocktails_ns.doc('get_similar_cocktails')
+    @cached('cocktails', 'cocktail_ingredients', 'cocktail_similarities')
+    def get(self, cocktail_id):
+        """Get cocktails similar to a cocktail"""
+        try:
+            limit = min(max(request.args.get('limit', 6, type=int), 1), current_app.config['SIMILAR_COCKTAILS_TOP_K'])
+            fields = parse_fields(request.args.get('fields'), Cocktail.serialized_fields)
+            
+            # Neighbours are precomputed, so this is one indexed lookup
+            similar = similarity_service.similar_cocktails(
+                cocktail_id, limit=limit, options=field_options(Cocktail, fields)
+            )
+            found = bool(similar) or db.session.query(Cocktail.id).filter_by(
+                id=cocktail_id, is_active=True
+            ).first() is not None
+            
+        except InvalidFields as e:
+            cocktails_ns.abort(400, str(e))
+        except Exception as e:
+            cocktails_ns.abort(500, 'Failed to fetch similar cocktails')
+        
+        if not found:
+            cocktails_ns.abort(404, 'Cocktail not found')
+        
+        return [
+            dict(cocktail.to_dict(include_ingredients=False, fields=fields), similarity=score)
+            for cocktail, score in similar
+        ]
 
 @cocktails_ns.route('/<int:cocktail_id>/reviews')
 class CocktailReviews(Resource):
     @cocktails_ns.doc('get_cocktail_reviews')
-    @cocktails_ns.marshal_list_with(cocktail_review_model)
+    @cocktails_ns.response(200, 'Success', cocktail_review_page_model)
     def get(self, cocktail_id):
         """Get reviews for a cocktail"""
         try:
@@ -141,25 +324,39 @@ class CocktailReviews(Resource):
             
             page = request.args.get('page', 1, type=int)
             per_page = min(request.args.get('per_page', 10, type=int), 50)
+            cursor = request.args.get('cursor')
             
-            reviews = CocktailReview.query.filter_by(
+            query = CocktailReview.query.filter_by(
                 cocktail_id=cocktail_id,
                 is_approved=True
-            ).order_by(CocktailReview.created_at.desc()).paginate(
-                page=page, per_page=per_page, error_out=False
             )
             
-            return {
-                'reviews': [review.to_dict() for review in reviews.items],
-                'pagination': {
+            if cursor is not None:
+                reviews = keyset_paginate(
+                    query, [(CocktailReview.created_at, True), (CocktailReview.id, True)], cursor, per_page
+                )
+                pagination = reviews.to_dict()
+            else:
+                reviews = query.order_by(CocktailReview.created_at.desc()).paginate(
+                    page=page, per_page=per_page, error_out=False
+                )
+                pagination = {
                     'page': page,
                     'pages': reviews.pages,
                     'per_page': per_page,
                     'total': reviews.total
-                },
-                'average_rating': cocktail.get_average_rating()
+                }
+            
+            return {
+                'reviews': [review.to_dict() for review in reviews.items],
+                'pagination': pagination,
+                'average_rating': cocktail.get_average_rating(),
+                'rating_count': cocktail.rating_count,
+                'rating_histogram': cocktail.get_rating_histogram()
             }
             
+        except InvalidCursor:
+            cocktails_ns.abort(400, 'Invalid cursor')
         except Exception as e:
             cocktails_ns.abort(500, 'Failed to fetch reviews')
     
@@ -213,26 +410,16 @@ class CocktailFavorite(Resource):
     @cocktails_ns.doc('toggle_favorite')
     def post(self, cocktail_id):
         """Add or remove cocktail from favorites"""
+        current_user_id = get_jwt_identity()
+        if db.session.scalar(select(Cocktail.id).where(Cocktail.id == cocktail_id)) is None:
+            cocktails_ns.abort(404, 'Cocktail not found')
+        
         try:
-            current_user_id = get_jwt_identity()
-            user = User.query.get(current_user_id)
-            cocktail = Cocktail.query.get_or_404(cocktail_id)
-            
-            if cocktail in user.favorite_cocktails:
-                # Remove from favorites
-                user.favorite_cocktails.remove(cocktail)
-                message = 'Removed from favorites'
-                is_favorite = False
-            else:
-                # Add to favorites
-                user.favorite_cocktails.append(cocktail)
-                message = 'Added to favorites'
-                is_favorite = True
-            
+            is_favorite = favorites_service.toggle(current_user_id, cocktail_id)
             db.session.commit()
             
             return {
-                'message': message,
+                'message': 'Added to favorites' if is_favorite else 'Removed from favorites',
                 'is_favorite': is_favorite
             }
             
@@ -243,25 +430,30 @@ class CocktailFavorite(Resource):
 @cocktails_ns.route('/featured')
 class FeaturedCocktails(Resource):
     @cocktails_ns.doc('get_featured_cocktails')
-    @cocktails_ns.marshal_list_with(cocktail_model)
+    @cocktails_ns.response(200, 'Success', [cocktail_model])
+    @cached('cocktails')
     def get(self):
         """Get featured cocktails"""
         try:
             limit = min(request.args.get('limit', 6, type=int), 20)
+            fields = parse_fields(request.args.get('fields'), Cocktail.serialized_fields)
             
-            cocktails = Cocktail.query.filter_by(
+            cocktails = Cocktail.query.options(*field_options(Cocktail, fields)).filter_by(
                 is_featured=True,
                 is_active=True
             ).order_by(Cocktail.created_at.desc()).limit(limit).all()
             
-            return [cocktail.to_dict(include_ingredients=False) for cocktail in cocktails]
+            return [cocktail.to_dict(include_ingredients=False, fields=fields) for cocktail in cocktails]
             
+        except InvalidFields as e:
+            cocktails_ns.abort(400, str(e))
         except Exception as e:
             cocktails_ns.abort(500, 'Failed to fetch featured cocktails')
 
 @cocktails_ns.route('/categories')
 class CocktailCategories(Resource):
     @cocktails_ns.doc('get_cocktail_categories')
+    @cached('cocktails')
     def get(self):
         """Get available cocktail categories"""
         try:
@@ -285,21 +477,17 @@ class CocktailSearch(Resource):
             if not query_param:
                 cocktails_ns.abort(400, 'Search query is required')
             
-            search_term = f"%{query_param}%"
-            
-            # Search in cocktail names, descriptions, and health benefits
-            cocktails = Cocktail.query.filter(
-                db.and_(
-                    Cocktail.is_active == True,
-                    db.or_(
-                        Cocktail.name.ilike(search_term),
-                        Cocktail.description.ilike(search_term),
-                        Cocktail.health_benefits.contains([query_param])
-                    )
-                )
-            ).limit(20).all()
+            fields = parse_fields(request.args.get('fields'), Cocktail.serialized_fields)
+            
+            # Search names, descriptions, health benefits and ingredient names, best match first
+            matching_ids = search_service.search_ids('cocktails', query_param, limit=20)
+            cocktails = search_service.fetch_ranked(
+                Cocktail.query.options(*field_options(Cocktail, fields)).filter_by(is_active=True), Cocktail, matching_ids
+            )
             
-            return [cocktail.to_dict(include_ingredients=False) for cocktail in cocktails]
+            return [cocktail.to_dict(include_ingredients=False, fields=fields) for cocktail in cocktails]
             
+        except InvalidFields as e:
+            cocktails_ns.abort(400, str(e))
         except Exception as e:
             cocktails_ns.abort(500, 'Search failed')
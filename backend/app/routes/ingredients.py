@@ -1,8 +1,14 @@
-from flask import request, jsonify
+from flask import request, jsonify, current_app
 from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from app.models.ingredient import Ingredient, IngredientInteraction
+from app.services import search as search_service
+from app.services import interactions as interactions_service
+from app.services import catalog as catalog_service
+from app.services import seasons as seasons_service
+from app.utils.pagination import InvalidCursor, KeysetPage, decode_cursor, encode_cursor
+from app.utils.fields import InvalidFields, parse_fields, project
 
 # Create namespace for ingredients
 ingredients_ns = Namespace('ingredients', description='Ingredient operations')
@@ -20,10 +26,15 @@ ingredient_model = ingredients_ns.model('Ingredient', {
     'image_url': fields.String(description='Image URL')
 })
 
+ingredient_page_model = ingredients_ns.model('IngredientPage', {
+    'ingredients': fields.List(fields.Nested(ingredient_model), description='Ingredients on this page'),
+    'pagination': fields.Raw(description='Page numbers, or next_cursor in cursor mode')
+})
+
 @ingredients_ns.route('/')
 class IngredientList(Resource):
     @ingredients_ns.doc('list_ingredients')
-    @ingredients_ns.marshal_list_with(ingredient_model)
+    @ingredients_ns.response(200, 'Success', ingredient_page_model)
     def get(self):
         """Get list of ingredients with filtering options"""
         try:
@@ -32,31 +43,68 @@ class IngredientList(Resource):
             category = request.args.get('category')
             is_organic = request.args.get('organic', type=bool)
             is_seasonal = request.args.get('seasonal', type=bool)
+            in_season = seasons_service.month_number(request.args.get('in_season'))
             search = request.args.get('search')
+            cursor = request.args.get('cursor')
+            sort = request.args.get('sort')
+            fields = parse_fields(request.args.get('fields'), Ingredient.serialized_fields)
             
-            query = Ingredient.query.filter_by(is_active=True)
+            # Range predicates such as nutrient=vitamin_c>40 (repeatable, all must hold)
+            nutrient_ranges = [
+                catalog_service.parse_nutrient_range(expression)
+                for param in request.args.getlist('nutrient') for expression in param.split(',') if expression.strip()
+            ]
             
-            if category:
-                query = query.filter_by(category=category)
-            if is_organic is not None:
-                query = query.filter_by(is_organic=is_organic)
-            if is_seasonal is not None:
-                query = query.filter_by(is_seasonal=is_seasonal)
+            # Filtering, ordering and paging run over the in-process catalog snapshot
+            catalog = catalog_service.snapshot()
+            matching_ids = None
             if search:
-                search_term = f"%{search}%"
-                query = query.filter(Ingredient.name.ilike(search_term))
+                matching_ids = search_service.search_ids(
+                    'ingredients', search, limit=current_app.config['SEARCH_MAX_RESULTS']
+                )
+            positions = catalog_service.filter_positions(
+                catalog, category=category, is_organic=is_organic, is_seasonal=is_seasonal,
+                in_season=in_season, nutrient_ranges=nutrient_ranges, ids=matching_ids
+            )
+            
+            if cursor is not None:
+                # Cursor mode pages in name order; search matches follow name order too
+                if cursor:
+                    name, ingredient_id = decode_cursor(cursor, [Ingredient.name, Ingredient.id])
+                    if not isinstance(name, str) or not isinstance(ingredient_id, int):
+                        raise InvalidCursor('Cursor does not match this ordering')
+                    positions = catalog_service.positions_after(catalog, positions, name, ingredient_id)
+                items = [catalog.items[position] for position in positions[:per_page]]
+                next_cursor = None
+                if len(positions) > per_page:
+                    next_cursor = encode_cursor([items[-1]['name'], items[-1]['id']])
+                return {
+                    'ingredients': [project(item, fields) for item in items],
+                    'pagination': KeysetPage(items, per_page, next_cursor).to_dict()
+                }
             
-            query = query.order_by(Ingredient.name)
-            ingredients = query.paginate(page=page, per_page=per_page, error_out=False)
+            # Page mode can also sort by a nutrient (sort=sugar_g, or sort=-vitamin_c for descending)
+            if sort and sort.lstrip('-') != 'name':
+                positions = catalog_service.sort_by_nutrient(
+                    catalog, positions, catalog_service.nutrient_key(sort.lstrip('-')), descending=sort.startswith('-')
+                )
+            elif matching_ids:
+                rank = {ingredient_id: i for i, ingredient_id in enumerate(matching_ids)}
+                positions.sort(key=lambda position: rank[catalog.items[position]['id']])
             
+            start = (max(page, 1) - 1) * per_page
             return {
-                'ingredients': [ing.to_dict() for ing in ingredients.items],
+                'ingredients': [project(catalog.items[position], fields) for position in positions[start:start + per_page]],
                 'pagination': {
                     'page': page,
-                    'pages': ingredients.pages,
-                    'total': ingredients.total
+                    'pages': -(-len(positions) // per_page) if per_page > 0 else 0,
+                    'total': len(positions)
                 }
             }
+        except InvalidCursor:
+            ingredients_ns.abort(400, 'Invalid cursor')
+        except (catalog_service.InvalidNutrientFilter, InvalidFields) as e:
+            ingredients_ns.abort(400, str(e))
         except Exception as e:
             ingredients_ns.abort(500, 'Failed to fetch ingredients')
 
@@ -66,12 +114,93 @@ class IngredientDetail(Resource):
     def get(self, ingredient_id):
         """Get detailed ingredient information"""
         try:
-            ingredient = Ingredient.query.filter_by(id=ingredient_id, is_active=True).first()
-            if not ingredient:
-                ingredients_ns.abort(404, 'Ingredient not found')
-            return ingredient.to_dict(include_detailed=True)
+            fields = parse_fields(request.args.get('fields'), Ingredient.detailed_fields)
+            ingredient = catalog_service.snapshot().detailed.get(ingredient_id)
+        except InvalidFields as e:
+            ingredients_ns.abort(400, str(e))
         except Exception as e:
             ingredients_ns.abort(500, 'Failed to fetch ingredient')
+        
+        if ingredient is None:
+            ingredients_ns.abort(404, 'Ingredient not found')
+        return project(ingredient, fields)
+
+@ingredients_ns.route('/by-slug/<string:slug>')
+class IngredientBySlug(Resource):
+    @ingredients_ns.doc('get_ingredient_by_slug')
+    def get(self, slug):
+        """Get detailed ingredient information by slug"""
+        try:
+            fields = parse_fields(request.args.get('fields'), Ingredient.detailed_fields)
+            catalog = catalog_service.snapshot()
+            ingredient = catalog.detailed.get(catalog.by_slug.get(slug))
+        except InvalidFields as e:
+            ingredients_ns.abort(400, str(e))
+        except Exception as e:
+            ingredients_ns.abort(500, 'Failed to fetch ingredient')
+        
+        if ingredient is None:
+            ingredients_ns.abort(404, 'Ingredient not found')
+        return project(ingredient, fields)
+
+def parse_ingredient_ids(args):
+    """Ingredient IDs from ``ids`` given as a comma-separated list and/or repeated"""
+    values = [value for param in args.getlist('ids') for value in param.split(',')]
+    try:
+        return sorted({int(value) for value in values if value.strip()})
+    except ValueError:
+        ingredients_ns.abort(400, 'IDs must be a comma-separated list of ingredient IDs')
+
+@ingredients_ns.route('/compatibility')
+class IngredientCompatibility(Resource):
+    @ingredients_ns.doc('get_ingredient_compatibility')
+    def get(self):
+        """Get pairwise interactions, conflicts and an overall score for a set of ingredients"""
+        ingredient_ids = parse_ingredient_ids(request.args)
+        if len(ingredient_ids) < 2:
+            ingredients_ns.abort(400, 'At least two ingredient IDs are required')
+        if len(ingredient_ids) > 50:
+            ingredients_ns.abort(400, 'At most 50 ingredients can be compared at once')
+        
+        try:
+            result = interactions_service.compatibility(ingredient_ids)
+            catalog = catalog_service.snapshot()
+            ingredients = [
+                catalog.items[position]
+                for position in catalog_service.filter_positions(catalog, ids=ingredient_ids)
+            ]
+            
+            result['ingredients'] = [
+                {'id': ingredient['id'], 'name': ingredient['name'], 'slug': ingredient['slug']}
+                for ingredient in ingredients
+            ]
+            return result
+            
+        except Exception as e:
+            ingredients_ns.abort(500, 'Failed to score ingredients')
+
+@ingredients_ns.route('/suggest-next')
+class IngredientSuggestions(Resource):
+    @ingredients_ns.doc('suggest_next_ingredient')
+    def get(self):
+        """Suggest ingredients that pair well with the ones already chosen"""
+        ingredient_ids = parse_ingredient_ids(request.args)
+        if not ingredient_ids:
+            ingredients_ns.abort(400, 'At least one ingredient ID is required')
+        
+        try:
+            limit = min(max(request.args.get('limit', 5, type=int), 1), 20)
+            
+            suggestions = interactions_service.suggest(ingredient_ids, limit=limit)
+            catalog = catalog_service.snapshot()
+            
+            return [
+                dict(catalog.items[catalog.by_id[ingredient_id]], compatibility_score=score, interaction_count=links)
+                for ingredient_id, score, links in suggestions if ingredient_id in catalog.by_id
+            ]
+            
+        except Exception as e:
+            ingredients_ns.abort(500, 'Failed to suggest ingredients')
 
 @ingredients_ns.route('/categories')
 class IngredientCategories(Resource):
@@ -79,9 +208,6 @@ class IngredientCategories(Resource):
     def get(self):
         """Get available ingredient categories"""
         try:
-            categories = db.session.query(Ingredient.category).filter(
-                Ingredient.is_active == True
-            ).distinct().all()
-            return [cat[0] for cat in categories if cat[0]]
+            return list(catalog_service.snapshot().categories)
         except Exception as e:
             ingredients_ns.abort(500, 'Failed to fetch categories')
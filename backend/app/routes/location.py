@@ -4,10 +4,15 @@ Location and Contact API routes for SOBRE - Premium Healthy Cocktails
 
 from datetime import datetime
 from flask import Blueprint, request, jsonify, current_app
+from sqlalchemy import select
 from app import db
 from app.models.location import Location, ContactInquiry
 from app.utils.email import send_contact_inquiry_email, send_contact_confirmation_email
 from app.utils.validation import validate_email, validate_phone
+from app.utils.auth import admin_required
+from app.utils.pagination import InvalidCursor, keyset_paginate
+from app.utils.export import csv_response, parse_date_range
+from app.utils.fields import InvalidFields, field_options, parse_fields
 import logging
 
 location_bp = Blueprint('location', __name__, url_prefix='/api/location')
@@ -16,17 +21,21 @@ location_bp = Blueprint('location', __name__, url_prefix='/api/location')
 def get_location_info():
     """Get primary location information"""
     try:
-        location = Location.query.filter_by(is_primary=True, is_active=True).first()
+        fields = parse_fields(request.args.get('fields'), Location.serialized_fields)
+        query = Location.query.options(*field_options(Location, fields))
+        location = query.filter_by(is_primary=True, is_active=True).first()
         
         if not location:
             # Fallback to any active location
-            location = Location.query.filter_by(is_active=True).first()
+            location = query.filter_by(is_active=True).first()
         
         if not location:
             return jsonify({'error': 'No location information available'}), 404
         
-        return jsonify({'location': location.to_dict()}), 200
+        return jsonify({'location': location.to_dict(fields=fields)}), 200
         
+    except InvalidFields as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         current_app.logger.error(f'Error fetching location info: {e}')
         return jsonify({'error': 'Internal server error'}), 500
@@ -36,11 +45,14 @@ def get_location_info():
 def get_all_locations():
     """Get all active locations"""
     try:
-        locations = Location.query.filter_by(is_active=True).all()
+        fields = parse_fields(request.args.get('fields'), Location.serialized_fields)
+        locations = Location.query.options(*field_options(Location, fields)).filter_by(is_active=True).all()
         return jsonify({
-            'locations': [location.to_dict() for location in locations]
+            'locations': [location.to_dict(fields=fields) for location in locations]
         }), 200
         
+    except InvalidFields as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         current_app.logger.error(f'Error fetching locations: {e}')
         return jsonify({'error': 'Internal server error'}), 500
@@ -50,12 +62,15 @@ def get_all_locations():
 def get_location_by_slug(slug):
     """Get a specific location by slug"""
     try:
-        location = Location.query.filter_by(slug=slug, is_active=True).first()
+        fields = parse_fields(request.args.get('fields'), Location.serialized_fields)
+        location = Location.query.options(*field_options(Location, fields)).filter_by(slug=slug, is_active=True).first()
         if not location:
             return jsonify({'error': 'Location not found'}), 404
         
-        return jsonify({'location': location.to_dict()}), 200
+        return jsonify({'location': location.to_dict(fields=fields)}), 200
         
+    except InvalidFields as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         current_app.logger.error(f'Error fetching location: {e}')
         return jsonify({'error': 'Internal server error'}), 500
@@ -190,15 +205,16 @@ def get_directions():
         return jsonify({'error': 'Internal server error'}), 500
 
 
-# Admin routes (would typically require authentication)
+# Admin routes (staff only)
 @location_bp.route('/admin/inquiries', methods=['GET'])
+@admin_required
 def get_all_contact_inquiries():
     """Get all contact inquiries (admin only)"""
     try:
-        # In a real application, add authentication check here
         page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
+        per_page = min(request.args.get('per_page', 20, type=int), 100)
         status = request.args.get('status')
+        cursor = request.args.get('cursor')
         inquiry_type = request.args.get('type')
         
         query = ContactInquiry.query
@@ -208,6 +224,18 @@ def get_all_contact_inquiries():
         if inquiry_type:
             query = query.filter_by(inquiry_type=inquiry_type)
         
+        if cursor is not None:
+            # Cursor mode skips COUNT(*) and OFFSET, so deep pages stay as cheap as the first
+            inquiries = keyset_paginate(
+                query, [(ContactInquiry.created_at, True), (ContactInquiry.id, True)], cursor, per_page
+            )
+            return jsonify({
+                'inquiries': [inquiry.to_dict() for inquiry in inquiries.items],
+                'next_cursor': inquiries.next_cursor,
+                'has_next': inquiries.has_next,
+                'per_page': per_page
+            }), 200
+        
         inquiries = query.order_by(ContactInquiry.created_at.desc()).paginate(
             page=page, per_page=per_page, error_out=False
         )
@@ -220,16 +248,49 @@ def get_all_contact_inquiries():
             'per_page': per_page
         }), 200
         
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
     except Exception as e:
         current_app.logger.error(f'Error fetching contact inquiries: {e}')
         return jsonify({'error': 'Internal server error'}), 500
 
 
+@location_bp.route('/admin/inquiries/export.csv', methods=['GET'])
+@admin_required
+def export_contact_inquiries():
+    """Stream contact inquiries as CSV, filtered by status, type and creation date (admin only)"""
+    try:
+        created_from, created_to = parse_date_range(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        status = request.args.get('status')
+        inquiry_type = request.args.get('type')
+        table = ContactInquiry.__table__
+        
+        statement = select(table).order_by(table.c.created_at, table.c.id)
+        if status:
+            statement = statement.where(table.c.status == status)
+        if inquiry_type:
+            statement = statement.where(table.c.inquiry_type == inquiry_type)
+        if created_from:
+            statement = statement.where(table.c.created_at >= created_from)
+        if created_to:
+            statement = statement.where(table.c.created_at < created_to)
+        
+        return csv_response(statement, 'contact-inquiries.csv')
+        
+    except Exception as e:
+        current_app.logger.error(f'Error exporting contact inquiries: {e}')
+        return jsonify({'error': 'Internal server error'}), 500
+
+
 @location_bp.route('/admin/inquiries/<int:inquiry_id>', methods=['PUT'])
+@admin_required
 def update_contact_inquiry(inquiry_id):
     """Update contact inquiry status and add admin response (admin only)"""
     try:
-        # In a real application, add authentication check here
         inquiry = ContactInquiry.query.get(inquiry_id)
         if not inquiry:
             return jsonify({'error': 'Inquiry not found'}), 404
@@ -261,10 +322,10 @@ def update_contact_inquiry(inquiry_id):
 
 
 @location_bp.route('/admin/locations', methods=['POST'])
+@admin_required
 def create_location():
     """Create a new location (admin only)"""
     try:
-        # In a real application, add authentication check here
         data = request.get_json()
         
         # Validate required fields
@@ -4,10 +4,15 @@ Private Events API routes for SOBRE - Premium Healthy Cocktails
 
 from datetime import datetime, date, time
 from flask import Blueprint, request, jsonify, current_app
+from sqlalchemy import select
 from app import db
 from app.models.private_event import PrivateEventInquiry, EventPackage, EventTestimonial
 from app.utils.email import send_event_inquiry_email, send_event_confirmation_email
 from app.utils.validation import validate_email, validate_phone
+from app.utils.auth import admin_required
+from app.utils.pagination import InvalidCursor, keyset_paginate
+from app.utils.export import csv_response, parse_date_range
+from app.services.cache import cached
 import logging
 
 private_events_bp = Blueprint('private_events', __name__, url_prefix='/api/private-events')
@@ -87,6 +92,7 @@ def submit_event_inquiry():
 
 
 @private_events_bp.route('/packages', methods=['GET'])
+@cached('event_packages')
 def get_event_packages():
     """Get all active event packages"""
     try:
@@ -116,6 +122,7 @@ def get_event_package(slug):
 
 
 @private_events_bp.route('/testimonials', methods=['GET'])
+@cached('event_testimonials')
 def get_event_testimonials():
     """Get approved event testimonials"""
     try:
@@ -133,6 +140,7 @@ def get_event_testimonials():
 
 
 @private_events_bp.route('/featured-testimonials', methods=['GET'])
+@cached('event_testimonials')
 def get_featured_testimonials():
     """Get featured event testimonials"""
     try:
@@ -172,21 +180,34 @@ def get_inquiry_status(inquiry_id):
         return jsonify({'error': 'Internal server error'}), 500
 
 
-# Admin routes (would typically require authentication)
+# Admin routes (staff only)
 @private_events_bp.route('/admin/inquiries', methods=['GET'])
+@admin_required
 def get_all_inquiries():
     """Get all event inquiries (admin only)"""
     try:
-        # In a real application, add authentication check here
         page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 20, type=int)
+        per_page = min(request.args.get('per_page', 20, type=int), 100)
         status = request.args.get('status')
+        cursor = request.args.get('cursor')
         
         query = PrivateEventInquiry.query
         
         if status:
             query = query.filter_by(status=status)
         
+        if cursor is not None:
+            # Cursor mode skips COUNT(*) and OFFSET, so deep pages stay as cheap as the first
+            inquiries = keyset_paginate(
+                query, [(PrivateEventInquiry.created_at, True), (PrivateEventInquiry.id, True)], cursor, per_page
+            )
+            return jsonify({
+                'inquiries': [inquiry.to_dict() for inquiry in inquiries.items],
+                'next_cursor': inquiries.next_cursor,
+                'has_next': inquiries.has_next,
+                'per_page': per_page
+            }), 200
+        
         inquiries = query.order_by(PrivateEventInquiry.created_at.desc()).paginate(
             page=page, per_page=per_page, error_out=False
         )
@@ -199,16 +220,49 @@ def get_all_inquiries():
             'per_page': per_page
         }), 200
         
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
     except Exception as e:
         current_app.logger.error(f'Error fetching inquiries: {e}')
         return jsonify({'error': 'Internal server error'}), 500
 
 
+@private_events_bp.route('/admin/inquiries/export.csv', methods=['GET'])
+@admin_required
+def export_event_inquiries():
+    """Stream event inquiries as CSV, filtered by status, type and creation date (admin only)"""
+    try:
+        created_from, created_to = parse_date_range(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        status = request.args.get('status')
+        inquiry_type = request.args.get('type')
+        table = PrivateEventInquiry.__table__
+        
+        statement = select(table).order_by(table.c.created_at, table.c.id)
+        if status:
+            statement = statement.where(table.c.status == status)
+        if inquiry_type:
+            statement = statement.where(table.c.event_type == inquiry_type)
+        if created_from:
+            statement = statement.where(table.c.created_at >= created_from)
+        if created_to:
+            statement = statement.where(table.c.created_at < created_to)
+        
+        return csv_response(statement, 'event-inquiries.csv')
+        
+    except Exception as e:
+        current_app.logger.error(f'Error exporting event inquiries: {e}')
+        return jsonify({'error': 'Internal server error'}), 500
+
+
 @private_events_bp.route('/admin/inquiries/<int:inquiry_id>', methods=['PUT'])
+@admin_required
 def update_inquiry_status(inquiry_id):
     """Update inquiry status and add admin notes (admin only)"""
     try:
-        # In a real application, add authentication check here
         inquiry = PrivateEventInquiry.query.get(inquiry_id)
         if not inquiry:
             return jsonify({'error': 'Inquiry not found'}), 404
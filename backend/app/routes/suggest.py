@@ -0,0 +1,28 @@
+from flask import request
+from flask_restx import Namespace, Resource
+from app.services import suggest as suggest_service
+
+# Create namespace for typeahead suggestions
+suggest_ns = Namespace('suggest', description='Search-as-you-type suggestions')
+
+@suggest_ns.route('')
+class Suggestions(Resource):
+    @suggest_ns.doc('suggest', params={
+        'q': 'Partially typed search text',
+        'limit': 'Suggestions per type (max 20)',
+        'types': 'Comma-separated subset of cocktails, ingredients, health_benefits'
+    })
+    def get(self):
+        """Cocktail, ingredient and health benefit suggestions for a partially typed query"""
+        try:
+            query = request.args.get('q', '')
+            limit = request.args.get('limit', 8, type=int)
+            types = [
+                suggestion_type for suggestion_type in suggest_service.SUGGESTION_TYPES
+                if suggestion_type in request.args.get('types', ','.join(suggest_service.SUGGESTION_TYPES)).split(',')
+            ]
+            
+            return dict(suggest_service.suggest(query, limit=limit, types=types), query=query)
+            
+        except Exception as e:
+            suggest_ns.abort(500, 'Failed to fetch suggestions')
@@ -3,8 +3,13 @@ from flask_restx import Namespace, Resource, fields
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from marshmallow import Schema, fields as ma_fields, validate, ValidationError
 from app import db
-from app.models.user import User
+from app.models.user import user_favorite_cocktails
 from app.models.cocktail import Cocktail
+from app.services import dashboard
+from app.services.identity import current_user_model
+from app.services import favorites as favorites_service
+from app.utils.pagination import InvalidCursor, keyset_paginate
+from app.utils.fields import InvalidFields, field_options, parse_fields
 
 # Create namespace for users
 users_ns = Namespace('users', description='User profile operations')
@@ -47,8 +52,7 @@ class UserProfile(Resource):
     def get(self):
         """Get current user's profile"""
         try:
-            current_user_id = get_jwt_identity()
-            user = User.query.get(current_user_id)
+            user = current_user_model()
             
             if not user:
                 users_ns.abort(404, 'User not found')
@@ -65,8 +69,7 @@ class UserProfile(Resource):
     def put(self):
         """Update current user's profile"""
         try:
-            current_user_id = get_jwt_identity()
-            user = User.query.get(current_user_id)
+            user = current_user_model()
             
             if not user:
                 users_ns.abort(404, 'User not found')
@@ -95,66 +98,72 @@ class UserFavorites(Resource):
     @jwt_required()
     @users_ns.doc('get_user_favorites')
     def get(self):
-        """Get current user's favorite cocktails"""
+        """Get current user's favorite cocktails, most recently favorited first"""
         try:
             current_user_id = get_jwt_identity()
-            user = User.query.get(current_user_id)
+            per_page = min(request.args.get('per_page', 20, type=int), 100)
+            cursor = request.args.get('cursor')
+            fields = parse_fields(request.args.get('fields'), Cocktail.serialized_fields)
             
-            if not user:
-                users_ns.abort(404, 'User not found')
-            
-            favorites = [cocktail.to_dict(include_ingredients=False) 
-                        for cocktail in user.favorite_cocktails]
+            query = favorites_service.favorites_query(current_user_id, field_options(Cocktail, fields))
+            page = keyset_paginate(
+                query, [(user_favorite_cocktails.c.created_at, True), (user_favorite_cocktails.c.cocktail_id, True)],
+                cursor, per_page
+            )
             
             return {
-                'favorites': favorites,
-                'total': len(favorites)
+                'favorites': [row.Cocktail.to_dict(include_ingredients=False, fields=fields) for row in page.items],
+                'total': favorites_service.favorites_count(current_user_id),
+                'pagination': page.to_dict()
             }
             
+        except InvalidCursor:
+            users_ns.abort(400, 'Invalid cursor')
+        except InvalidFields as e:
+            users_ns.abort(400, str(e))
         except Exception as e:
             users_ns.abort(500, 'Failed to fetch favorites')
 
-@users_ns.route('/dashboard')
-class UserDashboard(Resource):
+@users_ns.route('/favorites/lookup')
+class UserFavoriteLookup(Resource):
     @jwt_required()
-    @users_ns.doc('get_user_dashboard')
+    @users_ns.doc('lookup_user_favorites', params={'ids': 'Comma-separated cocktail IDs'})
     def get(self):
-        """Get user dashboard data"""
+        """Which of the given cocktails the current user has favorited"""
+        try:
+            cocktail_ids = {int(value) for value in request.args.get('ids', '').split(',') if value.strip()}
+        except ValueError:
+            users_ns.abort(400, 'ids must be comma-separated integers')
+        if len(cocktail_ids) > favorites_service.MAX_LOOKUP_IDS:
+            users_ns.abort(400, f'At most {favorites_service.MAX_LOOKUP_IDS} ids per lookup')
+        
         try:
             current_user_id = get_jwt_identity()
-            user = User.query.get(current_user_id)
-            
-            if not user:
-                users_ns.abort(404, 'User not found')
-            
-            # Get user statistics
-            favorites_count = len(user.favorite_cocktails)
-            reviews_count = user.cocktail_reviews.count()
-            bookings_count = user.class_bookings.count()
-            active_subscriptions = user.subscriptions.filter_by(status='active').count()
-            
-            # Get recent activity (last 5 favorite cocktails)
-            recent_favorites = [cocktail.to_dict(include_ingredients=False) 
-                              for cocktail in user.favorite_cocktails[-5:]]
-            
-            # Get upcoming class bookings
-            upcoming_classes = [booking.to_dict() 
-                              for booking in user.class_bookings.filter_by(status='confirmed').limit(3)]
+            favorite_ids = favorites_service.favorite_ids(current_user_id, cocktail_ids)
             
             return {
-                'user': user.to_dict(),
-                'statistics': {
-                    'favorites_count': favorites_count,
-                    'reviews_count': reviews_count,
-                    'bookings_count': bookings_count,
-                    'active_subscriptions': active_subscriptions
-                },
-                'recent_favorites': recent_favorites,
-                'upcoming_classes': upcoming_classes
+                'favorites': {str(cocktail_id): cocktail_id in favorite_ids for cocktail_id in sorted(cocktail_ids)}
             }
             
+        except Exception as e:
+            users_ns.abort(500, 'Failed to look up favorites')
+
+@users_ns.route('/dashboard')
+class UserDashboard(Resource):
+    @jwt_required()
+    @users_ns.doc('get_user_dashboard')
+    def get(self):
+        """Get user dashboard data"""
+        try:
+            current_user_id = get_jwt_identity()
+            data = dashboard.dashboard(current_user_id)
         except Exception as e:
             users_ns.abort(500, 'Failed to fetch dashboard data')
+        
+        if data is None:
+            users_ns.abort(404, 'User not found')
+        
+        return data
 
 @users_ns.route('/preferences')
 class UserPreferences(Resource):
@@ -0,0 +1,3 @@
+"""
+Business logic services for SOBRE - Premium Healthy Cocktails
+"""
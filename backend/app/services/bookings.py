@@ -0,0 +1,116 @@
+"""
+Class capacity maintenance for SOBRE - Premium Healthy Cocktails
+
+Each virtual class stores how many of its bookings are confirmed. Booking
+writes apply their delta inside the flushing transaction with a single
+conditional UPDATE (``... WHERE confirmed_count + n <= max_participants``),
+so the capacity check and the seat claim are one atomic statement: two
+bookers racing for the last seat cannot both match the row. When no row
+matches the flush fails with ``ClassFull`` and the booking is rolled back.
+"""
+
+from collections import defaultdict
+
+from sqlalchemy import and_, func, or_, select, update
+
+from app import db
+from app.models.virtual_class import ClassBooking, VirtualClass
+from app.services.cache import invalidate_after_commit
+from app.services.events import expire_loaded, on_flush, previous_value
+
+CONFIRMED = 'confirmed'
+
+
+class ClassFull(Exception):
+    """Raised from a flush that would confirm more bookings than a class has seats"""
+
+    def __init__(self, class_id):
+        super().__init__(f'Virtual class {class_id} is fully booked')
+        self.class_id = class_id
+
+
+def _seat(class_id, status):
+    """The class a booking holds a seat in, if any"""
+    if class_id is None or status != CONFIRMED:
+        return None
+    return class_id
+
+
+def _apply_deltas(conn, deltas):
+    classes = VirtualClass.__table__
+    # Release seats first so a booking moved between classes frees its old seat
+    for class_id, n in sorted(deltas.items(), key=lambda item: item[1]):
+        if n < 0:
+            conn.execute(
+                update(classes).where(classes.c.id == class_id)
+                .values(confirmed_count=db.case(
+                    (classes.c.confirmed_count + n > 0, classes.c.confirmed_count + n), else_=0
+                ))
+            )
+            continue
+
+        result = conn.execute(
+            update(classes)
+            .where(
+                classes.c.id == class_id,
+                or_(classes.c.max_participants.is_(None),
+                    classes.c.confirmed_count + n <= classes.c.max_participants)
+            )
+            .values(confirmed_count=classes.c.confirmed_count + n)
+        )
+        if result.rowcount == 0:
+            raise ClassFull(class_id)
+
+
+@on_flush(ClassBooking)
+def _update_confirmed_count_on_flush(session, written, deleted):
+    deltas = defaultdict(int)
+
+    for booking in written + deleted:
+        if booking in session.new:
+            before = None
+        else:
+            before = _seat(previous_value(booking, 'virtual_class_id'), previous_value(booking, 'status'))
+
+        if booking in session.deleted:
+            after = None
+        else:
+            after = _seat(booking.virtual_class_id, booking.status)
+
+        if before == after:
+            continue
+        if before:
+            deltas[before] -= 1
+        if after:
+            deltas[after] += 1
+
+    deltas = {class_id: n for class_id, n in deltas.items() if n}
+    if not deltas:
+        return
+
+    _apply_deltas(session.connection(), deltas)
+    invalidate_after_commit(session, VirtualClass.__tablename__)
+
+    expire_loaded(session, VirtualClass, deltas, ['confirmed_count'])
+
+
+def recompute_all(conn=None):
+    """Recompute every class's confirmed count from its bookings in one UPDATE
+
+    Runs on ``conn`` when given (a migration passes its own), otherwise in the
+    session, committing it.
+    """
+    classes = VirtualClass.__table__
+    bookings = ClassBooking.__table__
+    confirmed = (
+        select(func.count(bookings.c.id))
+        .where(and_(bookings.c.virtual_class_id == classes.c.id, bookings.c.status == CONFIRMED))
+        .scalar_subquery()
+    )
+
+    statement = update(classes).values(confirmed_count=confirmed)
+    if conn is not None:
+        return conn.execute(statement).rowcount
+    result = db.session.execute(statement)
+    db.session.commit()
+    return result.rowcount
@@ -0,0 +1,386 @@
+"""
+Response cache for SOBRE - Premium Healthy Cocktails
+
+Read-mostly public endpoints are cached under their normalized path and query
+arguments. Lookups go to an in-process LRU first and to Redis (``REDIS_URL``)
+second; when Redis is unreachable the cache keeps working in memory only.
+Concurrent misses for the same key share one computation.
+
+Entries are tagged with table names. Every committed write to a table bumps
+that tag's version, and because the versions are part of the cache key all
+entries built from the old data stop matching at once. The versions are
+shared between processes through Redis; without it each process only sees
+its own writes, and another worker's cached entries can stay stale for up to
+their TTL.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import urlencode
+
+from flask import Response, current_app, request
+
+from app import db
+from app.services.events import on_flush, after_commit
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - redis is in requirements.txt
+    redis = None
+
+
+class LocalLRU:
+    """Thread-safe LRU of ``key -> value`` with per-entry expiry"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class _Flight:
+    """A computation in progress that other requests for the same key wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class ResponseCache:
+    """Two-tier cache with tag-versioned keys and request coalescing"""
+
+    KEY_PREFIX = 'coco-tails:cache:'
+    RETRY_AFTER_SECONDS = 30
+
+    def __init__(self, app):
+        self.enabled = app.config.get('CACHE_ENABLED', True)
+        self.default_ttl = app.config.get('CACHE_DEFAULT_TTL', 300)
+        self.local = LocalLRU(app.config.get('CACHE_LOCAL_MAX_ENTRIES', 1024))
+
+        self._redis_url = app.config.get('REDIS_URL') if app.config.get('CACHE_REDIS_ENABLED', True) else None
+        self._redis = None
+        self._redis_retry_at = 0.0
+
+        self._versions = {}
+        self._versions_lock = threading.Lock()
+        self._flights = {}
+        self._flights_lock = threading.Lock()
+
+    # Redis tier
+
+    def _client(self):
+        """Redis client, or None while Redis is disabled or unreachable"""
+        if redis is None or not self._redis_url:
+            return None
+        if self._redis is None and time.monotonic() >= self._redis_retry_at:
+            try:
+                client = redis.Redis.from_url(
+                    self._redis_url, socket_timeout=0.25, socket_connect_timeout=0.25
+                )
+                client.ping()
+                self._redis = client
+            except redis.RedisError as e:
+                self._redis_down(e)
+        return self._redis
+
+    def _redis_down(self, error):
+        current_app.logger.warning(f'Response cache falling back to memory only: {error}')
+        self._redis = None
+        self._redis_retry_at = time.monotonic() + self.RETRY_AFTER_SECONDS
+
+    # Tag versions
+
+    def shares_versions(self):
+        """Whether tag versions are currently shared with other processes through Redis"""
+        return self._client() is not None
+
+    def versions(self, tags):
+        """Current version of each tag, shared through Redis when available"""
+        client = self._client()
+        if client is not None and tags:
+            try:
+                values = client.mget([f'{self.KEY_PREFIX}tag:{tag}' for tag in tags])
+                return tuple(int(value or 0) for value in values)
+            except redis.RedisError as e:
+                self._redis_down(e)
+        with self._versions_lock:
+            return tuple(self._versions.get(tag, 0) for tag in tags)
+
+    def invalidate(self, *tags):
+        """Bump ``tags`` so every entry built from them is treated as stale"""
+        with self._versions_lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+
+        client = self._client()
+        if client is not None:
+            try:
+                pipeline = client.pipeline(transaction=False)
+                for tag in tags:
+                    pipeline.incr(f'{self.KEY_PREFIX}tag:{tag}')
+                pipeline.execute()
+            except redis.RedisError as e:
+                self._redis_down(e)
+
+    def clear(self):
+        """Drop every locally cached entry"""
+        self.local.clear()
+
+    # Entries
+
+    def _load(self, key):
+        entry = self.local.get(key)
+        if entry is not None:
+            return entry
+
+        client = self._client()
+        if client is None:
+            return None
+        try:
+            raw = client.get(f'{self.KEY_PREFIX}{key}')
+        except redis.RedisError as e:
+            self._redis_down(e)
+            return None
+        if raw is None:
+            return None
+
+        entry = json.loads(raw)
+        self.local.set(key, entry, self.default_ttl)
+        return entry
+
+    def _store(self, key, entry, ttl):
+        self.local.set(key, entry, ttl)
+        client = self._client()
+        if client is None:
+            return
+        try:
+            client.set(f'{self.KEY_PREFIX}{key}', json.dumps(entry), ex=ttl)
+        except redis.RedisError as e:
+            self._redis_down(e)
+
+    def _singleflight(self, key, compute):
+        """Run ``compute`` once per key no matter how many requests miss together"""
+        with self._flights_lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = compute()
+            return flight.value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._flights_lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def fetch(self, key, tags, ttl, compute):
+        """Return the cached entry for ``key``, computing and storing it on a miss"""
+        key = f'{key}#{".".join(str(version) for version in self.versions(tags))}'
+        entry = self._load(key)
+        if entry is not None:
+            return entry
+
+        def compute_and_store():
+            entry = compute()
+            if entry is not None:
+                self._store(key, entry, ttl or self.default_ttl)
+            return entry
+
+        return self._singleflight(key, compute_and_store)
+
+
+def init_app(app):
+    """Register the response cache on the application"""
+    app.extensions['response_cache'] = ResponseCache(app)
+
+
+def _cache():
+    return current_app.extensions.get('response_cache')
+
+
+def request_key():
+    """Cache key for the current request: normalized path plus sorted query arguments"""
+    path = request.path.rstrip('/') or '/'
+    args = sorted((name, value) for name in request.args for value in request.args.getlist(name))
+    return f'{path}?{urlencode(args)}' if args else path
+
+
+def _to_entry(result):
+    """Serializable form of a view result, or None if it shouldn't be cached"""
+    status = 200
+    if isinstance(result, tuple):
+        result, status = result[0], result[1]
+    if status != 200:
+        return None
+    if isinstance(result, Response):
+        return {'body': result.get_data(as_text=True), 'mimetype': result.mimetype}
+    return {'data': result}
+
+
+def _from_entry(entry):
+    if 'body' in entry:
+        return Response(entry['body'], status=200, mimetype=entry['mimetype'])
+    return entry['data']
+
+
+def cached(*tags, ttl=None):
+    """Cache a GET view's successful result until any of ``tags`` (table names) is written"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            cache = _cache()
+            if cache is None or not cache.enabled or request.method != 'GET':
+                return view(*args, **kwargs)
+
+            computed = []
+
+            def compute():
+                result = view(*args, **kwargs)
+                computed.append(result)
+                return _to_entry(result)
+
+            entry = cache.fetch(request_key(), tags, ttl, compute)
+            if entry is None:
+                # Not cacheable (e.g. an error response): hand back what the view returned
+                return computed[0] if computed else view(*args, **kwargs)
+            return _from_entry(entry)
+        return wrapper
+    return decorator
+
+
+def cached_value(key, tags, compute, ttl=None):
+    """``compute()`` cached under ``key`` until any of ``tags`` is invalidated
+
+    For views whose result depends on more than the request URL, such as
+    per-user payloads. ``compute`` must return a JSON-serializable value.
+    """
+    cache = _cache()
+    if cache is None or not cache.enabled:
+        return compute()
+    return cache.fetch(key, tags, ttl, compute)
+
+
+def user_tag(user_id):
+    """Tag of the cached data belonging to one user"""
+    return f'user:{user_id}'
+
+
+def versions(*tags):
+    """Current versions of ``tags``, for in-process structures derived from those tables"""
+    cache = _cache()
+    return cache.versions(tags) if cache is not None else None
+
+
+def versions_shared():
+    """Whether ``versions`` reflects writes committed by other processes"""
+    cache = _cache()
+    return cache is not None and cache.shares_versions()
+
+
+class DerivedIndex:
+    """In-process structure built from ``source_tables`` and rebuilt after they are written
+
+    Subclasses implement ``build(version)``, where ``version`` stamps the
+    source table versions the structure reflects. The versions are read on
+    every access; while they are shared through Redis, writes committed by
+    any worker are picked up on the next one. Without Redis only this
+    process's writes bump them, so the structure is also rebuilt once it is
+    older than ``DERIVED_INDEX_MAX_AGE`` seconds, which bounds how long other
+    workers' writes go unseen. ``max_age_setting`` names a config value that
+    limits the age even while versions are shared, for structures that also
+    read data whose writes don't bump ``source_tables``.
+    """
+
+    source_tables = ()
+    max_age_setting = None
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._current = None
+
+    def build(self, version):
+        raise NotImplementedError
+
+    @staticmethod
+    def _is_fresh(current, tags, max_age):
+        return current is not None and current[0] == tags and (
+            max_age is None or time.monotonic() - current[1] <= max_age
+        )
+
+    def current(self):
+        """The structure, rebuilt first if a source table changed since it was built"""
+        tags = versions(*self.source_tables)
+        max_age = None if versions_shared() else current_app.config.get('DERIVED_INDEX_MAX_AGE', 60)
+        if self.max_age_setting and current_app.config.get(self.max_age_setting) is not None:
+            limit = current_app.config[self.max_age_setting]
+            max_age = limit if max_age is None else min(max_age, limit)
+        current = self._current
+        if self._is_fresh(current, tags, max_age):
+            return current[2]
+        with self._lock:
+            if not self._is_fresh(self._current, tags, max_age):
+                built_at = time.monotonic()
+                self._current = (tags, built_at, self.build(tags))
+            return self._current[2]
+
+    def reset(self):
+        """Drop the structure so the next access rebuilds it"""
+        with self._lock:
+            self._current = None
+
+
+def invalidate(*tags):
+    """Invalidate ``tags`` now, for writes made outside the ORM session"""
+    cache = _cache()
+    if cache is not None and tags:
+        cache.invalidate(*tags)
+
+
+def invalidate_after_commit(session, *tags):
+    """Invalidate ``tags`` once the session's transaction commits"""
+    cache = _cache()
+    if cache is not None and tags:
+        after_commit(session, lambda: cache.invalidate(*tags))
+
+
+@on_flush(db.Model)
+def _invalidate_on_flush(session, written, deleted):
+    tags = {type(obj).__tablename__ for obj in written + deleted}
+    invalidate_after_commit(session, *sorted(tags))
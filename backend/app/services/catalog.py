@@ -0,0 +1,196 @@
+"""
+Ingredient catalog snapshot for SOBRE - Premium Healthy Cocktails
+
+The active ingredients are small and read-mostly, so they are held in process
+as an immutable snapshot of pre-serialized dicts, sorted by name and indexed
+by id, slug and category. Ingredient reads filter, sort and page over the
+snapshot without querying the database.
+
+A snapshot carries the ``ingredients`` tag version it was built from. When an
+ingredient row is written the version moves on, the next read builds a fresh
+snapshot and swaps it in whole; readers holding the old one keep a consistent view.
+Treat everything in a snapshot as read-only.
+
+Nutrient values (the numeric nutrition columns plus every key of the
+``vitamins``/``minerals`` JSON) are also held column-wise as NumPy arrays
+aligned with the items, NaN where an ingredient has no value, so range
+predicates such as ``vitamin_c>40`` are evaluated vectorized.
+"""
+
+import operator
+import re
+from bisect import bisect_right
+from collections import namedtuple
+
+import numpy as np
+from flask import current_app
+
+from app.models.ingredient import Ingredient
+from app.services.cache import DerivedIndex
+from app.services.nutrition import nutrient_key
+from app.services.seasons import month_bit
+
+Snapshot = namedtuple(
+    'Snapshot',
+    'version items detailed by_id by_slug by_category organic seasonal season_masks nutrients categories'
+)
+
+# Numeric Ingredient columns exposed as nutrients
+NUTRIENT_COLUMNS = (
+    'calories_per_100g', 'protein_g', 'carbs_g', 'fiber_g', 'sugar_g', 'fat_g', 'sodium_mg', 'glycemic_index'
+)
+
+_OPERATORS = {
+    '>=': operator.ge, '<=': operator.le, '>': operator.gt, '<': operator.lt, '=': operator.eq
+}
+
+_RANGE_RE = re.compile(r'^\s*([a-z0-9_]+)\s*(>=|<=|>|<|=)\s*(-?\d+(?:\.\d+)?)\s*$')
+
+
+class InvalidNutrientFilter(ValueError):
+    """Raised when a nutrient range predicate can't be parsed"""
+
+
+def _name_key(name, ingredient_id):
+    """Sort key of the snapshot's name order"""
+    return name, ingredient_id
+
+
+def _nutrient_columns(ingredients):
+    values = {column: [getattr(ingredient, column) for ingredient in ingredients] for column in NUTRIENT_COLUMNS}
+    for position, ingredient in enumerate(ingredients):
+        for amounts in (ingredient.vitamins, ingredient.minerals):
+            if not isinstance(amounts, dict):
+                continue
+            for name, amount in amounts.items():
+                key = nutrient_key(name)
+                if key and key not in NUTRIENT_COLUMNS:
+                    values.setdefault(key, [None] * len(ingredients))[position] = amount
+
+    columns = {}
+    for key, column in values.items():
+        array = np.full(len(ingredients), np.nan)
+        for position, value in enumerate(column):
+            try:
+                array[position] = float(value)
+            except (TypeError, ValueError):
+                pass
+        array.flags.writeable = False
+        columns[key] = array
+    return columns
+
+
+class IngredientCatalog(DerivedIndex):
+    """Versioned snapshot of the active ingredient catalog"""
+
+    source_tables = (Ingredient.__tablename__,)
+
+    def build(self, version):
+        # Sorted here rather than with ORDER BY: a database collation can order names differently from
+        # the Python comparison positions_after bisects with, which would skip or repeat rows across pages
+        ingredients = sorted(
+            Ingredient.query.filter_by(is_active=True),
+            key=lambda ingredient: _name_key(ingredient.name, ingredient.id)
+        )
+
+        by_category = {}
+        for position, ingredient in enumerate(ingredients):
+            if ingredient.category:
+                by_category.setdefault(ingredient.category, []).append(position)
+
+        return Snapshot(
+            version='.'.join(str(part) for part in version or ()),
+            items=tuple(ingredient.to_dict() for ingredient in ingredients),
+            detailed={ingredient.id: ingredient.to_dict(include_detailed=True) for ingredient in ingredients},
+            by_id={ingredient.id: position for position, ingredient in enumerate(ingredients)},
+            by_slug={ingredient.slug: ingredient.id for ingredient in ingredients},
+            by_category={category: tuple(positions) for category, positions in by_category.items()},
+            organic=frozenset(position for position, ingredient in enumerate(ingredients) if ingredient.is_organic),
+            seasonal=frozenset(position for position, ingredient in enumerate(ingredients) if ingredient.is_seasonal),
+            season_masks=tuple(ingredient.season_mask for ingredient in ingredients),
+            nutrients=_nutrient_columns(ingredients),
+            categories=tuple(sorted(by_category))
+        )
+
+
+def init_app(app):
+    """Register the ingredient catalog on the application"""
+    app.extensions['ingredient_catalog'] = IngredientCatalog()
+
+
+def snapshot():
+    """The current catalog snapshot"""
+    return current_app.extensions['ingredient_catalog'].current()
+
+
+def parse_nutrient_range(expression):
+    """``(nutrient, operator, value)`` from a predicate such as ``vitamin_c>40``"""
+    match = _RANGE_RE.match(expression.lower())
+    if not match:
+        raise InvalidNutrientFilter(f'Invalid nutrient filter: {expression}')
+    name, op, value = match.groups()
+    return nutrient_key(name), _OPERATORS[op], float(value)
+
+
+def nutrient_mask(catalog, ranges):
+    """Boolean array over ``catalog.items`` for items satisfying every range in ``ranges``
+
+    Items without a value for a nutrient never match a predicate on it.
+    """
+    mask = np.ones(len(catalog.items), dtype=bool)
+    for name, op, value in ranges:
+        column = catalog.nutrients.get(name)
+        if column is None:
+            return np.zeros(len(catalog.items), dtype=bool)
+        with np.errstate(invalid='ignore'):
+            mask &= op(column, value)
+    return mask
+
+
+def sort_by_nutrient(catalog, positions, name, descending=False):
+    """``positions`` ordered by a nutrient, missing values last and name order within ties"""
+    column = catalog.nutrients.get(name)
+    if column is None or not positions:
+        return positions
+    positions = np.asarray(positions)
+    values = column[positions]
+    keys = np.where(np.isnan(values), np.inf, -values if descending else values)
+    return positions[np.argsort(keys, kind='stable')].tolist()
+
+
+def filter_positions(catalog, category=None, is_organic=None, is_seasonal=None, in_season=None,
+                     nutrient_ranges=None, ids=None):
+    """Positions in ``catalog.items`` (name order) matching the filters
+
+    ``in_season`` is a month (1-12) tested against each ingredient's season
+    mask; ``nutrient_ranges`` are parsed predicates from ``parse_nutrient_range``.
+    """
+    if category:
+        positions = catalog.by_category.get(category, ())
+    else:
+        positions = range(len(catalog.items))
+
+    if ids is not None:
+        wanted = {catalog.by_id[ingredient_id] for ingredient_id in ids if ingredient_id in catalog.by_id}
+        positions = [position for position in positions if position in wanted]
+    if is_organic is not None:
+        positions = [position for position in positions if (position in catalog.organic) == is_organic]
+    if is_seasonal is not None:
+        positions = [position for position in positions if (position in catalog.seasonal) == is_seasonal]
+    if in_season is not None:
+        bit = month_bit(in_season)
+        positions = [position for position in positions if catalog.season_masks[position] & bit]
+    positions = list(positions)
+    if nutrient_ranges and positions:
+        index = np.asarray(positions, dtype=np.int64)
+        positions = index[nutrient_mask(catalog, nutrient_ranges)[index]].tolist()
+    return positions
+
+
+def positions_after(catalog, positions, name, ingredient_id):
+    """The part of ``positions`` (name order) sorting after ``(name, ingredient_id)``"""
+    start = bisect_right(
+        positions, _name_key(name, ingredient_id),
+        key=lambda position: _name_key(catalog.items[position]['name'], catalog.items[position]['id'])
+    )
+    return positions[start:]
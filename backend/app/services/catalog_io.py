@@ -0,0 +1,409 @@
+"""
+Bulk catalog import and export for SOBRE - Premium Healthy Cocktails
+
+Ingredients, cocktails (with their recipe lines) and event packages stream
+to and from NDJSON or CSV, one record per line. Records are keyed by
+``slug``: an import updates the rows whose slug already exists and inserts
+the rest. A cocktail's recipe is a list of ``{"ingredient": <slug>, ...}``
+lines under ``ingredients``; in CSV, list and object values are JSON-encoded
+cells.
+
+Both directions work in fixed-size batches, so memory stays flat however
+large the file is. An import batch is validated, then written with one
+executemany INSERT and one executemany UPDATE. Core writes bypass the ORM
+flush hooks, so each batch refreshes the derived tag, season and nutrition
+columns of the cocktails it touched. Once the import commits, the search
+indexes, similarity lists and response cache are refreshed.
+"""
+
+import csv
+import json
+from collections import namedtuple
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy import types as sqltypes
+
+from app import db
+from app.models.cocktail import Cocktail, CocktailIngredient
+from app.models.ingredient import Ingredient
+from app.models.private_event import EventPackage
+from app.services import cache, nutrition, search, seasons, similarity, suggest
+from app.services import tags as tags_service
+from app.services.events import chunks
+
+FORMATS = ('ndjson', 'csv')
+
+# Columns that are never imported: keys, timestamps and columns maintained by services
+_EXCLUDED = {'id', 'created_at', 'updated_at', 'season_mask', 'average_rating', 'favorite_count'}
+
+_DERIVED_PREFIXES = ('nutrition_', 'rating_')
+
+_LINE_FIELDS = ('quantity', 'unit', 'preparation_note', 'order_index', 'is_garnish', 'is_optional')
+
+_TRUE = {'1', 'true', 'yes', 'y', 't'}
+_FALSE = {'0', 'false', 'no', 'n', 'f'}
+
+# Validation errors reported in full; the rest are only counted
+MAX_REPORTED_ERRORS = 50
+
+Kind = namedtuple('Kind', 'model columns')
+
+ImportResult = namedtuple('ImportResult', 'inserted updated skipped errors')
+
+
+def _importable(model):
+    return tuple(
+        column for column in model.__table__.columns
+        if column.key not in _EXCLUDED and not column.key.startswith(_DERIVED_PREFIXES)
+    )
+
+
+KINDS = {
+    'ingredients': Kind(Ingredient, _importable(Ingredient)),
+    'cocktails': Kind(Cocktail, _importable(Cocktail)),
+    'packages': Kind(EventPackage, _importable(EventPackage))
+}
+
+
+class RowError(ValueError):
+    """Raised when a record can't be imported"""
+
+
+def _coerce(column, value):
+    """``value`` converted to what ``column`` stores; '' and None are NULL"""
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    kind = column.type
+    try:
+        if isinstance(kind, sqltypes.JSON):
+            return json.loads(value) if isinstance(value, str) else value
+        if isinstance(kind, sqltypes.Boolean):
+            if isinstance(value, bool):
+                return value
+            text = str(value).strip().lower()
+            if text in _TRUE or text in _FALSE:
+                return text in _TRUE
+            raise ValueError(value)
+        if isinstance(kind, sqltypes.Integer):
+            number = float(value)
+            if not number.is_integer():
+                raise ValueError(value)
+            return int(number)
+        if isinstance(kind, sqltypes.Float):
+            return float(value)
+        if isinstance(kind, sqltypes.Numeric):
+            return Decimal(str(value))
+        if isinstance(kind, sqltypes.String):
+            text = str(value)
+            if kind.length is not None and len(text) > kind.length:
+                raise RowError(f'{column.key} is longer than {kind.length} characters')
+            return text
+    except RowError:
+        raise
+    except (TypeError, ValueError, InvalidOperation) as e:
+        raise RowError(f'{column.key}: invalid value {value!r}') from e
+    return value
+
+
+def _required(column):
+    return (not column.nullable and not column.primary_key
+            and column.default is None and column.server_default is None)
+
+
+def _validate(kind, record):
+    """Column values of ``record`` (plus raw recipe lines for cocktails)"""
+    if not isinstance(record, dict):
+        raise RowError('Record is not a JSON object')
+    if None in record:
+        # csv.DictReader files cells beyond the header under None
+        raise RowError('Row has more cells than the header')
+    columns = {column.key: column for column in kind.columns}
+    unknown = sorted(set(record) - set(columns) - ({'ingredients'} if kind.model is Cocktail else set()))
+    if unknown:
+        raise RowError(f"Unknown fields: {', '.join(unknown)}")
+    if not record.get('slug'):
+        raise RowError('slug is required')
+
+    values = {key: _coerce(columns[key], value) for key, value in record.items() if key in columns}
+    for key, value in values.items():
+        if value is None and not columns[key].nullable:
+            raise RowError(f'{key} is required')
+    if kind.model is Ingredient and 'peak_season_months' in values:
+        values['season_mask'] = seasons.season_mask(values['peak_season_months'])
+
+    lines = None
+    if 'ingredients' in record:
+        lines = record['ingredients']
+        if isinstance(lines, str):
+            try:
+                lines = json.loads(lines) if lines.strip() else []
+            except ValueError as e:
+                raise RowError('ingredients: invalid JSON') from e
+        if not isinstance(lines, list) or not all(isinstance(line, dict) and line.get('ingredient') for line in lines):
+            raise RowError('ingredients must be a list of objects with an ingredient slug')
+    return values, lines
+
+
+def _recipe_rows(cocktail_id, lines, ingredient_ids):
+    table = CocktailIngredient.__table__
+    rows = []
+    for position, line in enumerate(lines):
+        ingredient_id = ingredient_ids.get(line['ingredient'])
+        if ingredient_id is None:
+            raise RowError(f"Unknown ingredient: {line['ingredient']}")
+        row = {'cocktail_id': cocktail_id, 'ingredient_id': ingredient_id}
+        for field in _LINE_FIELDS:
+            row[field] = _coerce(table.c[field], line.get(field))
+        if row['order_index'] is None:
+            row['order_index'] = position
+        if row['quantity'] is None or not row['unit']:
+            raise RowError(f"Recipe line for {line['ingredient']} needs a quantity and a unit")
+        rows.append(row)
+    return rows
+
+
+def _slug_ids(conn, model, slugs):
+    table = model.__table__
+    slugs = sorted(set(slugs))
+    ids = {}
+    for chunk in chunks(slugs):
+        ids.update(conn.execute(
+            select(table.c.slug, table.c.id).where(table.c.slug.in_(chunk))
+        ).all())
+    return ids
+
+
+def _write_grouped(conn, statement, rows):
+    """executemany ``statement`` once per distinct key set, as executemany needs uniform rows"""
+    groups = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+    for group in groups.values():
+        conn.execute(statement, group)
+
+
+class _Importer:
+    """Writes validated batches of one kind and tracks what they touched"""
+
+    def __init__(self, conn, kind):
+        self.conn = conn
+        self.kind = kind
+        self.table = kind.model.__table__
+        self.result = {'inserted': 0, 'updated': 0, 'skipped': 0, 'errors': []}
+
+    def error(self, line_number, message):
+        self.result['skipped'] += 1
+        if len(self.result['errors']) < MAX_REPORTED_ERRORS:
+            self.result['errors'].append(f'line {line_number}: {message}')
+
+    def write(self, batch):
+        """Upsert a batch of ``(line_number, record)`` by slug"""
+        validated = {}
+        for line_number, record in batch:
+            try:
+                values, lines = _validate(self.kind, record)
+            except RowError as e:
+                self.error(line_number, e)
+                continue
+            # A slug repeated within a batch keeps its last record
+            validated[values['slug']] = (line_number, values, lines)
+
+        existing = _slug_ids(self.conn, self.kind.model, validated)
+
+        if self.kind.model is Cocktail:
+            ingredient_ids = _slug_ids(self.conn, Ingredient, [
+                line['ingredient'] for _, _, lines in validated.values() for line in lines or ()
+            ])
+            for slug, (line_number, values, lines) in list(validated.items()):
+                try:
+                    _recipe_rows(0, lines or [], ingredient_ids)
+                except RowError as e:
+                    self.error(line_number, e)
+                    del validated[slug]
+
+        inserts, updates = [], []
+        for slug, (line_number, values, lines) in validated.items():
+            if slug in existing:
+                updates.append(dict(values, _slug=slug))
+                continue
+            missing = [column.key for column in self.kind.columns if _required(column) and values.get(column.key) is None]
+            if missing:
+                self.error(line_number, f"{', '.join(missing)} required for a new {self.kind.model.__name__}")
+                continue
+            inserts.append(values)
+
+        if inserts:
+            _write_grouped(self.conn, insert(self.table), inserts)
+        if updates:
+            _write_grouped(
+                self.conn,
+                update(self.table).where(self.table.c.slug == bindparam('_slug')),
+                updates
+            )
+        self.result['inserted'] += len(inserts)
+        self.result['updated'] += len(updates)
+
+        written = {values['slug'] for values in inserts} | {values['_slug'] for values in updates}
+        ids = _slug_ids(self.conn, self.kind.model, written)
+        if self.kind.model is Cocktail:
+            self._write_recipes(ids, {slug: validated[slug][2] for slug in written}, ingredient_ids)
+        elif self.kind.model is Ingredient:
+            self._refresh_ingredients([ids[slug] for slug in written if slug in existing])
+
+    def _write_recipes(self, cocktail_ids, lines_by_slug, ingredient_ids):
+        lines = CocktailIngredient.__table__
+        replaced = [cocktail_ids[slug] for slug, recipe in lines_by_slug.items() if recipe is not None]
+        for chunk in chunks(replaced):
+            self.conn.execute(delete(lines).where(lines.c.cocktail_id.in_(chunk)))
+        rows = [
+            row for slug, recipe in lines_by_slug.items() if recipe is not None
+            for row in _recipe_rows(cocktail_ids[slug], recipe, ingredient_ids)
+        ]
+        if rows:
+            self.conn.execute(insert(lines), rows)
+
+        # Derived columns the ORM flush hooks would have maintained
+        ids = sorted(cocktail_ids.values())
+        tag_fields = tuple(tags_service.TAG_FIELDS.values())
+        for chunk in chunks(ids):
+            tag_rows = self.conn.execute(
+                select(self.table.c.id, *[self.table.c[field] for field in tag_fields])
+                .where(self.table.c.id.in_(chunk))
+            ).all()
+            tags_service.sync_cocktails(self.conn, [
+                (row.id, {field: row._mapping[field] for field in tag_fields}) for row in tag_rows
+            ])
+        seasons.recompute_cocktails(self.conn, ids)
+        nutrition.recompute(self.conn, ids)
+
+    def _refresh_ingredients(self, updated_ids):
+        """Recompute the cocktails using updated ingredients"""
+        if not updated_ids:
+            return
+        lines = CocktailIngredient.__table__
+        cocktail_ids = set()
+        for chunk in chunks(updated_ids):
+            cocktail_ids.update(self.conn.execute(
+                select(lines.c.cocktail_id).where(lines.c.ingredient_id.in_(chunk))
+            ).scalars())
+        seasons.recompute_cocktails(self.conn, cocktail_ids)
+        nutrition.recompute(self.conn, cocktail_ids)
+
+
+def read_records(stream, fmt):
+    """Yield ``(line_number, record)`` from an NDJSON or CSV stream"""
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+        return
+    for line_number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError:
+            yield line_number, None
+
+
+def import_records(kind_name, records, batch_size=1000):
+    """Upsert ``(line_number, record)`` pairs of ``kind_name`` by slug in one transaction"""
+    kind = KINDS[kind_name]
+    with db.engine.begin() as conn:
+        importer = _Importer(conn, kind)
+        batch = []
+        for line_number, record in records:
+            batch.append((line_number, record))
+            if len(batch) >= batch_size:
+                importer.write(batch)
+                batch = []
+        if batch:
+            importer.write(batch)
+
+    touched = importer.result['inserted'] + importer.result['updated']
+    if touched and kind.model is not EventPackage:
+        search.rebuild()
+    if touched and kind.model is Cocktail:
+        similarity.rebuild()
+    if touched:
+        tables = {
+            Cocktail: ('cocktails', 'cocktail_ingredients', 'cocktail_tags', 'tags', suggest.COCKTAIL_LABELS_TAG),
+            Ingredient: ('ingredients', 'cocktails', suggest.INGREDIENT_LABELS_TAG),
+            EventPackage: ('event_packages',)
+        }[kind.model]
+        cache.invalidate(*tables)
+    return ImportResult(**importer.result)
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def export_records(kind_name, batch_size=1000):
+    """Yield every record of ``kind_name`` in id order, streamed from the database"""
+    kind = KINDS[kind_name]
+    table = kind.model.__table__
+    lines = CocktailIngredient.__table__
+    ingredients = Ingredient.__table__
+    keys = [column.key for column in kind.columns]
+
+    # Recipe lines are read per batch on a second connection while the first streams
+    with db.engine.connect() as conn, db.engine.connect() as lines_conn:
+        result = conn.execution_options(yield_per=batch_size).execute(
+            select(table.c.id, *kind.columns).order_by(table.c.id)
+        )
+        for rows in result.partitions():
+            recipes = {}
+            cocktail_ids = [row.id for row in rows] if kind.model is Cocktail else []
+            for chunk in chunks(cocktail_ids):
+                for line in lines_conn.execute(
+                    select(lines.c.cocktail_id, ingredients.c.slug.label('ingredient'),
+                           *[lines.c[field] for field in _LINE_FIELDS])
+                    .join(ingredients, ingredients.c.id == lines.c.ingredient_id)
+                    .where(lines.c.cocktail_id.in_(chunk))
+                    .order_by(lines.c.cocktail_id, lines.c.order_index, lines.c.id)
+                ):
+                    recipes.setdefault(line.cocktail_id, []).append(
+                        {key: value for key, value in line._mapping.items() if key != 'cocktail_id'}
+                    )
+            for row in rows:
+                record = dict(zip(keys, row[1:]))
+                if kind.model is Cocktail:
+                    record['ingredients'] = recipes.get(row.id, [])
+                yield record
+
+
+def write_records(stream, kind_name, records, fmt):
+    """Write ``records`` to ``stream`` as NDJSON or CSV; returns the number written"""
+    count = 0
+    if fmt == 'csv':
+        fieldnames = [column.key for column in KINDS[kind_name].columns]
+        if KINDS[kind_name].model is Cocktail:
+            fieldnames.append('ingredients')
+        writer = csv.writer(stream)
+        writer.writerow(fieldnames)
+        for record in records:
+            # Records list their keys in fieldnames order; None becomes an empty cell
+            writer.writerow([
+                json.dumps(value, default=_json_default) if isinstance(value, (list, dict)) else value
+                for value in record.values()
+            ])
+            count += 1
+        return count
+
+    for record in records:
+        stream.write(json.dumps(record, default=_json_default, ensure_ascii=False))
+        stream.write('\n')
+        count += 1
+    return count
+
+
+def infer_format(filename):
+    """'csv' for a .csv file name, otherwise 'ndjson'"""
+    return 'csv' if str(filename or '').lower().endswith('.csv') else 'ndjson'
@@ -0,0 +1,103 @@
+"""
+User dashboard for SOBRE - Premium Healthy Cocktails
+
+The dashboard is built with three queries: the user row with every statistic
+as a scalar subquery, the latest favorites straight from
+``user_favorite_cocktails``, and the confirmed bookings joined with their
+classes. The payload is cached per user and tagged with the user, so writes
+to the user's favorites, reviews, bookings or subscriptions drop it, as do
+writes to the cocktails and classes it shows.
+"""
+
+from sqlalchemy import func, select
+
+from app import db
+from app.models.cocktail import Cocktail, CocktailReview
+from app.models.subscription import Subscription
+from app.models.user import User, user_favorite_cocktails
+from app.models.virtual_class import ClassBooking, VirtualClass
+from app.services.cache import cached_value, invalidate_after_commit, user_tag
+from app.services.events import on_flush, previous_value
+
+RECENT_FAVORITES = 5
+
+UPCOMING_CLASSES = 3
+
+# Tables whose rows appear in the payload regardless of who wrote them
+_SHARED_TABLES = (Cocktail.__tablename__, VirtualClass.__tablename__)
+
+
+def _count(model_or_table, *criteria):
+    return select(func.count()).select_from(model_or_table).where(*criteria).scalar_subquery()
+
+
+def _user_with_statistics(user_id):
+    favorites = user_favorite_cocktails.c
+    return db.session.execute(
+        select(
+            User,
+            _count(user_favorite_cocktails, favorites.user_id == user_id).label('favorites_count'),
+            _count(CocktailReview, CocktailReview.user_id == user_id).label('reviews_count'),
+            _count(ClassBooking, ClassBooking.user_id == user_id).label('bookings_count'),
+            _count(Subscription, Subscription.user_id == user_id,
+                   Subscription.status == 'active').label('active_subscriptions')
+        ).where(User.id == user_id)
+    ).first()
+
+
+def recent_favorites(user_id, limit=RECENT_FAVORITES):
+    """The user's ``limit`` most recently favorited cocktails, newest first"""
+    favorites = user_favorite_cocktails.c
+    return db.session.scalars(
+        select(Cocktail)
+        .join(user_favorite_cocktails, favorites.cocktail_id == Cocktail.id)
+        .where(favorites.user_id == user_id)
+        .order_by(favorites.created_at.desc(), favorites.cocktail_id.desc())
+        .limit(limit)
+    ).all()
+
+
+def upcoming_classes(user_id, limit=UPCOMING_CLASSES):
+    """The user's confirmed bookings with their classes, soonest first"""
+    return ClassBooking.query_with_class().filter(
+        ClassBooking.user_id == user_id,
+        ClassBooking.status == 'confirmed'
+    ).order_by(VirtualClass.scheduled_datetime, ClassBooking.id).limit(limit).all()
+
+
+def _build(user_id):
+    row = _user_with_statistics(user_id)
+    if row is None:
+        return None
+    user = row[0]
+    return {
+        'user': user.to_dict(),
+        'statistics': {
+            'favorites_count': row.favorites_count,
+            'reviews_count': row.reviews_count,
+            'bookings_count': row.bookings_count,
+            'active_subscriptions': row.active_subscriptions
+        },
+        'recent_favorites': [cocktail.to_dict(include_ingredients=False) for cocktail in recent_favorites(user_id)],
+        'upcoming_classes': [booking.to_dict() for booking in upcoming_classes(user_id)]
+    }
+
+
+def dashboard(user_id):
+    """Dashboard payload for ``user_id``, or None if there is no such user"""
+    return cached_value(f'dashboard:{user_id}', (user_tag(user_id),) + _SHARED_TABLES, lambda: _build(user_id))
+
+
+@on_flush(User, CocktailReview, ClassBooking, Subscription)
+def _invalidate_user_on_flush(session, written, deleted):
+    user_ids = set()
+    for obj in written + deleted:
+        if isinstance(obj, User):
+            # Also covers favorites changed through User.favorite_cocktails
+            user_ids.add(obj.id)
+            continue
+        user_ids.add(obj.user_id)
+        if obj not in session.new:
+            user_ids.add(previous_value(obj, 'user_id'))
+
+    invalidate_after_commit(session, *sorted(user_tag(user_id) for user_id in user_ids if user_id is not None))
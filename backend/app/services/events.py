@@ -0,0 +1,94 @@
+"""
+Session write hooks for SOBRE - Premium Healthy Cocktails
+
+Services that keep derived data (indexes, caches, counters) in sync with the
+models register here instead of each installing their own SQLAlchemy
+listeners. A hook that updates columns with plain SQL calls ``expire_loaded``
+so objects the session already holds reload them.
+"""
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.util import identity_key
+
+# Keep IN (...) lists well under SQLite's bound-parameter limit
+CHUNK_SIZE = 500
+
+_flush_hooks = []
+
+_PENDING_KEY = 'coco_tails_after_commit'
+
+
+def on_flush(*models):
+    """Register ``fn(session, written, deleted)`` for flushes that touch ``models``
+
+    The hook runs inside the flushing transaction, so it may emit SQL through
+    ``session.connection()`` but must not add or remove ORM objects.
+    """
+    def decorator(fn):
+        _flush_hooks.append((models, fn))
+        return fn
+    return decorator
+
+
+def previous_value(obj, attr):
+    """Value of ``attr`` as last loaded from the database"""
+    history = inspect(obj).attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return getattr(obj, attr)
+
+
+def chunks(values, size=CHUNK_SIZE):
+    """Split ``values`` into lists short enough for one IN (...) clause"""
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def expire_loaded(session, model, ids, attributes):
+    """Expire ``attributes`` on the ``model`` objects with ``ids`` already loaded in ``session``"""
+    for pk in ids:
+        obj = session.identity_map.get(identity_key(model, pk))
+        if obj is not None:
+            session.expire(obj, attributes)
+
+
+def after_commit(session, callback):
+    """Run ``callback()`` once the session's current transaction commits
+
+    The callback is discarded if the transaction rolls back instead.
+    """
+    session.info.setdefault(_PENDING_KEY, []).append(callback)
+
+
+@event.listens_for(Session, 'after_flush')
+def _dispatch_flush(session, flush_context):
+    if not _flush_hooks:
+        return
+
+    written = list(session.new) + list(session.dirty)
+    deleted = list(session.deleted)
+
+    for models, fn in _flush_hooks:
+        hook_written = [obj for obj in written if isinstance(obj, models)]
+        hook_deleted = [obj for obj in deleted if isinstance(obj, models)]
+        if hook_written or hook_deleted:
+            fn(session, hook_written, hook_deleted)
+
+
+@event.listens_for(Session, 'after_commit')
+def _run_after_commit(session):
+    callbacks = session.info.pop(_PENDING_KEY, [])
+    for callback in callbacks:
+        callback()
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_after_commit(session, previous_transaction):
+    # Savepoint rollbacks leave the outer transaction (and its callbacks) alive
+    if previous_transaction.nested:
+        return
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,64 @@
+"""
+Catalog facet counts for SOBRE - Premium Healthy Cocktails
+"""
+
+from sqlalchemy import String, cast, func, literal, select, union_all
+
+from app import db
+from app.models.cocktail import Cocktail
+from app.models.tag import Tag, cocktail_tags
+
+
+def facet_counts(query):
+    """Count the cocktails matched by ``query`` per facet value in one statement
+
+    Every facet is a GROUP BY over the same CTE of matching cocktails, and the
+    groups are combined with UNION ALL so the database answers in one round trip.
+    """
+    matched = query.with_entities(
+        Cocktail.id.label('id'),
+        Cocktail.wellness_category.label('wellness_category'),
+        Cocktail.difficulty_level.label('difficulty_level'),
+        Cocktail.is_premium.label('is_premium')
+    ).order_by(None).cte('matched')
+
+    def grouped(facet, value):
+        return select(
+            literal(facet).label('facet'),
+            cast(value, String).label('value'),
+            func.count().label('count')
+        ).select_from(matched).group_by(value)
+
+    premium = db.case((matched.c.is_premium == True, 'premium'), else_='standard')
+    dietary = select(
+        literal('dietary_tags').label('facet'),
+        cast(Tag.slug, String).label('value'),
+        func.count().label('count')
+    ).select_from(
+        matched.join(cocktail_tags, cocktail_tags.c.cocktail_id == matched.c.id)
+        .join(Tag.__table__, Tag.id == cocktail_tags.c.tag_id)
+    ).where(Tag.kind == 'dietary').group_by(Tag.slug)
+    total = select(
+        literal('total').label('facet'),
+        cast(literal(None), String).label('value'),
+        func.count().label('count')
+    ).select_from(matched)
+
+    statement = union_all(
+        total,
+        grouped('category', matched.c.wellness_category),
+        grouped('difficulty', matched.c.difficulty_level),
+        grouped('premium', premium),
+        dietary
+    )
+
+    result = {
+        'total': 0,
+        'facets': {'category': {}, 'difficulty': {}, 'premium': {}, 'dietary_tags': {}}
+    }
+    for facet, value, count in db.session.execute(statement):
+        if facet == 'total':
+            result['total'] = count
+        elif value is not None:
+            result['facets'][facet][value] = count
+    return result
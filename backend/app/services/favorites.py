@@ -0,0 +1,122 @@
+"""
+Favorite cocktails for SOBRE - Premium Healthy Cocktails
+
+Favorites are written straight to ``user_favorite_cocktails`` by its
+composite primary key: adding is one INSERT (a duplicate is caught by the
+key, inside a savepoint), removing is one DELETE, and neither loads the
+user's favorites. Each cocktail's ``favorite_count`` moves in the same
+transaction. Write favorites through this module rather than through
+``User.favorite_cocktails`` so the counts stay right.
+
+Cached cocktail listings are not invalidated on every favorite, so the
+``favorite_count`` they show can lag by up to the cache TTL.
+"""
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models.cocktail import Cocktail
+from app.models.user import User, user_favorite_cocktails
+from app.services.cache import invalidate_after_commit, user_tag
+from app.services.events import expire_loaded
+
+MAX_LOOKUP_IDS = 100
+
+
+def _favorite(user_id, cocktail_id):
+    favorites = user_favorite_cocktails.c
+    return (favorites.user_id == user_id, favorites.cocktail_id == cocktail_id)
+
+
+def _adjust(session, user_id, cocktail_id, n):
+    cocktails = Cocktail.__table__
+    session.execute(
+        update(cocktails).where(cocktails.c.id == cocktail_id).values(favorite_count=db.case(
+            (cocktails.c.favorite_count + n > 0, cocktails.c.favorite_count + n), else_=0
+        ))
+    )
+    invalidate_after_commit(session, user_tag(user_id))
+
+    expire_loaded(session, Cocktail, [cocktail_id], ['favorite_count'])
+    expire_loaded(session, User, [int(user_id)], ['favorite_cocktails'])
+
+
+def add(user_id, cocktail_id, session=None):
+    """Favorite ``cocktail_id`` for ``user_id``; False if it already was"""
+    session = session or db.session
+    try:
+        with session.begin_nested():
+            session.execute(insert(user_favorite_cocktails).values(user_id=user_id, cocktail_id=cocktail_id))
+    except IntegrityError:
+        return False
+    _adjust(session, user_id, cocktail_id, 1)
+    return True
+
+
+def remove(user_id, cocktail_id, session=None):
+    """Unfavorite ``cocktail_id`` for ``user_id``; False if it wasn't a favorite"""
+    session = session or db.session
+    result = session.execute(delete(user_favorite_cocktails).where(*_favorite(user_id, cocktail_id)))
+    if not result.rowcount:
+        return False
+    _adjust(session, user_id, cocktail_id, -1)
+    return True
+
+
+def toggle(user_id, cocktail_id, session=None):
+    """Flip whether ``user_id`` favorites ``cocktail_id``; True if it is now a favorite"""
+    if remove(user_id, cocktail_id, session):
+        return False
+    add(user_id, cocktail_id, session)
+    return True
+
+
+def favorite_ids(user_id, cocktail_ids):
+    """The subset of ``cocktail_ids`` that ``user_id`` has favorited, in one query"""
+    cocktail_ids = set(cocktail_ids)
+    if not cocktail_ids:
+        return set()
+    favorites = user_favorite_cocktails.c
+    return set(db.session.scalars(
+        select(favorites.cocktail_id).where(favorites.user_id == user_id, favorites.cocktail_id.in_(cocktail_ids))
+    ))
+
+
+def favorites_query(user_id, options=()):
+    """Query of ``(Cocktail, created_at, cocktail_id)`` rows for the user's favorites
+
+    For keyset pagination on ``(created_at, cocktail_id)``, newest first.
+    """
+    favorites = user_favorite_cocktails.c
+    return db.session.query(Cocktail, favorites.created_at, favorites.cocktail_id).options(*options).join(
+        user_favorite_cocktails, favorites.cocktail_id == Cocktail.id
+    ).filter(favorites.user_id == user_id)
+
+
+def favorites_count(user_id):
+    """How many cocktails ``user_id`` has favorited"""
+    favorites = user_favorite_cocktails.c
+    return db.session.scalar(select(func.count()).select_from(user_favorite_cocktails).where(favorites.user_id == user_id))
+
+
+def recompute_all(conn=None):
+    """Recompute every cocktail's favorite count from the favorites table in one UPDATE
+
+    Runs on ``conn`` when given (a migration passes its own), otherwise in the
+    session, committing it.
+    """
+    cocktails = Cocktail.__table__
+    favorites = user_favorite_cocktails.c
+    count = (
+        select(func.count()).select_from(user_favorite_cocktails)
+        .where(favorites.cocktail_id == cocktails.c.id)
+        .scalar_subquery()
+    )
+
+    statement = update(cocktails).values(favorite_count=count)
+    if conn is not None:
+        return conn.execute(statement).rowcount
+    result = db.session.execute(statement)
+    db.session.commit()
+    return result.rowcount
@@ -0,0 +1,95 @@
+"""
+Authenticated user lookup for SOBRE - Premium Healthy Cocktails
+
+Flask-JWT-Extended calls the user lookup loader once for every request with
+a valid token and keeps its result as ``current_user`` for the request. The
+loader answers from a short-TTL, per-worker cache of each user's essential
+fields, so most authenticated requests make no database round trip for the
+user. Cache keys carry the user's ``identity:<id>`` tag version, so a
+committed write to the user drops the snapshot everywhere the tag is shared.
+Tokens of missing or deactivated users are rejected with a 401.
+
+Handlers that need the whole row use ``current_user_model()``; within a
+request it comes from the session's identity map after the first load.
+"""
+
+from collections import namedtuple
+
+from flask import current_app, g, jsonify
+from flask_jwt_extended import current_user
+
+from app import db, jwt
+from app.models.user import User
+from app.services.cache import LocalLRU, invalidate_after_commit, versions
+from app.services.events import on_flush
+
+CurrentUser = namedtuple(
+    'CurrentUser', 'id email username first_name last_name is_active is_verified is_premium is_admin'
+)
+
+_MEMO_KEY = '_identity_memo'
+
+_ROW_KEY = '_identity_row'
+
+
+def identity_tag(user_id):
+    """Tag of a user's cached identity snapshot"""
+    return f'identity:{user_id}'
+
+
+def _snapshot(user):
+    return CurrentUser(**{field: getattr(user, field) for field in CurrentUser._fields})
+
+
+def _load(user_id):
+    cache = current_app.extensions['identity_cache']
+    ttl = current_app.config.get('IDENTITY_CACHE_TTL', 60)
+    key = (user_id, versions(identity_tag(user_id)))
+
+    snapshot = cache.get(key) if ttl > 0 else None
+    if snapshot is None:
+        user = db.session.get(User, user_id)
+        if user is None:
+            return None
+        # The identity map only holds rows weakly; keep this one so current_user_model() reuses it
+        g.setdefault(_ROW_KEY, user)
+        snapshot = _snapshot(user)
+        if ttl > 0:
+            cache.set(key, snapshot, ttl)
+    return snapshot
+
+
+def lookup_user(jwt_header, jwt_data):
+    """User lookup loader: the token subject's snapshot, or None to reject the token"""
+    try:
+        user_id = int(jwt_data[current_app.config['JWT_IDENTITY_CLAIM']])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+    memo = g.setdefault(_MEMO_KEY, {})
+    if user_id not in memo:
+        memo[user_id] = _load(user_id)
+    snapshot = memo[user_id]
+    return snapshot if snapshot is not None and snapshot.is_active else None
+
+
+def _lookup_error(jwt_header, jwt_data):
+    return jsonify({'message': 'User not found or deactivated'}), 401
+
+
+def current_user_model():
+    """The authenticated user's ``User`` row"""
+    return db.session.get(User, current_user.id)
+
+
+def init_app(app):
+    """Register the user lookup loader and its cache on the application"""
+    app.extensions['identity_cache'] = LocalLRU(app.config.get('IDENTITY_CACHE_MAX_ENTRIES', 4096))
+    jwt.user_lookup_loader(lookup_user)
+    jwt.user_lookup_error_loader(_lookup_error)
+
+
+@on_flush(User)
+def _invalidate_identity_on_flush(session, written, deleted):
+    user_ids = {user.id for user in written + deleted if user.id is not None}
+    invalidate_after_commit(session, *sorted(identity_tag(user_id) for user_id in user_ids))
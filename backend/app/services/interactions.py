@@ -0,0 +1,182 @@
+"""
+Ingredient interaction graph for SOBRE - Premium Healthy Cocktails
+
+The ``ingredient_interactions`` table is loaded into a dense, symmetric score
+matrix over the active ingredients that have interactions. Synergy and
+complement pairs score their compatibility (1-10); avoid pairs score its
+negative and count as conflicts. Scoring a builder recipe or suggesting the
+next ingredient is then array indexing instead of one query per pair.
+
+The matrix lives in process memory and is rebuilt once the response cache
+reports that interactions or ingredients have been written.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+from flask import current_app
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+
+from app import db
+from app.models.ingredient import Ingredient, IngredientInteraction
+from app.services.cache import DerivedIndex
+
+INTERACTION_TYPES = ('synergy', 'complement', 'avoid')
+
+# Compatibility assumed when an interaction has no score
+DEFAULT_SCORES = {'synergy': 8, 'complement': 6, 'avoid': 8}
+
+_AVOID = INTERACTION_TYPES.index('avoid') + 1
+
+_Graph = namedtuple('_Graph', 'ingredient_ids positions scores types interactions')
+
+Pair = namedtuple('Pair', 'ingredient1_id ingredient2_id interaction_type compatibility_score interaction')
+
+
+class InteractionGraph(DerivedIndex):
+    """Pairwise compatibility scores between active ingredients"""
+
+    source_tables = (IngredientInteraction.__tablename__, Ingredient.__tablename__)
+
+    def build(self, version):
+        first, second = aliased(Ingredient), aliased(Ingredient)
+        interactions = db.session.execute(
+            select(
+                IngredientInteraction.id,
+                IngredientInteraction.ingredient1_id,
+                IngredientInteraction.ingredient2_id,
+                IngredientInteraction.interaction_type,
+                IngredientInteraction.compatibility_score,
+                IngredientInteraction.description,
+                IngredientInteraction.flavor_impact,
+                IngredientInteraction.health_impact
+            )
+            .join(first, first.id == IngredientInteraction.ingredient1_id)
+            .join(second, second.id == IngredientInteraction.ingredient2_id)
+            .where(
+                first.is_active == True,
+                second.is_active == True,
+                IngredientInteraction.ingredient1_id != IngredientInteraction.ingredient2_id,
+                IngredientInteraction.interaction_type.in_(INTERACTION_TYPES)
+            )
+            .order_by(IngredientInteraction.id)
+        ).all()
+
+        ingredient_ids = sorted({row.ingredient1_id for row in interactions} |
+                                {row.ingredient2_id for row in interactions})
+        positions = {ingredient_id: i for i, ingredient_id in enumerate(ingredient_ids)}
+        scores = np.zeros((len(ingredient_ids), len(ingredient_ids)), dtype=np.float32)
+        types = np.zeros(scores.shape, dtype=np.int8)  # 0 = none, else 1 + INTERACTION_TYPES index
+        details = {}
+
+        # When a pair is recorded more than once an avoid wins, then the best score
+        for row in interactions:
+            i, j = positions[row.ingredient1_id], positions[row.ingredient2_id]
+            avoid = row.interaction_type == 'avoid'
+            compatibility = row.compatibility_score or DEFAULT_SCORES[row.interaction_type]
+            score = -compatibility if avoid else compatibility
+            if types[i, j] and (types[i, j] == _AVOID or (not avoid and score <= scores[i, j])):
+                continue
+            scores[i, j] = scores[j, i] = score
+            types[i, j] = types[j, i] = INTERACTION_TYPES.index(row.interaction_type) + 1
+            details[(min(i, j), max(i, j))] = {
+                'id': row.id,
+                'description': row.description,
+                'flavor_impact': row.flavor_impact,
+                'health_impact': row.health_impact
+            }
+
+        return _Graph(np.array(ingredient_ids, dtype=np.int64), positions, scores, types, details)
+
+    def pairs(self, ingredient_ids):
+        """Every known interaction among ``ingredient_ids`` in one pass"""
+        graph = self.current()
+        present = sorted({graph.positions[ingredient_id] for ingredient_id in ingredient_ids
+                          if ingredient_id in graph.positions})
+        if len(present) < 2:
+            return []
+
+        index = np.array(present, dtype=np.int64)
+        types = graph.types[np.ix_(index, index)]
+        first, second = np.nonzero(np.triu(types, k=1))
+        return [
+            Pair(
+                int(graph.ingredient_ids[index[i]]),
+                int(graph.ingredient_ids[index[j]]),
+                INTERACTION_TYPES[types[i, j] - 1],
+                abs(int(graph.scores[index[i], index[j]])),
+                graph.interactions[(int(index[i]), int(index[j]))]
+            )
+            for i, j in zip(first.tolist(), second.tolist())
+        ]
+
+    def suggest(self, ingredient_ids, limit=5):
+        """``[(ingredient_id, score, links), ...]`` that pair best with ``ingredient_ids``
+
+        Candidates that conflict with any chosen ingredient are excluded. The
+        score is the summed compatibility with the chosen ingredients.
+        """
+        graph = self.current()
+        chosen = np.array(sorted({graph.positions[ingredient_id] for ingredient_id in ingredient_ids
+                                  if ingredient_id in graph.positions}), dtype=np.int64)
+        if not len(chosen):
+            return []
+
+        totals = graph.scores[chosen].sum(axis=0)
+        links = (graph.types[chosen] > 0).sum(axis=0)
+        conflicts = (graph.types[chosen] == _AVOID).any(axis=0)
+
+        eligible = ~conflicts & (totals > 0)
+        eligible[chosen] = False
+        candidates = np.flatnonzero(eligible)
+        candidates = candidates[np.lexsort((-links[candidates], -totals[candidates]))][:limit]
+        return [
+            (int(graph.ingredient_ids[i]), float(totals[i]), int(links[i]))
+            for i in candidates.tolist()
+        ]
+
+
+def init_app(app):
+    """Register the interaction graph on the application"""
+    app.extensions['interactions'] = InteractionGraph()
+
+
+def _graph():
+    return current_app.extensions['interactions']
+
+
+def compatibility(ingredient_ids):
+    """Pairwise interactions, conflicts and an aggregate score for a set of ingredients
+
+    The aggregate averages the signed scores of the known pairs (avoid pairs
+    count negative); ``coverage`` is the share of pairs with a known interaction.
+    """
+    ingredient_ids = sorted(set(ingredient_ids))
+    pairs = _graph().pairs(ingredient_ids)
+    total_pairs = len(ingredient_ids) * (len(ingredient_ids) - 1) // 2
+    signed = [-pair.compatibility_score if pair.interaction_type == 'avoid' else pair.compatibility_score
+              for pair in pairs]
+
+    def to_dict(pair):
+        return dict(
+            pair.interaction,
+            ingredient1_id=pair.ingredient1_id,
+            ingredient2_id=pair.ingredient2_id,
+            interaction_type=pair.interaction_type,
+            compatibility_score=pair.compatibility_score
+        )
+
+    conflicts = [to_dict(pair) for pair in pairs if pair.interaction_type == 'avoid']
+    return {
+        'pairs': [to_dict(pair) for pair in pairs],
+        'conflicts': conflicts,
+        'score': round(sum(signed) / len(signed), 2) if signed else None,
+        'coverage': round(len(pairs) / total_pairs, 3) if total_pairs else 0.0,
+        'is_compatible': not conflicts
+    }
+
+
+def suggest(ingredient_ids, limit=5):
+    """Ingredients that pair best with ``ingredient_ids``, best first"""
+    return _graph().suggest(ingredient_ids, limit)
@@ -0,0 +1,279 @@
+"""
+Nutrition engine for SOBRE - Premium Healthy Cocktails
+
+Per-serving nutrition is derived from each recipe's quantities and the
+ingredients' per-100g values. A batch of cocktails is computed as one matrix
+product (cocktails x ingredients grams) @ (ingredients x nutrients) and the
+results are stored in materialized columns on Cocktail.
+
+Micronutrients are keyed by ``nutrient_key``, so 'Vitamin C' and
+'vitamin_c' add up as one nutrient. A cocktail is marked incomplete when a
+unit can't be converted to grams or an ingredient amount isn't a number.
+
+Recipe, serving-count and ingredient nutrition writes recompute only the
+affected cocktails, inside the same transaction.
+"""
+
+import re
+from collections import defaultdict
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import bindparam, inspect, select, update
+
+from app import db
+from app.models.cocktail import Cocktail, CocktailIngredient
+from app.models.ingredient import Ingredient
+from app.services.cache import invalidate_after_commit
+from app.services.events import chunks, expire_loaded, on_flush
+
+# Ingredient column -> materialized Cocktail column
+MACRONUTRIENTS = {
+    'calories_per_100g': 'nutrition_calories',
+    'protein_g': 'nutrition_protein_g',
+    'carbs_g': 'nutrition_carbs_g',
+    'fiber_g': 'nutrition_fiber_g',
+    'sugar_g': 'nutrition_sugar_g',
+    'fat_g': 'nutrition_fat_g',
+    'sodium_mg': 'nutrition_sodium_mg'
+}
+
+# Ingredient fields whose changes affect the cocktails using it
+NUTRITION_FIELDS = tuple(MACRONUTRIENTS) + ('vitamins', 'minerals')
+
+NUTRITION_COLUMNS = tuple(MACRONUTRIENTS.values()) + (
+    'nutrition_micronutrients', 'nutrition_complete', 'nutrition_computed_at'
+)
+
+# Grams per unit; volumes assume the density of water, which is close enough for
+# juices, syrups and spirits at cocktail quantities
+GRAMS_PER_UNIT = {
+    'g': 1.0, 'gram': 1.0, 'kg': 1000.0, 'mg': 0.001,
+    'ml': 1.0, 'cl': 10.0, 'dl': 100.0, 'l': 1000.0,
+    'oz': 29.5735, 'fl oz': 29.5735, 'floz': 29.5735,
+    'tsp': 4.92892, 'teaspoon': 4.92892,
+    'tbsp': 14.7868, 'tablespoon': 14.7868,
+    'cup': 236.588, 'shot': 44.3603, 'jigger': 44.3603,
+    'dash': 0.616, 'splash': 5.0, 'drop': 0.05
+}
+
+
+def grams_per_unit(unit):
+    """Grams in one ``unit``, or None for counts like 'leaf' or 'slice'"""
+    unit = (unit or '').strip().lower().rstrip('.')
+    if unit in GRAMS_PER_UNIT:
+        return GRAMS_PER_UNIT[unit]
+    if unit.endswith('es') and unit[:-2] in GRAMS_PER_UNIT:
+        return GRAMS_PER_UNIT[unit[:-2]]
+    if unit.endswith('s') and unit[:-1] in GRAMS_PER_UNIT:
+        return GRAMS_PER_UNIT[unit[:-1]]
+    return None
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def nutrient_key(name):
+    """'Vitamin C' and 'vitamin_c' both become 'vitamin_c'"""
+    return re.sub(r'[^a-z0-9]+', '_', str(name).strip().lower()).strip('_')
+
+
+def _amount(value):
+    """A stored per-100g amount as a float; missing is 0, None if it isn't a number"""
+    if value is None:
+        return 0.0
+    try:
+        amount = float(value)
+    except (TypeError, ValueError):
+        return None
+    return amount if np.isfinite(amount) else None
+
+
+def _micronutrients(row):
+    """``{nutrient key: amount}`` from an ingredient row's vitamins and minerals"""
+    amounts = {}
+    for values in (row.vitamins, row.minerals):
+        if isinstance(values, dict):
+            for name, amount in values.items():
+                key = nutrient_key(name)
+                if key:
+                    amounts[key] = amount
+    return amounts
+
+
+def _nutrient_matrix(conn, ingredient_ids):
+    """``(column index, nutrient names, matrix, unparsed ids)`` of per-100g values for ``ingredient_ids``
+
+    Unparsed ids are the ingredients with an amount that isn't a number; it
+    counts as 0 in the matrix.
+    """
+    table = Ingredient.__table__
+    rows = []
+    for chunk in chunks(ingredient_ids):
+        rows.extend(conn.execute(
+            select(table.c.id, table.c.vitamins, table.c.minerals,
+                   *[table.c[column] for column in MACRONUTRIENTS])
+            .where(table.c.id.in_(chunk))
+        ).all())
+
+    micronutrients = {row.id: _micronutrients(row) for row in rows}
+    names = list(MACRONUTRIENTS) + sorted({key for amounts in micronutrients.values() for key in amounts})
+    position = {name: i for i, name in enumerate(names)}
+
+    column_of = {ingredient_id: i for i, ingredient_id in enumerate(ingredient_ids)}
+    matrix = np.zeros((len(ingredient_ids), len(names)))
+    unparsed = set()
+    for row in rows:
+        i = column_of[row.id]
+        amounts = [(column, row._mapping[column]) for column in MACRONUTRIENTS]
+        for name, value in amounts + list(micronutrients[row.id].items()):
+            amount = _amount(value)
+            if amount is None:
+                unparsed.add(row.id)
+                continue
+            matrix[i, position[name]] = amount
+    return column_of, names, matrix, unparsed
+
+
+def compute(conn, cocktail_ids):
+    """Return ``{cocktail_id: column values}`` for the per-serving nutrition of ``cocktail_ids``"""
+    cocktails = Cocktail.__table__
+    lines = CocktailIngredient.__table__
+
+    servings = {}
+    recipe = defaultdict(list)
+    for chunk in chunks(cocktail_ids):
+        servings.update(conn.execute(
+            select(cocktails.c.id, cocktails.c.servings).where(cocktails.c.id.in_(chunk))
+        ).all())
+        for line in conn.execute(
+            select(lines.c.cocktail_id, lines.c.ingredient_id, lines.c.quantity, lines.c.unit)
+            .where(lines.c.cocktail_id.in_(chunk), lines.c.is_optional.isnot(True))
+        ):
+            recipe[line.cocktail_id].append(line)
+
+    ids = [cocktail_id for cocktail_id in cocktail_ids if cocktail_id in servings]
+    if not ids:
+        return {}
+
+    ingredient_ids = sorted({line.ingredient_id for lines_ in recipe.values() for line in lines_})
+    column_of, names, nutrients, unparsed = _nutrient_matrix(conn, ingredient_ids)
+
+    # Grams of each ingredient per serving, one row per cocktail
+    grams = np.zeros((len(ids), len(ingredient_ids)))
+    complete = np.ones(len(ids), dtype=bool)
+    for row, cocktail_id in enumerate(ids):
+        for line in recipe[cocktail_id]:
+            if line.ingredient_id in unparsed:
+                complete[row] = False
+            per_unit = grams_per_unit(line.unit)
+            if per_unit is None:
+                complete[row] = False
+                continue
+            grams[row, column_of[line.ingredient_id]] += _number(line.quantity) * per_unit
+        grams[row] /= max(servings[cocktail_id] or 1, 1)
+
+    totals = grams @ nutrients / 100.0
+
+    computed_at = datetime.utcnow()
+    macro_count = len(MACRONUTRIENTS)
+    results = {}
+    for row, cocktail_id in enumerate(ids):
+        values = {
+            column: round(float(totals[row, j]), 2)
+            for j, column in enumerate(MACRONUTRIENTS.values())
+        }
+        values['nutrition_calories'] = int(round(values['nutrition_calories']))
+        values['nutrition_micronutrients'] = {
+            name: round(float(totals[row, j]), 3)
+            for j, name in enumerate(names[macro_count:], start=macro_count)
+            if totals[row, j]
+        }
+        values['nutrition_complete'] = bool(complete[row])
+        values['nutrition_computed_at'] = computed_at
+        results[cocktail_id] = values
+    return results
+
+
+def store(conn, results):
+    """Write computed nutrition back to the cocktails table in one executemany"""
+    if not results:
+        return
+    cocktails = Cocktail.__table__
+    statement = update(cocktails).where(cocktails.c.id == bindparam('cocktail_id')).values(
+        {column: bindparam(column) for column in NUTRITION_COLUMNS}
+    )
+    conn.execute(statement, [dict(values, cocktail_id=cocktail_id) for cocktail_id, values in results.items()])
+
+
+def recompute(conn, cocktail_ids, batch_size=1000):
+    """Recompute and store nutrition for ``cocktail_ids`` in batches"""
+    cocktail_ids = sorted(set(cocktail_ids) - {None})
+    for start in range(0, len(cocktail_ids), batch_size):
+        store(conn, compute(conn, cocktail_ids[start:start + batch_size]))
+    return len(cocktail_ids)
+
+
+def recompute_all(batch_size=1000, conn=None):
+    """Recompute nutrition for every cocktail
+
+    Runs on ``conn`` when given (a migration passes its own), otherwise in a
+    transaction of its own.
+    """
+    if conn is None:
+        with db.engine.begin() as conn:
+            return recompute_all(batch_size, conn)
+
+    table = Cocktail.__table__
+    total = 0
+    last_id = 0
+    while True:
+        ids = conn.execute(
+            select(table.c.id).where(table.c.id > last_id).order_by(table.c.id).limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            break
+        total += recompute(conn, ids, batch_size)
+        last_id = ids[-1]
+    return total
+
+
+def _changed(obj, fields):
+    state = inspect(obj)
+    return any(state.attrs[field].history.has_changes() for field in fields)
+
+
+@on_flush(Cocktail, CocktailIngredient, Ingredient)
+def _recompute_on_flush(session, written, deleted):
+    cocktail_ids = set()
+    ingredient_ids = set()
+
+    for obj in written + deleted:
+        if isinstance(obj, CocktailIngredient):
+            cocktail_ids.add(obj.cocktail_id)
+        elif isinstance(obj, Cocktail):
+            if obj in written and (obj in session.new or _changed(obj, ('servings',))):
+                cocktail_ids.add(obj.id)
+        elif isinstance(obj, Ingredient):
+            if obj in deleted or obj in session.new or _changed(obj, NUTRITION_FIELDS):
+                ingredient_ids.add(obj.id)
+
+    conn = session.connection()
+    if ingredient_ids:
+        lines = CocktailIngredient.__table__
+        ids = sorted(ingredient_ids)
+        for chunk in chunks(ids):
+            cocktail_ids.update(conn.execute(
+                select(lines.c.cocktail_id).where(lines.c.ingredient_id.in_(chunk))
+            ).scalars())
+
+    if not cocktail_ids:
+        return
+
+    recompute(conn, cocktail_ids)
+    invalidate_after_commit(session, Cocktail.__tablename__)
+    expire_loaded(session, Cocktail, cocktail_ids, NUTRITION_COLUMNS)
@@ -0,0 +1,144 @@
+"""
+Pantry matcher for SOBRE - Premium Healthy Cocktails
+
+Each active cocktail's required ingredients (recipe lines that are neither
+optional nor garnish) form a bitset with one bit per ingredient. Recipes use a
+handful of ingredients, so each bitset is stored sparsely as its non-zero
+64-bit words. A pantry is packed into a dense bitset, and "what can I make?"
+becomes ``popcount(recipe & ~pantry)`` summed per cocktail, a few vectorized
+operations over the whole catalog.
+
+The index lives in process memory and is rebuilt lazily once the response
+cache reports that the cocktails or recipe tables have been written.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+from flask import current_app
+from sqlalchemy import select
+
+from app import db
+from app.models.cocktail import Cocktail, CocktailIngredient
+from app.services.cache import DerivedIndex
+
+# Set bits per 16-bit value
+_POPCOUNT = np.array([bin(value).count('1') for value in range(1 << 16)], dtype=np.uint8)
+
+_ONE = np.uint64(1)
+
+_Snapshot = namedtuple(
+    '_Snapshot', 'cocktail_ids ratings ingredient_ids positions word_rows word_index word_bits'
+)
+
+Match = namedtuple('Match', 'cocktail_id missing_ingredient_ids')
+
+
+def _popcount(words):
+    """Number of set bits in each element of a little-endian uint64 array"""
+    return _POPCOUNT[words.view(np.uint16)].reshape(-1, 4).sum(axis=1, dtype=np.int64)
+
+
+class PantryIndex(DerivedIndex):
+    """Bitset index of the ingredients each active cocktail requires"""
+
+    source_tables = (Cocktail.__tablename__, CocktailIngredient.__tablename__)
+
+    def build(self, version):
+        cocktails = Cocktail.__table__
+        lines = CocktailIngredient.__table__
+        rows = db.session.execute(
+            select(cocktails.c.id, cocktails.c.average_rating, lines.c.ingredient_id)
+            .join(lines, lines.c.cocktail_id == cocktails.c.id)
+            .where(
+                cocktails.c.is_active == True,
+                lines.c.is_optional.isnot(True),
+                lines.c.is_garnish.isnot(True)
+            )
+        ).all()
+
+        ratings = {row.id: row.average_rating or 0.0 for row in rows}
+        cocktail_ids = sorted(ratings)
+        ingredient_ids = sorted({row.ingredient_id for row in rows})
+        row_of = {cocktail_id: i for i, cocktail_id in enumerate(cocktail_ids)}
+        positions = {ingredient_id: i for i, ingredient_id in enumerate(ingredient_ids)}
+
+        # One (cocktail, word) entry per non-zero 64-bit word of each recipe bitset
+        words = max(1, -(-len(ingredient_ids) // 64))
+        row_index = np.array([row_of[row.id] for row in rows], dtype=np.int64)
+        bit_index = np.array([positions[row.ingredient_id] for row in rows], dtype=np.int64)
+        keys, entry = np.unique(row_index * words + bit_index // 64, return_inverse=True)
+        word_bits = np.zeros(len(keys), dtype='<u8')
+        np.bitwise_or.at(word_bits, entry, np.left_shift(_ONE, (bit_index % 64).astype(np.uint64)))
+
+        return _Snapshot(
+            cocktail_ids=np.array(cocktail_ids, dtype=np.int64),
+            ratings=np.array([ratings[cocktail_id] for cocktail_id in cocktail_ids], dtype=float),
+            ingredient_ids=np.array(ingredient_ids, dtype=np.int64),
+            positions=positions,
+            word_rows=keys // words,
+            word_index=keys % words,
+            word_bits=word_bits
+        )
+
+    def match(self, ingredient_ids, max_missing=0, limit=None):
+        """Cocktails missing at most ``max_missing`` required ingredients from ``ingredient_ids``
+
+        Returns ``(matches, counts)``: up to ``limit`` matches ordered by the
+        number of missing ingredients, then by average rating, and the number of
+        matching cocktails per missing count.
+        """
+        snapshot = self.current()
+        counts = {missing: 0 for missing in range(max_missing + 1)}
+        if not len(snapshot.cocktail_ids):
+            return [], counts
+
+        pantry = np.zeros(int(snapshot.word_index.max()) + 1, dtype='<u8')
+        for ingredient_id in set(ingredient_ids):
+            position = snapshot.positions.get(ingredient_id)
+            if position is not None:
+                pantry[position // 64] |= _ONE << np.uint64(position % 64)
+
+        missing = snapshot.word_bits & ~pantry[snapshot.word_index]
+        missing_counts = np.bincount(
+            snapshot.word_rows, weights=_popcount(missing), minlength=len(snapshot.cocktail_ids)
+        ).astype(np.int64)
+
+        selected = np.flatnonzero(missing_counts <= max_missing)
+        selected = selected[np.lexsort((-snapshot.ratings[selected], missing_counts[selected]))]
+        for missing_count, total in zip(*np.unique(missing_counts[selected], return_counts=True)):
+            counts[int(missing_count)] = int(total)
+        if limit is not None:
+            selected = selected[:limit]
+
+        # Name the missing ingredients of the returned cocktails only, peeling off
+        # the lowest set bit of each missing word (at most max_missing per word)
+        in_page = np.zeros(len(snapshot.cocktail_ids), dtype=bool)
+        in_page[selected] = True
+        entries = np.flatnonzero(in_page[snapshot.word_rows] & (missing != 0))
+        rows = snapshot.word_rows[entries]
+        bits = missing[entries]
+        missing_by_row = {}
+        while len(bits):
+            lowest = bits & (~bits + _ONE)
+            positions = snapshot.word_index[entries] * 64 + np.log2(lowest).astype(np.int64)
+            for row, position in zip(rows.tolist(), positions.tolist()):
+                missing_by_row.setdefault(row, []).append(int(snapshot.ingredient_ids[position]))
+            remaining = (bits ^ lowest) != 0
+            entries, rows, bits = entries[remaining], rows[remaining], (bits ^ lowest)[remaining]
+
+        matches = [
+            Match(int(snapshot.cocktail_ids[row]), sorted(missing_by_row.get(row, [])))
+            for row in selected.tolist()
+        ]
+        return matches, counts
+
+
+def init_app(app):
+    """Register the pantry index on the application"""
+    app.extensions['pantry'] = PantryIndex()
+
+
+def match(ingredient_ids, max_missing=0, limit=None):
+    """Cocktails makeable from ``ingredient_ids`` with at most ``max_missing`` ingredients missing"""
+    return current_app.extensions['pantry'].match(ingredient_ids, max_missing, limit)
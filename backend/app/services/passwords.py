@@ -0,0 +1,127 @@
+"""
+Password hashing for SOBRE - Premium Healthy Cocktails
+
+Hashing and verifying passwords is deliberately slow, so it runs in a small
+process pool (``PASSWORD_POOL_SIZE`` processes) instead of the request
+worker: a burst of logins takes at most that many cores and leaves the rest
+of the API responsive. At most ``PASSWORD_POOL_MAX_PENDING`` operations may
+be queued or running; a caller that can't get a slot within
+``PASSWORD_POOL_WAIT`` seconds gets ``PasswordPoolBusy`` rather than piling up.
+A pool size of 0 hashes inline. Pool processes are spawned rather than
+forked from the threaded server, so a script that starts the app directly
+must keep its startup under ``if __name__ == '__main__'``.
+
+Hashes use werkzeug's ``method$salt$hash`` format with ``PASSWORD_HASH_METHOD``
+(e.g. ``pbkdf2:sha256:600000`` or ``scrypt:32768:8:1``). A stored hash made with
+other parameters still verifies, and ``needs_rehash`` tells the login to store
+a fresh one. Stored hashes carry werkzeug's fully spelled-out method (plain
+``pbkdf2:sha256`` is stored with its iteration count), so they are compared
+with the configured method spelled out the same way.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from flask import current_app
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+DEFAULT_METHOD = 'pbkdf2:sha256:600000'
+
+
+def spelled_method(method):
+    """``method`` with werkzeug's defaults filled in, as it prefixes a stored hash"""
+    name, *args = method.split(':')
+    if name == 'pbkdf2' and len(args) < 2:
+        hash_name = args[0] if args else 'sha256'
+        return f'pbkdf2:{hash_name}:{DEFAULT_PBKDF2_ITERATIONS}'
+    if name == 'scrypt' and not args:
+        return f'scrypt:{2 ** 15}:8:1'
+    return method
+
+
+class PasswordPoolBusy(RuntimeError):
+    """Raised when every password hashing slot stays taken for too long"""
+
+
+class PasswordHasher:
+    """Size-bounded process pool running werkzeug's hash functions"""
+
+    def __init__(self, app):
+        self.method = app.config.get('PASSWORD_HASH_METHOD', DEFAULT_METHOD)
+        self.salt_length = app.config.get('PASSWORD_SALT_LENGTH', 16)
+        self.size = app.config.get('PASSWORD_POOL_SIZE', 2)
+        self.wait = app.config.get('PASSWORD_POOL_WAIT', 5.0)
+        self.stored_method = spelled_method(self.method)
+
+        self._slots = threading.BoundedSemaphore(max(1, app.config.get('PASSWORD_POOL_MAX_PENDING', 16)))
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pid = None
+
+    def _executor(self):
+        # A pool doesn't survive fork, so a forked server worker starts its own
+        with self._lock:
+            if self._pool is None or self._pid != os.getpid():
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.size, mp_context=multiprocessing.get_context('spawn')
+                )
+                self._pid = os.getpid()
+            return self._pool
+
+    def _run(self, fn, *args):
+        if self.size <= 0:
+            return fn(*args)
+        if not self._slots.acquire(timeout=self.wait):
+            raise PasswordPoolBusy('Password hashing is at capacity')
+        try:
+            future = self._executor().submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method, self.salt_length)
+
+    def verify(self, password_hash, password):
+        if not password_hash:
+            return False
+        return self._run(check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        method, _, rest = (password_hash or '').partition('$')
+        salt = rest.partition('$')[0]
+        return method != self.stored_method or len(salt) != self.salt_length
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None and self._pid == os.getpid():
+                self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+def init_app(app):
+    """Register the password hasher on the application"""
+    app.extensions['password_hasher'] = PasswordHasher(app)
+
+
+def _hasher():
+    return current_app.extensions['password_hasher']
+
+
+def hash_password(password):
+    """A new hash of ``password`` with the configured method"""
+    return _hasher().hash(password)
+
+
+def verify_password(password_hash, password):
+    """Whether ``password`` matches ``password_hash``, whatever method made it"""
+    return _hasher().verify(password_hash, password)
+
+
+def needs_rehash(password_hash):
+    """Whether ``password_hash`` was made with other than the configured parameters"""
+    return _hasher().needs_rehash(password_hash)
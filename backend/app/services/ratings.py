@@ -0,0 +1,122 @@
+"""
+Review aggregate maintenance for SOBRE - Premium Healthy Cocktails
+
+Each cocktail stores the count, sum and 1-5 histogram of its approved
+reviews. Review writes apply their delta with a single UPDATE inside the
+flushing transaction, so the aggregates never drift from the reviews.
+"""
+
+from collections import defaultdict
+
+from sqlalchemy import and_, func, select, update
+
+from app import db
+from app.models.cocktail import Cocktail, CocktailReview
+from app.services.cache import invalidate_after_commit
+from app.services.events import expire_loaded, on_flush, previous_value
+
+RATING_FIELDS = (
+    'rating_count', 'rating_sum', 'average_rating',
+    'rating_1_count', 'rating_2_count', 'rating_3_count', 'rating_4_count', 'rating_5_count'
+)
+
+
+def _contribution(cocktail_id, rating, is_approved):
+    """The ``(cocktail_id, rating)`` a review adds to the aggregates, if any"""
+    if not is_approved or cocktail_id is None or rating not in range(1, 6):
+        return None
+    return cocktail_id, rating
+
+
+def _apply_deltas(conn, deltas):
+    cocktails = Cocktail.__table__
+    for cocktail_id, by_rating in deltas.items():
+        if not any(by_rating.values()):
+            continue
+        count = sum(by_rating.values())
+        total = sum(rating * n for rating, n in by_rating.items())
+
+        values = {
+            'rating_count': cocktails.c.rating_count + count,
+            'rating_sum': cocktails.c.rating_sum + total,
+            # SET expressions see the pre-update row, so recompute from the new totals
+            'average_rating': db.case(
+                (cocktails.c.rating_count + count > 0,
+                 (cocktails.c.rating_sum + total) * 1.0 / (cocktails.c.rating_count + count)),
+                else_=0.0
+            )
+        }
+        for rating, n in by_rating.items():
+            if n:
+                column = cocktails.c[f'rating_{rating}_count']
+                values[column.name] = column + n
+
+        conn.execute(update(cocktails).where(cocktails.c.id == cocktail_id).values(**values))
+
+
+@on_flush(CocktailReview)
+def _update_aggregates_on_flush(session, written, deleted):
+    deltas = defaultdict(lambda: defaultdict(int))
+
+    for review in written + deleted:
+        if review in session.new:
+            before = None
+        else:
+            before = _contribution(
+                previous_value(review, 'cocktail_id'),
+                previous_value(review, 'rating'),
+                previous_value(review, 'is_approved')
+            )
+
+        if review in session.deleted:
+            after = None
+        else:
+            after = _contribution(review.cocktail_id, review.rating, review.is_approved)
+
+        if before == after:
+            continue
+        if before:
+            deltas[before[0]][before[1]] -= 1
+        if after:
+            deltas[after[0]][after[1]] += 1
+
+    if not deltas:
+        return
+
+    _apply_deltas(session.connection(), deltas)
+    invalidate_after_commit(session, Cocktail.__tablename__)
+
+    expire_loaded(session, Cocktail, deltas, RATING_FIELDS)
+
+
+def recompute_all(conn=None):
+    """Recompute every cocktail's aggregates from its reviews in one UPDATE
+
+    Runs on ``conn`` when given (a migration passes its own), otherwise in the
+    session, committing it.
+    """
+    cocktails = Cocktail.__table__
+    reviews = CocktailReview.__table__
+    approved = and_(
+        reviews.c.cocktail_id == cocktails.c.id,
+        reviews.c.is_approved == True,
+        reviews.c.rating.between(1, 5)
+    )
+
+    def aggregate(expression, *criteria):
+        return select(expression).where(approved, *criteria).scalar_subquery()
+
+    values = {
+        'rating_count': aggregate(func.count(reviews.c.id)),
+        'rating_sum': aggregate(func.coalesce(func.sum(reviews.c.rating), 0)),
+        'average_rating': aggregate(func.coalesce(func.avg(reviews.c.rating), 0.0))
+    }
+    for rating in range(1, 6):
+        values[f'rating_{rating}_count'] = aggregate(func.count(reviews.c.id), reviews.c.rating == rating)
+
+    statement = update(cocktails).values(**values)
+    if conn is not None:
+        return conn.execute(statement).rowcount
+    result = db.session.execute(statement)
+    db.session.commit()
+    return result.rowcount
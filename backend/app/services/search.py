@@ -0,0 +1,510 @@
+"""
+Full-text search service for SOBRE - Premium Healthy Cocktails
+
+Cocktails and ingredients are kept in an inverted index that is updated as
+part of every write. The index lives in an FTS5 virtual table on SQLite, in a
+GIN-indexed tsvector table on PostgreSQL, and in process memory on anything
+else (or when FTS5 is not compiled in).
+"""
+
+import bisect
+import math
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+
+from flask import current_app
+from sqlalchemy import select, text
+from sqlalchemy.exc import OperationalError
+
+from app import db
+from app.models.cocktail import Cocktail, CocktailIngredient
+from app.models.ingredient import Ingredient
+from app.services.events import after_commit, chunks, on_flush
+
+# Underscores split words the same way the FTS tokenizers do
+_TOKEN_RE = re.compile(r'[^\W_]+', re.UNICODE)
+
+
+def normalize(value):
+    """Lowercase and strip accents so 'Açaí' matches 'acai'"""
+    decomposed = unicodedata.normalize('NFKD', value or '')
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+
+def tokenize(value):
+    """Split text into normalized search terms"""
+    return _TOKEN_RE.findall(normalize(value))
+
+
+def _join(values):
+    return ' '.join(str(value) for value in values or [])
+
+
+def _cocktail_documents(conn, ids=None):
+    """Yield ``(id, fields)`` for active cocktails, optionally limited to ``ids``"""
+    cocktails = Cocktail.__table__
+    lines = CocktailIngredient.__table__
+    ingredients = Ingredient.__table__
+
+    stmt = select(
+        cocktails.c.id, cocktails.c.name, cocktails.c.description, cocktails.c.health_benefits
+    ).where(cocktails.c.is_active == True)
+    if ids is not None:
+        stmt = stmt.where(cocktails.c.id.in_(ids))
+    rows = conn.execute(stmt).all()
+    if not rows:
+        return
+
+    ingredient_names = defaultdict(list)
+    names_stmt = select(lines.c.cocktail_id, ingredients.c.name).join(
+        ingredients, ingredients.c.id == lines.c.ingredient_id
+    )
+    if ids is not None:
+        names_stmt = names_stmt.where(lines.c.cocktail_id.in_(ids))
+    for cocktail_id, name in conn.execute(names_stmt):
+        ingredient_names[cocktail_id].append(name)
+
+    for row in rows:
+        yield row.id, {
+            'name': row.name,
+            'ingredients': _join(ingredient_names[row.id]),
+            'health_benefits': _join(row.health_benefits),
+            'description': row.description
+        }
+
+
+def _ingredient_documents(conn, ids=None):
+    """Yield ``(id, fields)`` for active ingredients, optionally limited to ``ids``"""
+    ingredients = Ingredient.__table__
+
+    stmt = select(
+        ingredients.c.id, ingredients.c.name, ingredients.c.category,
+        ingredients.c.health_benefits, ingredients.c.description
+    ).where(ingredients.c.is_active == True)
+    if ids is not None:
+        stmt = stmt.where(ingredients.c.id.in_(ids))
+
+    for row in conn.execute(stmt):
+        yield row.id, {
+            'name': row.name,
+            'health_benefits': _join(row.health_benefits),
+            'category': (row.category or '').replace('_', ' '),
+            'description': row.description
+        }
+
+
+class SearchIndex:
+    """Definition of one searchable collection"""
+
+    def __init__(self, name, model, fields, weights, loader):
+        self.name = name
+        self.model = model
+        self.table = f'search_{name}'
+        self.fields = fields  # Ordered from most to least important
+        self.weights = weights
+        self.loader = loader
+
+
+INDEXES = {
+    'cocktails': SearchIndex(
+        'cocktails',
+        model=Cocktail,
+        fields=('name', 'ingredients', 'health_benefits', 'description'),
+        weights=(10.0, 4.0, 3.0, 1.0),
+        loader=_cocktail_documents
+    ),
+    'ingredients': SearchIndex(
+        'ingredients',
+        model=Ingredient,
+        fields=('name', 'health_benefits', 'category', 'description'),
+        weights=(10.0, 3.0, 2.0, 1.0),
+        loader=_ingredient_documents
+    )
+}
+
+
+class SQLiteBackend:
+    """FTS5 virtual tables ranked with bm25()"""
+
+    transactional = True
+
+    def ensure_schema(self, conn):
+        """Create missing FTS tables; return the indexes that need a rebuild"""
+        created = []
+        for index in INDEXES.values():
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {'name': index.table}
+            ).first()
+            if exists:
+                continue
+            conn.execute(text(
+                f"CREATE VIRTUAL TABLE {index.table} USING fts5("
+                f"{', '.join(index.fields)}, "
+                f"tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+            ))
+            created.append(index)
+        return created
+
+    def remove(self, conn, index, ids):
+        for chunk in chunks(ids):
+            conn.execute(
+                text(f'DELETE FROM {index.table} WHERE rowid = :id'),
+                [{'id': doc_id} for doc_id in chunk]
+            )
+
+    def upsert(self, conn, index, documents):
+        if not documents:
+            return
+        self.remove(conn, index, [doc_id for doc_id, _ in documents])
+        columns = ', '.join(index.fields)
+        params = ', '.join(f':{field}' for field in index.fields)
+        conn.execute(
+            text(f'INSERT INTO {index.table} (rowid, {columns}) VALUES (:id, {params})'),
+            [dict(fields, id=doc_id) for doc_id, fields in documents]
+        )
+
+    def search(self, conn, index, terms, limit, offset):
+        match = ' '.join(f'"{term}"*' for term in terms)
+        weights = ', '.join(str(weight) for weight in index.weights)
+        rows = conn.execute(text(
+            f'SELECT rowid FROM {index.table} WHERE {index.table} MATCH :match '
+            f'ORDER BY bm25({index.table}, {weights}) LIMIT :limit OFFSET :offset'
+        ), {'match': match, 'limit': limit, 'offset': offset})
+        return [row[0] for row in rows]
+
+
+class PostgresBackend:
+    """Weighted tsvector tables with a GIN index, ranked with ts_rank_cd()"""
+
+    transactional = True
+
+    _LABELS = ('A', 'B', 'C', 'D')
+
+    def ensure_schema(self, conn):
+        created = []
+        for index in INDEXES.values():
+            exists = conn.execute(text('SELECT to_regclass(:name)'), {'name': index.table}).scalar()
+            if exists:
+                continue
+            conn.execute(text(
+                f'CREATE TABLE {index.table} (id INTEGER PRIMARY KEY, document TSVECTOR NOT NULL)'
+            ))
+            conn.execute(text(
+                f'CREATE INDEX ix_{index.table}_document ON {index.table} USING GIN (document)'
+            ))
+            created.append(index)
+        return created
+
+    def remove(self, conn, index, ids):
+        for chunk in chunks(ids):
+            conn.execute(
+                text(f'DELETE FROM {index.table} WHERE id = ANY(:ids)'),
+                {'ids': chunk}
+            )
+
+    def upsert(self, conn, index, documents):
+        if not documents:
+            return
+        vector = ' || '.join(
+            f"setweight(to_tsvector('simple', :{field}), '{label}')"
+            for field, label in zip(index.fields, self._LABELS)
+        )
+        # Accents are stripped in Python so the unaccent extension is not required
+        conn.execute(
+            text(
+                f'INSERT INTO {index.table} (id, document) VALUES (:id, {vector}) '
+                f'ON CONFLICT (id) DO UPDATE SET document = EXCLUDED.document'
+            ),
+            [
+                dict({field: normalize(value) for field, value in fields.items()}, id=doc_id)
+                for doc_id, fields in documents
+            ]
+        )
+
+    def search(self, conn, index, terms, limit, offset):
+        query = ' & '.join(f'{term}:*' for term in terms)
+        rows = conn.execute(text(
+            f"SELECT id FROM {index.table}, to_tsquery('simple', :query) AS query "
+            f'WHERE document @@ query '
+            f'ORDER BY ts_rank_cd(document, query) DESC, id LIMIT :limit OFFSET :offset'
+        ), {'query': query, 'limit': limit, 'offset': offset})
+        return [row[0] for row in rows]
+
+
+class MemoryBackend:
+    """Pure-Python inverted index used when the database has no FTS support
+
+    Writes only mark documents stale; they are reloaded on the next search.
+    """
+
+    transactional = False
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings = {name: defaultdict(dict) for name in INDEXES}
+        self._doc_terms = {name: {} for name in INDEXES}
+        self._sorted_terms = {name: None for name in INDEXES}
+        self._stale = {name: set() for name in INDEXES}
+        self._loaded = set()
+
+    def ensure_schema(self, conn):
+        return []
+
+    def reset(self, index):
+        """Drop ``index`` so the next search reloads it from the database"""
+        with self._lock:
+            self._postings[index.name] = defaultdict(dict)
+            self._doc_terms[index.name] = {}
+            self._sorted_terms[index.name] = None
+            self._stale[index.name].clear()
+            self._loaded.discard(index.name)
+
+    def mark_stale(self, index, ids):
+        with self._lock:
+            self._stale[index.name].update(ids)
+
+    def remove(self, conn, index, ids):
+        with self._lock:
+            postings = self._postings[index.name]
+            doc_terms = self._doc_terms[index.name]
+            for doc_id in ids:
+                for term in doc_terms.pop(doc_id, ()):
+                    docs = postings.get(term)
+                    if docs is None:
+                        continue
+                    docs.pop(doc_id, None)
+                    if not docs:
+                        del postings[term]
+            self._sorted_terms[index.name] = None
+
+    def upsert(self, conn, index, documents):
+        with self._lock:
+            self.remove(conn, index, [doc_id for doc_id, _ in documents])
+            postings = self._postings[index.name]
+            doc_terms = self._doc_terms[index.name]
+            for doc_id, fields in documents:
+                scores = defaultdict(float)
+                for field, weight in zip(index.fields, index.weights):
+                    for term in tokenize(fields.get(field)):
+                        scores[term] += weight
+                for term, score in scores.items():
+                    postings[term][doc_id] = score
+                doc_terms[doc_id] = tuple(scores)
+
+    def _refresh(self, conn, index):
+        with self._lock:
+            if index.name not in self._loaded:
+                self.upsert(conn, index, list(index.loader(conn)))
+                self._loaded.add(index.name)
+                self._stale[index.name].clear()
+                return
+
+            stale = self._stale[index.name]
+            if not stale:
+                return
+            ids, self._stale[index.name] = list(stale), set()
+            reindex(conn, self, index, ids)
+
+    def _matching(self, index, term):
+        """Return ``{doc_id: score}`` for every indexed term starting with ``term``"""
+        terms = self._sorted_terms[index.name]
+        if terms is None:
+            terms = self._sorted_terms[index.name] = sorted(self._postings[index.name])
+
+        postings = self._postings[index.name]
+        total = max(len(self._doc_terms[index.name]), 1)
+        matches = defaultdict(float)
+        position = bisect.bisect_left(terms, term)
+        while position < len(terms) and terms[position].startswith(term):
+            docs = postings[terms[position]]
+            idf = math.log(1 + total / len(docs))
+            for doc_id, score in docs.items():
+                matches[doc_id] = max(matches[doc_id], score * idf)
+            position += 1
+        return matches
+
+    def search(self, conn, index, terms, limit, offset):
+        self._refresh(conn, index)
+        with self._lock:
+            scores = None
+            for term in terms:
+                matches = self._matching(index, term)
+                if scores is None:
+                    scores = matches
+                else:
+                    scores = {
+                        doc_id: score + matches[doc_id]
+                        for doc_id, score in scores.items() if doc_id in matches
+                    }
+                if not scores:
+                    return []
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [doc_id for doc_id, _ in ranked[offset:offset + limit]]
+
+
+class SearchEngine:
+    """Per-application search state: the chosen backend and schema status"""
+
+    def __init__(self, app):
+        self.preferred = app.config.get('SEARCH_BACKEND', 'auto')
+        self.backend = None
+        self._ready = False
+        self._lock = threading.Lock()
+
+    def _select_backend(self, conn):
+        dialect = conn.dialect.name
+        if self.preferred == 'memory':
+            return MemoryBackend()
+        if dialect == 'postgresql':
+            return PostgresBackend()
+        if dialect == 'sqlite':
+            try:
+                enabled = conn.execute(
+                    text("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+                ).scalar()
+            except OperationalError:
+                enabled = False
+            if enabled:
+                return SQLiteBackend()
+        return MemoryBackend()
+
+    def _setup(self, conn):
+        if self.backend is None:
+            self.backend = self._select_backend(conn)
+        for index in self.backend.ensure_schema(conn):
+            rebuild_index(conn, self.backend, index)
+
+    def _mark_ready(self):
+        self._ready = True
+
+    def prepare(self, session=None):
+        """Pick a backend and create its schema, building any new index from scratch
+
+        Inside a flush the DDL joins the session's transaction and only counts
+        as done once that transaction commits; otherwise it is committed on a
+        connection of its own.
+        """
+        if self._ready:
+            return self.backend
+        with self._lock:
+            if self._ready:
+                return self.backend
+            if session is None:
+                with db.engine.begin() as conn:
+                    self._setup(conn)
+                self._ready = True
+            else:
+                self._setup(session.connection())
+                after_commit(session, self._mark_ready)
+        return self.backend
+
+
+def init_app(app):
+    """Register the search engine on the application"""
+    app.extensions['search'] = SearchEngine(app)
+
+
+def _engine():
+    return current_app.extensions['search']
+
+
+def reindex(conn, backend, index, ids):
+    """Refresh the given documents of ``index``, dropping ones that no longer qualify"""
+    for chunk in chunks(ids):
+        documents = list(index.loader(conn, chunk))
+        found = {doc_id for doc_id, _ in documents}
+        backend.remove(conn, index, [doc_id for doc_id in chunk if doc_id not in found])
+        backend.upsert(conn, index, documents)
+
+
+def rebuild_index(conn, backend, index, batch_size=1000):
+    """Re-index every document of ``index`` in id-ordered batches"""
+    if not backend.transactional:
+        backend.reset(index)
+        return
+
+    table = index.model.__table__
+    last_id = 0
+    while True:
+        ids = conn.execute(
+            select(table.c.id).where(table.c.id > last_id).order_by(table.c.id).limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            break
+        reindex(conn, backend, index, ids)
+        last_id = ids[-1]
+
+
+def rebuild():
+    """Rebuild every search index from the current table contents"""
+    backend = _engine().prepare()
+    with db.engine.begin() as conn:
+        for index in INDEXES.values():
+            rebuild_index(conn, backend, index)
+
+
+def search_ids(name, query, limit=20, offset=0):
+    """Return ids from the ``name`` index matching ``query``, best match first"""
+    terms = tokenize(query)
+    if not terms:
+        return []
+    backend = _engine().prepare()
+    return backend.search(db.session.connection(), INDEXES[name], terms, limit, offset)
+
+
+def fetch_ranked(query, model, ids):
+    """Load ``ids`` through ``query`` and return them in ranking order"""
+    if not ids:
+        return []
+    rows = {row.id: row for row in query.filter(model.id.in_(ids)).all()}
+    return [rows[row_id] for row_id in ids if row_id in rows]
+
+
+def rank_order(column, ids):
+    """ORDER BY expression that keeps rows in the order of ``ids``"""
+    return db.case({row_id: position for position, row_id in enumerate(ids)}, value=column)
+
+
+@on_flush(Cocktail, CocktailIngredient, Ingredient)
+def _reindex_on_flush(session, written, deleted):
+    engine = current_app.extensions.get('search')
+    if engine is None:
+        return
+
+    cocktail_ids = set()
+    ingredient_ids = set()
+    for obj in written + deleted:
+        if isinstance(obj, Cocktail):
+            cocktail_ids.add(obj.id)
+        elif isinstance(obj, CocktailIngredient):
+            cocktail_ids.add(obj.cocktail_id)
+        elif isinstance(obj, Ingredient):
+            ingredient_ids.add(obj.id)
+
+    conn = session.connection()
+    if ingredient_ids:
+        # Renaming an ingredient changes the text of every cocktail that uses it
+        lines = CocktailIngredient.__table__
+        for chunk in chunks(ingredient_ids):
+            cocktail_ids.update(conn.execute(
+                select(lines.c.cocktail_id).where(lines.c.ingredient_id.in_(chunk))
+            ).scalars())
+
+    pending = (
+        (INDEXES['cocktails'], cocktail_ids - {None}),
+        (INDEXES['ingredients'], ingredient_ids - {None})
+    )
+    backend = engine.prepare(session)
+
+    if not backend.transactional:
+        def mark_stale():
+            for index, ids in pending:
+                backend.mark_stale(index, ids)
+        after_commit(session, mark_stale)
+        return
+
+    for index, ids in pending:
+        reindex(conn, backend, index, ids)
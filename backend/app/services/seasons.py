@@ -0,0 +1,152 @@
+"""
+Seasonality index for SOBRE - Premium Healthy Cocktails
+
+``Ingredient.season_mask`` is a 12-bit mask (bit 0 = January) kept in sync
+with the ``peak_season_months`` JSON array; an ingredient without peak months
+is available all year. ``Cocktail.season_mask`` ANDs the masks of its
+non-optional ingredients, so a cocktail is in season in a month only when
+everything it needs is. "In season" filters then test an integer column
+instead of parsing JSON.
+"""
+
+import calendar
+from datetime import datetime
+
+from sqlalchemy import bindparam, inspect, select, update
+
+from app import db
+from app.models.cocktail import Cocktail, CocktailIngredient
+from app.models.ingredient import Ingredient
+from app.services.cache import invalidate_after_commit
+from app.services.events import chunks, expire_loaded, on_flush
+
+ALL_YEAR = (1 << 12) - 1
+
+_MONTH_NAMES = {
+    name.lower(): number
+    for names in (calendar.month_name, calendar.month_abbr)
+    for number, name in enumerate(names) if name
+}
+
+
+def month_number(value):
+    """Month 1-12 from a number, a month name or 'now'; None if unrecognized"""
+    if isinstance(value, str):
+        value = value.strip().lower()
+        if value == 'now':
+            return datetime.utcnow().month
+        if value in _MONTH_NAMES:
+            return _MONTH_NAMES[value]
+    try:
+        month = int(value)
+    except (TypeError, ValueError):
+        return None
+    return month if 1 <= month <= 12 else None
+
+
+def month_bit(month):
+    """Mask bit for ``month`` (1-12)"""
+    return 1 << (month - 1)
+
+
+def season_mask(months):
+    """Mask for a ``peak_season_months`` value; no usable months means all year"""
+    mask = 0
+    for value in months or []:
+        month = month_number(value)
+        if month is not None:
+            mask |= month_bit(month)
+    return mask or ALL_YEAR
+
+
+def in_season(column, month):
+    """Criterion for rows of a season mask ``column`` that are in season in ``month``"""
+    return column.op('&')(month_bit(month)) != 0
+
+
+def recompute_cocktails(conn, cocktail_ids):
+    """Recompute the season masks of ``cocktail_ids`` from their non-optional ingredients"""
+    cocktail_ids = sorted(set(cocktail_ids) - {None})
+    lines = CocktailIngredient.__table__
+    ingredients = Ingredient.__table__
+    cocktails = Cocktail.__table__
+
+    for chunk in chunks(cocktail_ids):
+        masks = dict.fromkeys(chunk, ALL_YEAR)
+        for cocktail_id, mask in conn.execute(
+            select(lines.c.cocktail_id, ingredients.c.season_mask)
+            .join(ingredients, ingredients.c.id == lines.c.ingredient_id)
+            .where(lines.c.cocktail_id.in_(chunk), lines.c.is_optional.isnot(True))
+        ):
+            masks[cocktail_id] &= ALL_YEAR if mask is None else mask
+
+        conn.execute(
+            update(cocktails).where(cocktails.c.id == bindparam('cocktail_id'))
+            .values(season_mask=bindparam('mask')),
+            [{'cocktail_id': cocktail_id, 'mask': mask} for cocktail_id, mask in masks.items()]
+        )
+    return len(cocktail_ids)
+
+
+def sync_all(batch_size=1000, conn=None):
+    """Backfill every ingredient and cocktail season mask
+
+    Runs on ``conn`` when given (a migration passes its own), otherwise in a
+    transaction of its own.
+    """
+    if conn is None:
+        with db.engine.begin() as conn:
+            return sync_all(batch_size, conn)
+
+    ingredients = Ingredient.__table__
+    cocktails = Cocktail.__table__
+    rows = conn.execute(select(ingredients.c.id, ingredients.c.peak_season_months)).all()
+    for start in range(0, len(rows), batch_size):
+        conn.execute(
+            update(ingredients).where(ingredients.c.id == bindparam('ingredient_id'))
+            .values(season_mask=bindparam('mask')),
+            [{'ingredient_id': row.id, 'mask': season_mask(row.peak_season_months)}
+             for row in rows[start:start + batch_size]]
+        )
+    cocktail_ids = conn.execute(select(cocktails.c.id)).scalars().all()
+    recompute_cocktails(conn, cocktail_ids)
+    return len(rows), len(cocktail_ids)
+
+
+def _changed(obj, field):
+    return inspect(obj).attrs[field].history.has_changes()
+
+
+@on_flush(Ingredient, CocktailIngredient)
+def _sync_on_flush(session, written, deleted):
+    conn = session.connection()
+    ingredients = Ingredient.__table__
+    lines = CocktailIngredient.__table__
+    cocktail_ids = set()
+    ingredient_masks = {}
+
+    for obj in written + deleted:
+        if isinstance(obj, CocktailIngredient):
+            cocktail_ids.add(obj.cocktail_id)
+        elif obj in written and (obj in session.new or _changed(obj, 'peak_season_months')):
+            ingredient_masks[obj.id] = season_mask(obj.peak_season_months)
+
+    if ingredient_masks:
+        conn.execute(
+            update(ingredients).where(ingredients.c.id == bindparam('ingredient_id'))
+            .values(season_mask=bindparam('mask')),
+            [{'ingredient_id': ingredient_id, 'mask': mask} for ingredient_id, mask in ingredient_masks.items()]
+        )
+        ids = sorted(ingredient_masks)
+        for chunk in chunks(ids):
+            cocktail_ids.update(conn.execute(
+                select(lines.c.cocktail_id).where(lines.c.ingredient_id.in_(chunk))
+            ).scalars())
+        expire_loaded(session, Ingredient, ingredient_masks, ['season_mask'])
+
+    if not cocktail_ids:
+        return
+
+    recompute_cocktails(conn, cocktail_ids)
+    invalidate_after_commit(session, Cocktail.__tablename__)
+    expire_loaded(session, Cocktail, cocktail_ids, ['season_mask'])
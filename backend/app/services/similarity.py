@@ -0,0 +1,494 @@
+"""
+Similar-cocktail recommendations for SOBRE - Premium Healthy Cocktails
+
+Every active cocktail is encoded as a feature vector made of four blocks:
+its ingredients weighted by quantity, its flavor profile, its dietary tags
+and its wellness category. Each block is L2-normalized and scaled by the
+square root of its weight, so the cosine similarity of two cocktails is the
+weighted sum of the per-block cosines.
+
+The top-K neighbours of each cocktail are stored in ``cocktail_similarities``
+so serving recommendations is a single indexed lookup. A full rebuild
+computes the similarity matrix in row blocks; recipe and tag writes only
+recompute the neighbour lists they can have changed.
+
+Refreshes stay out of the writer's transaction: a flush only notes the
+changed cocktails, and once the write commits they are queued for a
+background thread that refreshes them in a transaction of its own,
+coalescing writes that arrive while it works. The stored lists therefore
+trail recipe edits by the time a refresh takes. With
+``SIMILARITY_REFRESH_ASYNC`` off, the refresh runs right after the commit
+instead. Between refreshes the feature matrix is kept in memory, and a
+refresh only reads the changed cocktails to patch it.
+"""
+
+import os
+import threading
+import time
+from collections import defaultdict, namedtuple
+
+import numpy as np
+from flask import current_app
+from sqlalchemy import delete, func, insert, inspect, select
+
+from app import db
+from app.models.cocktail import Cocktail, CocktailIngredient, CocktailSimilarity
+from app.services import cache
+from app.services.events import after_commit, chunks, on_flush
+from app.services.nutrition import grams_per_unit
+from app.services.tags import slugify
+
+# Share of the similarity each feature block contributes
+BLOCK_WEIGHTS = {
+    'ingredient': 0.6,
+    'flavor': 0.2,
+    'dietary': 0.1,
+    'category': 0.1
+}
+
+# Cocktail fields that feed the feature vector
+FEATURE_FIELDS = ('flavor_profile', 'dietary_tags', 'wellness_category', 'is_active')
+
+# Weight given to one unit of a count-based line such as "6 leaves"
+COUNT_UNIT_GRAMS = 5.0
+
+# Cache tag bumped by every committed write to a feature, so a process can tell whether its matrix missed one
+FEATURES_TAG = 'cocktail_features'
+
+# Stored scores are rounded, so comparisons against them allow for that
+_SCORE_TOLERANCE = 1e-6
+
+_BLOCK_ROWS = 512
+
+# Blocks with a large, sparse vocabulary; the rest are small enough to keep dense
+SPARSE_BLOCKS = ('ingredient',)
+
+Vectors = namedtuple('Vectors', 'ids row_of dense sparse_rows sparse_columns')
+
+# Compressed sparse rows (or columns): the entries of row i are indptr[i]:indptr[i + 1]
+_Compressed = namedtuple('_Compressed', 'indptr indices values')
+
+
+def _features(conn, cocktail_ids=None):
+    """``{cocktail_id: {(block, key): weight}}`` for every active cocktail, or those of ``cocktail_ids``"""
+    if cocktail_ids is not None:
+        cocktail_ids = sorted(set(cocktail_ids) - {None})
+        features = {}
+        for chunk in chunks(cocktail_ids):
+            features.update(_read_features(conn, chunk))
+        return features
+    return _read_features(conn)
+
+
+def _read_features(conn, chunk=None):
+    cocktails = Cocktail.__table__
+    lines = CocktailIngredient.__table__
+    rows = select(cocktails.c.id, cocktails.c.flavor_profile, cocktails.c.dietary_tags,
+                  cocktails.c.wellness_category).where(cocktails.c.is_active == True)
+    recipe = (
+        select(lines.c.cocktail_id, lines.c.ingredient_id, lines.c.quantity, lines.c.unit)
+        .join(cocktails, cocktails.c.id == lines.c.cocktail_id)
+        .where(cocktails.c.is_active == True)
+    )
+    if chunk is not None:
+        rows = rows.where(cocktails.c.id.in_(chunk))
+        recipe = recipe.where(lines.c.cocktail_id.in_(chunk))
+
+    features = {}
+    for row in conn.execute(rows):
+        weights = features[row.id] = defaultdict(float)
+        for block, values in (('flavor', row.flavor_profile), ('dietary', row.dietary_tags)):
+            for value in values or []:
+                slug = slugify(value)
+                if slug:
+                    weights[(block, slug)] = 1.0
+        if row.wellness_category:
+            weights[('category', row.wellness_category.strip().lower())] = 1.0
+
+    for line in conn.execute(recipe):
+        grams = (line.quantity or 0) * (grams_per_unit(line.unit) or COUNT_UNIT_GRAMS)
+        features[line.cocktail_id][('ingredient', line.ingredient_id)] += max(grams, 0.0)
+
+    return features
+
+
+def _compress(major, minor, values, size):
+    order = np.lexsort((minor, major))
+    indptr = np.zeros(size + 1, dtype=np.int64)
+    np.cumsum(np.bincount(major, minlength=size), out=indptr[1:])
+    return _Compressed(indptr, minor[order], values[order])
+
+
+def _ranges(starts, lengths):
+    """Concatenation of ``arange(start, start + length)`` for each pair"""
+    total = int(lengths.sum())
+    return np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+
+
+class FeatureMatrix:
+    """Block-normalized, block-weighted vectors of a set of cocktails
+
+    Every block is normalized per cocktail, so a cocktail's entries depend on
+    its own features only and rows can be replaced one at a time. Small
+    blocks are stacked into a dense matrix; sparse blocks are kept in
+    compressed row and column form so their dot products only touch shared
+    entries.
+    """
+
+    def __init__(self):
+        # Column of each feature key, per block; keys are never removed, so columns stay put
+        self.columns = {block: {} for block in BLOCK_WEIGHTS}
+        # cocktail_id -> (block numbers, columns, values) of its nonzero entries
+        self.rows = {}
+        self._vectors = None
+
+    def update(self, features, removed=()):
+        """Drop the cocktails in ``removed``, then (re)encode the ones in ``features``"""
+        for cocktail_id in removed:
+            self.rows.pop(cocktail_id, None)
+        for cocktail_id, weights in features.items():
+            self.rows[cocktail_id] = self._encode(weights)
+        self._vectors = None
+
+    def _encode(self, weights):
+        blocks, columns, values = [], [], []
+        for number, (block, weight) in enumerate(BLOCK_WEIGHTS.items()):
+            entries = [(key, value) for (kind, key), value in weights.items() if kind == block and value > 0]
+            if not entries:
+                continue
+            scale = np.sqrt(weight) / np.sqrt(sum(value ** 2 for _, value in entries))
+            column_of = self.columns[block]
+            for key, value in entries:
+                blocks.append(number)
+                columns.append(column_of.setdefault(key, len(column_of)))
+                values.append(value * scale)
+        return (np.array(blocks, dtype=np.int64), np.array(columns, dtype=np.int64),
+                np.array(values, dtype=np.float64))
+
+    def vectors(self):
+        """``Vectors`` of the current rows, assembled once per change"""
+        if self._vectors is None:
+            self._vectors = self._assemble()
+        return self._vectors
+
+    def _assemble(self):
+        ids = sorted(self.rows)
+        row_of = {cocktail_id: i for i, cocktail_id in enumerate(ids)}
+        encoded = [self.rows[cocktail_id] for cocktail_id in ids]
+        counts = np.array([len(blocks) for blocks, _, _ in encoded], dtype=np.int64)
+        rows = np.repeat(np.arange(len(ids), dtype=np.int64), counts)
+        blocks, columns, values = (
+            np.concatenate([entry[part] for entry in encoded] + [np.zeros(0, dtype=dtype)])
+            for part, dtype in enumerate((np.int64, np.int64, np.float64))
+        )
+
+        # Each block's columns start where the previous block of its kind ends
+        sparse = np.array([block in SPARSE_BLOCKS for block in BLOCK_WEIGHTS])
+        widths = np.array([len(self.columns[block]) for block in BLOCK_WEIGHTS], dtype=np.int64)
+        widths[~sparse] = np.maximum(widths[~sparse], 1)
+        offsets = np.zeros(len(widths), dtype=np.int64)
+        for kind in (sparse, ~sparse):
+            offsets[kind] = np.cumsum(widths[kind]) - widths[kind]
+        columns = columns + offsets[blocks]
+
+        is_sparse = sparse[blocks]
+        dense = np.zeros((len(ids), int(widths[~sparse].sum())), dtype=np.float32)
+        dense[rows[~is_sparse], columns[~is_sparse]] = values[~is_sparse]
+
+        sparse_width = int(widths[sparse].sum())
+        rows, columns, values = rows[is_sparse], columns[is_sparse], values[is_sparse]
+        return Vectors(
+            ids,
+            row_of,
+            dense,
+            _compress(rows, columns, values, len(ids)),
+            _compress(columns, rows, values, sparse_width)
+        )
+
+
+def vectorize(features):
+    """``Vectors`` for ``features``"""
+    matrix = FeatureMatrix()
+    matrix.update(features)
+    return matrix.vectors()
+
+
+def similarities(vectors, rows):
+    """Cosine similarity of the cocktails at ``rows`` (a block) with every cocktail"""
+    result = vectors.dense[rows] @ vectors.dense.T
+
+    # Sparse blocks: expand each entry of the block's rows against the posting
+    # list of its column, then sum the products per (row, cocktail)
+    by_row, by_column = vectors.sparse_rows, vectors.sparse_columns
+    starts = by_row.indptr[rows]
+    counts = by_row.indptr[rows + 1] - starts
+    entries = _ranges(starts, counts)
+    local_rows = np.repeat(np.arange(len(rows)), counts)
+    columns = by_row.indices[entries]
+    lengths = by_column.indptr[columns + 1] - by_column.indptr[columns]
+    postings = _ranges(by_column.indptr[columns], lengths)
+    if len(postings):
+        products = np.repeat(by_row.values[entries], lengths) * by_column.values[postings]
+        cells = np.repeat(local_rows, lengths) * len(vectors.ids) + by_column.indices[postings]
+        result += np.bincount(cells, weights=products, minlength=result.size).reshape(result.shape).astype(np.float32)
+    return result
+
+
+def _top_k(vectors, rows, k):
+    """``{cocktail_id: [(similar_id, score), ...]}`` for the cocktails at ``rows``"""
+    neighbours = {}
+    ids = np.array(vectors.ids, dtype=np.int64)
+    k = min(k, len(ids) - 1)
+    if k <= 0:
+        return {vectors.ids[row]: [] for row in rows}
+
+    for start in range(0, len(rows), _BLOCK_ROWS):
+        block = np.asarray(rows[start:start + _BLOCK_ROWS], dtype=np.int64)
+        scores = similarities(vectors, block)
+        scores[np.arange(len(block)), block] = -1.0  # A cocktail isn't its own neighbour
+
+        # Partition out the k best, keeping any ties with the k-th so they can be
+        # ordered by id and give the same lists however they were computed
+        kth = -np.partition(-scores, k - 1, axis=1)[:, k - 1]
+        for i, row in enumerate(block.tolist()):
+            candidates = np.flatnonzero((scores[i] >= kth[i]) & (scores[i] > 0))
+            candidates = candidates[np.lexsort((ids[candidates], -scores[i, candidates]))][:k]
+            neighbours[vectors.ids[row]] = [
+                (int(ids[column]), round(float(scores[i, column]), 6)) for column in candidates
+            ]
+    return neighbours
+
+
+def _store(conn, neighbours):
+    """Replace the stored neighbour lists of the cocktails in ``neighbours``"""
+    table = CocktailSimilarity.__table__
+    cocktail_ids = list(neighbours)
+    for chunk in chunks(cocktail_ids):
+        conn.execute(delete(table).where(table.c.cocktail_id.in_(chunk)))
+
+    rows = [
+        {'cocktail_id': cocktail_id, 'rank': rank, 'similar_id': similar_id, 'score': score}
+        for cocktail_id, similar in neighbours.items()
+        for rank, (similar_id, score) in enumerate(similar, start=1)
+    ]
+    for start in range(0, len(rows), 5000):
+        conn.execute(insert(table), rows[start:start + 5000])
+
+
+def _top_k_size():
+    return current_app.config.get('SIMILAR_COCKTAILS_TOP_K', 12)
+
+
+def rebuild(conn=None):
+    """Recompute the neighbour lists of every cocktail
+
+    Runs on ``conn`` when given (a migration passes its own), otherwise in a
+    transaction of its own.
+    """
+    if conn is None:
+        with db.engine.begin() as conn:
+            rebuilt = rebuild(conn)
+        # Rebuilds follow writes that bypass the flush hooks, such as bulk imports
+        cache.invalidate(CocktailSimilarity.__tablename__, FEATURES_TAG)
+        return rebuilt
+
+    k = _top_k_size()
+    vectors = vectorize(_features(conn))
+    conn.execute(delete(CocktailSimilarity.__table__))
+    for start in range(0, len(vectors.ids), _BLOCK_ROWS * 8):
+        rows = list(range(start, min(start + _BLOCK_ROWS * 8, len(vectors.ids))))
+        _store(conn, _top_k(vectors, rows, k))
+    return len(vectors.ids)
+
+
+def refresh(conn, changed_ids, matrix=None):
+    """Bring the stored neighbour lists up to date after ``changed_ids`` changed
+
+    Besides the changed cocktails themselves, only lists that contained a
+    changed cocktail or that a changed cocktail now beats are recomputed.
+    ``matrix`` is the ``FeatureMatrix`` of the catalog as it was before the
+    change; only the changed cocktails are read to patch it. Without it the
+    whole catalog is read. Returns the up-to-date matrix.
+    """
+    table = CocktailSimilarity.__table__
+    k = _top_k_size()
+    changed_ids = set(changed_ids) - {None}
+    if matrix is None:
+        matrix = FeatureMatrix()
+        matrix.update(_features(conn))
+    else:
+        matrix.update(_features(conn, changed_ids), removed=changed_ids)
+    vectors = matrix.vectors()
+    active = [cocktail_id for cocktail_id in changed_ids if cocktail_id in vectors.row_of]
+    removed = sorted(changed_ids - set(active))
+
+    # Lists that currently include a changed cocktail
+    affected = set(active)
+    changed = sorted(changed_ids)
+    for chunk in chunks(changed):
+        affected.update(conn.execute(
+            select(table.c.cocktail_id).where(table.c.similar_id.in_(chunk))
+        ).scalars())
+
+    # Lists a changed cocktail now outranks (or that still have room for it)
+    if active:
+        rows = np.array([vectors.row_of[cocktail_id] for cocktail_id in active], dtype=np.int64)
+        best = np.zeros(len(vectors.ids), dtype=np.float32)
+        for start in range(0, len(rows), _BLOCK_ROWS):
+            scores = similarities(vectors, rows[start:start + _BLOCK_ROWS])
+            np.maximum(best, scores.max(axis=0), out=best)
+
+        # Only cocktails sharing a feature with a changed one can take it in
+        candidates = np.array(vectors.ids, dtype=np.int64)[best > 0].tolist()
+        threshold = np.zeros(len(vectors.ids), dtype=np.float32)
+        for chunk in chunks(candidates):
+            for cocktail_id, count, lowest in conn.execute(
+                select(table.c.cocktail_id, func.count(), func.min(table.c.score))
+                .where(table.c.cocktail_id.in_(chunk))
+                .group_by(table.c.cocktail_id)
+            ):
+                if count >= k:
+                    # Ties are broken by id, so an equal score may also displace the last entry
+                    threshold[vectors.row_of[cocktail_id]] = lowest - _SCORE_TOLERANCE
+        affected.update(np.array(vectors.ids, dtype=np.int64)[best > threshold].tolist())
+
+    neighbours = _top_k(vectors, sorted(vectors.row_of[cocktail_id] for cocktail_id in affected
+                                        if cocktail_id in vectors.row_of), k)
+    neighbours.update({cocktail_id: [] for cocktail_id in removed})
+    _store(conn, neighbours)
+    return matrix
+
+
+class Refresher:
+    """Applies queued neighbour-list refreshes, in a background thread unless disabled
+
+    The feature matrix of the last refresh is kept, so the next one only
+    reads the cocktails it was given. It is read in full again when a write
+    it wasn't given shows up in ``FEATURES_TAG`` (another process's, with
+    versions shared through Redis), or, while versions aren't shared, once it
+    is older than ``DERIVED_INDEX_MAX_AGE`` seconds.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.background = app.config.get('SIMILARITY_REFRESH_ASYNC', True)
+
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._idle = threading.Event()
+        self._idle.set()
+        self._pending = set()
+        self._pending_writes = 0
+        self._thread = None
+        self._pid = None
+
+        # (FEATURES_TAG version, monotonic load time, FeatureMatrix), used under _refresh_lock
+        self._refresh_lock = threading.Lock()
+        self._matrix = None
+
+    def submit(self, cocktail_ids):
+        """Refresh the lists affected by ``cocktail_ids``, now or in the background"""
+        cache.invalidate(FEATURES_TAG)
+        if not self.background:
+            self._refresh(cocktail_ids, 1)
+            return
+        with self._lock:
+            self._pending.update(cocktail_ids)
+            self._pending_writes += 1
+            self._idle.clear()
+            # A thread doesn't survive fork, so a forked server worker starts its own
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='similarity-refresh', daemon=True)
+                self._pid = os.getpid()
+                self._thread.start()
+            self._wake.notify()
+
+    def wait(self, timeout=None):
+        """Block until every queued refresh has been applied; False on timeout"""
+        return self._idle.wait(timeout)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._pending:
+                    self._idle.set()
+                    self._wake.wait()
+                cocktail_ids, self._pending = self._pending, set()
+                writes, self._pending_writes = self._pending_writes, 0
+            self._refresh(cocktail_ids, writes)
+
+    def _kept_matrix(self, version, writes):
+        """The kept matrix if ``writes`` (this batch's bumps of FEATURES_TAG) are all it missed"""
+        if self._matrix is None or version is None:
+            return None
+        kept_version, loaded_at, matrix = self._matrix
+        if version != (kept_version[0] + writes,):
+            return None
+        max_age = None if cache.versions_shared() else self.app.config.get('DERIVED_INDEX_MAX_AGE', 60)
+        if max_age is not None and time.monotonic() - loaded_at > max_age:
+            return None
+        return matrix
+
+    def _refresh(self, cocktail_ids, writes):
+        with self.app.app_context(), self._refresh_lock:
+            # Read before the catalog, so a write landing meanwhile shows up as a mismatch next time
+            version = cache.versions(FEATURES_TAG)
+            matrix = self._kept_matrix(version, writes)
+            loaded_at = self._matrix[1] if matrix is not None else time.monotonic()
+            self._matrix = None
+            try:
+                with db.engine.begin() as conn:
+                    matrix = refresh(conn, cocktail_ids, matrix)
+            except Exception:
+                # The lists stay stale until the cocktails change again or are rebuilt
+                self.app.logger.exception('Failed to refresh similar cocktails for %s', sorted(cocktail_ids))
+                return
+            if version is not None:
+                self._matrix = (version, loaded_at, matrix)
+            cache.invalidate(CocktailSimilarity.__tablename__)
+
+
+def init_app(app):
+    """Register the similarity refresher on the application"""
+    app.extensions['similarity'] = Refresher(app)
+
+
+def wait_for_refresh(timeout=None):
+    """Block until queued neighbour-list refreshes have been applied"""
+    return current_app.extensions['similarity'].wait(timeout)
+
+
+def similar_cocktails(cocktail_id, limit=None, options=()):
+    """``[(cocktail, score), ...]`` most similar to ``cocktail_id``, from the stored lists
+
+    ``options`` are extra loader options for the cocktails.
+    """
+    query = db.session.query(Cocktail, CocktailSimilarity.score).options(*options).join(
+        CocktailSimilarity, CocktailSimilarity.similar_id == Cocktail.id
+    ).filter(
+        CocktailSimilarity.cocktail_id == cocktail_id,
+        Cocktail.is_active == True
+    ).order_by(CocktailSimilarity.rank)
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
+
+
+def _features_changed(cocktail):
+    state = inspect(cocktail)
+    return any(state.attrs[field].history.has_changes() for field in FEATURE_FIELDS)
+
+
+@on_flush(Cocktail, CocktailIngredient)
+def _queue_refresh_on_flush(session, written, deleted):
+    changed_ids = set()
+    for obj in written + deleted:
+        if isinstance(obj, CocktailIngredient):
+            changed_ids.add(obj.cocktail_id)
+        elif obj in deleted or obj in session.new or _features_changed(obj):
+            changed_ids.add(obj.id)
+
+    changed_ids.discard(None)
+    if changed_ids:
+        refresher = current_app.extensions['similarity']
+        after_commit(session, lambda: refresher.submit(changed_ids))
@@ -0,0 +1,219 @@
+"""
+Typeahead suggestions for SOBRE - Premium Healthy Cocktails
+
+Cocktail names, ingredient names and health benefit terms are held in process
+as sorted arrays of normalized keys, one key per word position of each label
+("virgin mojito" and "mojito"), so a prefix is a pair of binary searches
+instead of an ``ilike`` scan. Entries are numbered in popularity order, which
+makes the best matches of a key range its smallest entry numbers; the ranges
+of one and two character prefixes are large, so their top entries are
+precomputed at build time.
+
+Cocktails and ingredients live in separate partitions. Each is rebuilt once
+one of the columns its labels come from (names, slugs, health benefits,
+active flags) has been written, not on every write to its table, so a rating
+or a nutrition update doesn't rebuild anything. The popularity order they
+also use (ratings, recipe uses) is instead brought up to date by rebuilding
+partitions older than ``SUGGEST_RANKING_MAX_AGE`` seconds. Each partition
+counts the health benefits its rows list; the benefit index merges the two
+counts and is rebuilt when either side changes.
+"""
+
+from bisect import bisect_left
+from collections import Counter, namedtuple
+
+import numpy as np
+from flask import current_app
+from sqlalchemy import func, inspect, select
+
+from app import db
+from app.models.cocktail import Cocktail, CocktailIngredient
+from app.models.ingredient import Ingredient
+from app.services.cache import DerivedIndex, invalidate_after_commit
+from app.services.events import on_flush
+from app.services.search import normalize, tokenize
+
+SUGGESTION_TYPES = ('cocktails', 'ingredients', 'health_benefits')
+
+MAX_LIMIT = 20
+
+# Prefixes up to this length have their top entries precomputed
+_SHORT_PREFIX = 2
+
+_KEY_END = '\U0010ffff'
+
+# Cache tags bumped by writes to the columns each partition's labels come from
+COCKTAIL_LABELS_TAG = 'suggest:cocktails'
+INGREDIENT_LABELS_TAG = 'suggest:ingredients'
+
+_LABEL_FIELDS = {
+    Cocktail: (('name', 'slug', 'health_benefits', 'is_active'), COCKTAIL_LABELS_TAG),
+    Ingredient: (('name', 'slug', 'category', 'health_benefits', 'is_active'), INGREDIENT_LABELS_TAG)
+}
+
+_Keys = namedtuple('_Keys', 'keys entries short')
+
+_Names = namedtuple('_Names', 'index items benefits')
+
+_Benefits = namedtuple('_Benefits', 'index items')
+
+
+def _keys(labels):
+    """Prefix index over ``labels``, which must already be in popularity order"""
+    pairs = []
+    for entry, label in enumerate(labels):
+        tokens = tokenize(label)
+        pairs.extend((' '.join(tokens[i:]), entry) for i in range(len(tokens)))
+    pairs.sort()
+
+    short = {}
+    for key, entry in pairs:
+        for length in range(1, min(_SHORT_PREFIX, len(key)) + 1):
+            short.setdefault(key[:length], set()).add(entry)
+
+    return _Keys(
+        keys=[key for key, _ in pairs],
+        entries=np.array([entry for _, entry in pairs], dtype=np.int64),
+        short={prefix: tuple(sorted(entries)[:MAX_LIMIT]) for prefix, entries in short.items()}
+    )
+
+
+def _lookup(index, prefix, limit):
+    """Entry numbers (best first) of labels with a word starting with ``prefix``"""
+    if len(prefix) <= _SHORT_PREFIX:
+        return index.short.get(prefix, ())[:limit]
+    lo = bisect_left(index.keys, prefix)
+    hi = bisect_left(index.keys, prefix + _KEY_END, lo)
+    return tuple(np.unique(index.entries[lo:hi])[:limit].tolist())
+
+
+def _benefit_counts(rows):
+    """How many of ``rows`` list each normalized health benefit term, with a display label per term"""
+    counts = Counter()
+    labels = {}
+    for benefits in rows:
+        if not isinstance(benefits, list):
+            continue
+        for benefit in {str(benefit).strip() for benefit in benefits} - {''}:
+            term = normalize(benefit)
+            counts[term] += 1
+            labels.setdefault(term, benefit)
+    return counts, labels
+
+
+def _partition(items, benefit_rows):
+    """``items`` are ``(label, dict)`` pairs in popularity order"""
+    return _Names(
+        index=_keys([label for label, _ in items]),
+        items=tuple(item for _, item in items),
+        benefits=_benefit_counts(benefit_rows)
+    )
+
+
+class CocktailSuggestions(DerivedIndex):
+    """Active cocktail names ranked by rating count, then average rating"""
+
+    source_tables = (COCKTAIL_LABELS_TAG,)
+    max_age_setting = 'SUGGEST_RANKING_MAX_AGE'
+
+    def build(self, version):
+        rows = db.session.execute(
+            select(Cocktail.id, Cocktail.name, Cocktail.slug, Cocktail.health_benefits)
+            .where(Cocktail.is_active == True)
+            .order_by(Cocktail.rating_count.desc(), Cocktail.average_rating.desc(), Cocktail.name, Cocktail.id)
+        ).all()
+        return _partition(
+            [(row.name, {'id': row.id, 'name': row.name, 'slug': row.slug}) for row in rows],
+            [row.health_benefits for row in rows]
+        )
+
+
+class IngredientSuggestions(DerivedIndex):
+    """Active ingredient names ranked by the number of recipes using them"""
+
+    source_tables = (INGREDIENT_LABELS_TAG,)
+    max_age_setting = 'SUGGEST_RANKING_MAX_AGE'
+
+    def build(self, version):
+        uses = (
+            select(CocktailIngredient.ingredient_id, func.count().label('uses'))
+            .group_by(CocktailIngredient.ingredient_id)
+            .subquery()
+        )
+        rows = db.session.execute(
+            select(Ingredient.id, Ingredient.name, Ingredient.slug, Ingredient.category,
+                   Ingredient.health_benefits, func.coalesce(uses.c.uses, 0).label('uses'))
+            .outerjoin(uses, uses.c.ingredient_id == Ingredient.id)
+            .where(Ingredient.is_active == True)
+            .order_by(func.coalesce(uses.c.uses, 0).desc(), Ingredient.name, Ingredient.id)
+        ).all()
+        return _partition(
+            [(row.name, {'id': row.id, 'name': row.name, 'slug': row.slug, 'category': row.category})
+             for row in rows],
+            [row.health_benefits for row in rows]
+        )
+
+
+class BenefitSuggestions(DerivedIndex):
+    """Health benefit terms of both partitions ranked by how many cocktails and ingredients list them"""
+
+    source_tables = CocktailSuggestions.source_tables + IngredientSuggestions.source_tables
+
+    def __init__(self, cocktails, ingredients):
+        super().__init__()
+        self.partitions = (cocktails, ingredients)
+
+    def build(self, version):
+        counts = Counter()
+        labels = {}
+        for partition in self.partitions:
+            partition_counts, partition_labels = partition.current().benefits
+            counts.update(partition_counts)
+            for term, label in partition_labels.items():
+                labels.setdefault(term, label)
+
+        ranked = sorted(counts, key=lambda term: (-counts[term], term))
+        return _Benefits(
+            index=_keys([labels[term] for term in ranked]),
+            items=tuple({'term': labels[term], 'count': counts[term]} for term in ranked)
+        )
+
+
+@on_flush(Cocktail, Ingredient)
+def _invalidate_on_flush(session, written, deleted):
+    tags = set()
+    for obj in written + deleted:
+        fields, tag = _LABEL_FIELDS[type(obj)]
+        state = inspect(obj)
+        if obj in deleted or obj in session.new or any(state.attrs[field].history.has_changes() for field in fields):
+            tags.add(tag)
+    invalidate_after_commit(session, *sorted(tags))
+
+
+def init_app(app):
+    """Register the suggestion partitions on the application"""
+    cocktails, ingredients = CocktailSuggestions(), IngredientSuggestions()
+    app.extensions['suggest'] = {
+        'cocktails': cocktails,
+        'ingredients': ingredients,
+        'health_benefits': BenefitSuggestions(cocktails, ingredients)
+    }
+
+
+def suggest(query, limit=8, types=SUGGESTION_TYPES):
+    """Best ``limit`` suggestions of each of ``types`` for a partially typed ``query``
+
+    Every word of a label is a match point, so 'moj' finds 'Virgin Mojito'.
+    Matching ignores case and accents.
+    """
+    prefix = ' '.join(tokenize(query))
+    results = {suggestion_type: [] for suggestion_type in types}
+    if not prefix:
+        return results
+
+    limit = max(1, min(limit, MAX_LIMIT))
+    indexes = current_app.extensions['suggest']
+    for suggestion_type in results:
+        current = indexes[suggestion_type].current()
+        results[suggestion_type] = [current.items[entry] for entry in _lookup(current.index, prefix, limit)]
+    return results
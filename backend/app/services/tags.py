@@ -0,0 +1,180 @@
+"""
+Cocktail tag index for SOBRE - Premium Healthy Cocktails
+
+The dietary_tags, health_benefits and flavor_profile JSON arrays on
+Cocktail are mirrored into the normalized ``tags`` vocabulary and the
+``cocktail_tags`` association table, so multi-tag filters become index
+lookups instead of JSON scans.
+"""
+
+import re
+
+from sqlalchemy import delete, false, func, inspect, insert, select
+
+from app import db
+from app.models.cocktail import Cocktail
+from app.models.tag import Tag, cocktail_tags
+from app.services.events import chunks, on_flush
+from app.services.search import normalize
+
+# Tag kind -> Cocktail JSON field it is derived from
+TAG_FIELDS = {
+    'dietary': 'dietary_tags',
+    'health_benefit': 'health_benefits',
+    'flavor': 'flavor_profile'
+}
+
+_SLUG_RE = re.compile(r'[^a-z0-9]+')
+
+
+def slugify(value):
+    """'Gluten Free', 'gluten-free' and 'GLUTEN_FREE' all become 'gluten-free'"""
+    return _SLUG_RE.sub('-', normalize(str(value))).strip('-')
+
+
+def _wanted_tags(values_by_field):
+    """``{(kind, slug): name}`` for one cocktail's JSON tag fields"""
+    wanted = {}
+    for kind, field in TAG_FIELDS.items():
+        for value in values_by_field.get(field) or []:
+            slug = slugify(value)
+            if slug:
+                wanted.setdefault((kind, slug), str(value).strip()[:120])
+    return wanted
+
+
+def _insert_ignoring_conflicts(conn, rows):
+    table = Tag.__table__
+    dialect = conn.dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        conn.execute(insert(table), rows)
+        return
+    conn.execute(dialect_insert(table).on_conflict_do_nothing(index_elements=['kind', 'slug']), rows)
+
+
+def _tag_ids(conn, wanted):
+    """Resolve ``{(kind, slug): name}`` to tag ids, creating missing vocabulary entries"""
+    table = Tag.__table__
+    ids = {}
+    by_kind = {}
+    for kind, slug in wanted:
+        by_kind.setdefault(kind, []).append(slug)
+
+    def lookup():
+        for kind, slugs in by_kind.items():
+            for chunk in chunks(slugs):
+                rows = conn.execute(
+                    select(table.c.id, table.c.slug)
+                    .where(table.c.kind == kind, table.c.slug.in_(chunk))
+                )
+                ids.update({(kind, slug): tag_id for tag_id, slug in rows})
+
+    lookup()
+    missing = [key for key in wanted if key not in ids]
+    if missing:
+        _insert_ignoring_conflicts(conn, [
+            {'kind': kind, 'slug': slug, 'name': wanted[(kind, slug)]} for kind, slug in missing
+        ])
+        lookup()
+    return ids
+
+
+def sync_cocktails(conn, rows):
+    """Rewrite the association rows for ``rows`` of ``(cocktail_id, {field: values})``"""
+    rows = list(rows)
+    if not rows:
+        return
+
+    wanted_by_cocktail = {cocktail_id: _wanted_tags(values) for cocktail_id, values in rows}
+    vocabulary = {}
+    for wanted in wanted_by_cocktail.values():
+        vocabulary.update(wanted)
+    tag_ids = _tag_ids(conn, vocabulary) if vocabulary else {}
+
+    cocktail_ids = list(wanted_by_cocktail)
+    for chunk in chunks(cocktail_ids):
+        conn.execute(delete(cocktail_tags).where(cocktail_tags.c.cocktail_id.in_(chunk)))
+
+    links = [
+        {'cocktail_id': cocktail_id, 'tag_id': tag_ids[key]}
+        for cocktail_id, wanted in wanted_by_cocktail.items()
+        for key in wanted
+    ]
+    if links:
+        conn.execute(insert(cocktail_tags), links)
+
+
+def _tags_changed(cocktail):
+    state = inspect(cocktail)
+    return any(state.attrs[field].history.has_changes() for field in TAG_FIELDS.values())
+
+
+@on_flush(Cocktail)
+def _sync_on_flush(session, written, deleted):
+    conn = session.connection()
+
+    changed = [
+        cocktail for cocktail in written
+        if cocktail in session.new or _tags_changed(cocktail)
+    ]
+    sync_cocktails(conn, [
+        (cocktail.id, {field: getattr(cocktail, field) for field in TAG_FIELDS.values()})
+        for cocktail in changed
+    ])
+
+    # ON DELETE CASCADE covers databases that enforce foreign keys; SQLite usually doesn't
+    deleted_ids = [cocktail.id for cocktail in deleted]
+    if deleted_ids:
+        conn.execute(delete(cocktail_tags).where(cocktail_tags.c.cocktail_id.in_(deleted_ids)))
+
+
+def sync_all(batch_size=1000, conn=None):
+    """Backfill the tag tables from every cocktail's JSON fields
+
+    Runs on ``conn`` when given (a migration passes its own), otherwise in a
+    transaction of its own.
+    """
+    if conn is None:
+        with db.engine.begin() as conn:
+            return sync_all(batch_size, conn)
+
+    table = Cocktail.__table__
+    columns = [table.c[field] for field in TAG_FIELDS.values()]
+    synced = 0
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            select(table.c.id, *columns)
+            .where(table.c.id > last_id).order_by(table.c.id).limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        sync_cocktails(conn, [
+            (row.id, {field: row._mapping[field] for field in TAG_FIELDS.values()})
+            for row in rows
+        ])
+        synced += len(rows)
+        last_id = rows[-1].id
+    return synced
+
+
+def tag_filter(kind, values, match='all'):
+    """Criterion for cocktails tagged with all (or any) of ``values`` of ``kind``"""
+    slugs = {slugify(value) for value in values} - {''}
+    if not slugs:
+        return None
+
+    tag_ids = db.session.execute(
+        select(Tag.id).where(Tag.kind == kind, Tag.slug.in_(slugs))
+    ).scalars().all()
+    if not tag_ids or (match == 'all' and len(tag_ids) < len(slugs)):
+        return false()
+
+    matching = select(cocktail_tags.c.cocktail_id).where(cocktail_tags.c.tag_id.in_(tag_ids))
+    if match == 'all' and len(tag_ids) > 1:
+        matching = matching.group_by(cocktail_tags.c.cocktail_id).having(func.count() == len(tag_ids))
+    return Cocktail.id.in_(matching)
@@ -0,0 +1,19 @@
+"""
+Route access checks for SOBRE - Premium Healthy Cocktails
+"""
+
+from functools import wraps
+
+from flask import jsonify
+from flask_jwt_extended import current_user, jwt_required
+
+
+def admin_required(view):
+    """Only let authenticated staff (``User.is_admin``) through; other users get a 403"""
+    @wraps(view)
+    @jwt_required()
+    def wrapper(*args, **kwargs):
+        if not current_user.is_admin:
+            return jsonify({'error': 'Admin access required'}), 403
+        return view(*args, **kwargs)
+    return wrapper
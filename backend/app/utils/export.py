@@ -0,0 +1,92 @@
+"""
+CSV export utilities for SOBRE - Premium Healthy Cocktails
+
+An export streams straight from a server-side cursor: rows are fetched
+``yield_per`` at a time and each batch is written out as a CSV chunk by a
+generator response, so memory stays flat however many rows match.
+
+Text cells that a spreadsheet would evaluate as a formula are prefixed with
+``'``. Numbers and phone numbers (``-12.5``, ``+33 6 12 34 56 78``) are left as
+they are: they can't call a function or reference a cell.
+"""
+
+import csv
+import io
+import json
+import re
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Optional, Tuple
+
+from flask import Response, stream_with_context
+
+from app import db
+
+# Leading characters a spreadsheet would evaluate as a formula
+_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+_NUMBER_RE = re.compile(r'[+-]?(\d+(\.\d*)?|\.\d+)([eE][+-]?\d+)?')
+
+_PHONE_RE = re.compile(r'\+\d[\d .()-]{5,}\d')
+
+
+def _parse_bound(value: str, name: str, end: bool) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        if len(value) == 10:
+            # A bare date covers that whole day
+            day = datetime.combine(date.fromisoformat(value), time.min)
+            return day + timedelta(days=1) if end else day
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f'Invalid {name} date: {value}') from None
+
+
+def parse_date_range(args) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """``(start, end)`` from ISO ``from``/``to`` arguments; ``to`` dates are inclusive"""
+    return (
+        _parse_bound(args.get('from', ''), 'from', end=False),
+        _parse_bound(args.get('to', ''), 'to', end=True)
+    )
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES) and not (
+        _NUMBER_RE.fullmatch(value) or _PHONE_RE.fullmatch(value)
+    ):
+        return "'" + value
+    return value
+
+
+def csv_response(statement, filename: str, batch_size: int = 1000) -> Response:
+    """Stream the rows of a Core ``statement`` as a CSV attachment"""
+    header = [column.key for column in statement.selected_columns]
+
+    def generate():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(header)
+        yield buffer.getvalue()
+
+        result = db.session.execute(statement, execution_options={'yield_per': batch_size})
+        try:
+            for rows in result.partitions():
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows([_cell(value) for value in row] for row in rows)
+                yield buffer.getvalue()
+        finally:
+            result.close()
+
+    response = Response(stream_with_context(generate()), mimetype='text/csv')
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,66 @@
+"""
+Sparse fieldset utilities for SOBRE - Premium Healthy Cocktails
+
+``?fields=id,name,slug`` limits a serialized resource to the listed keys. A
+model lists the keys its ``to_dict`` can emit and, where a key is not simply
+a column of the same name, the columns it reads (``field_columns``). Queries
+then load only those columns and ``to_dict`` never touches the others, so
+unrequested ``Text`` columns are neither fetched nor serialized.
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only
+
+
+class InvalidFields(ValueError):
+    """Raised when a fieldset names keys the resource doesn't have"""
+
+
+def parse_fields(value: Optional[str], allowed: Iterable[str]) -> Optional[frozenset]:
+    """Requested keys from a comma-separated ``fields`` value, or None for every key"""
+    if value is None or not value.strip():
+        return None
+    fields = frozenset(key.strip() for key in value.split(',') if key.strip())
+    unknown = sorted(fields - set(allowed))
+    if unknown:
+        raise InvalidFields(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+def serialize(obj, keys: Iterable[str], fields: Optional[frozenset] = None, computed: Dict = None) -> Dict:
+    """``keys`` of ``obj`` limited to ``fields``
+
+    A key in ``computed`` takes its value from calling it, any other key from
+    the attribute of the same name. Only the emitted keys are evaluated.
+    """
+    computed = computed or {}
+    return {
+        key: computed[key]() if key in computed else getattr(obj, key)
+        for key in keys if fields is None or key in fields
+    }
+
+
+def project(data: Dict, fields: Optional[frozenset]) -> Dict:
+    """An already serialized ``data`` limited to ``fields``"""
+    if fields is None:
+        return data
+    return {key: value for key, value in data.items() if key in fields}
+
+
+def field_options(model, fields: Optional[frozenset], *extra) -> List:
+    """Loader options that load only the columns ``fields`` read, plus ``extra`` columns
+
+    ``extra`` covers columns used outside serialization, such as keyset
+    pagination keys. Returns no options when every field is wanted.
+    """
+    if fields is None:
+        return []
+    mapper = inspect(model)
+    field_columns = getattr(model, 'field_columns', {})
+    names = {column.key for column in mapper.primary_key}
+    names.update(column.key for column in extra)
+    for key in fields:
+        names.update(field_columns.get(key, (key,)))
+    return [load_only(*[getattr(model, name) for name in sorted(names) if name in mapper.column_attrs])]
@@ -0,0 +1,126 @@
+"""
+Keyset (cursor) pagination utilities for SOBRE - Premium Healthy Cocktails
+
+Instead of COUNT(*) plus OFFSET, a page is fetched with a WHERE clause that
+starts right after the last row of the previous page. The sort key of that
+row is handed to the client as an opaque cursor token.
+"""
+
+import base64
+import json
+from datetime import date, datetime
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, or_, tuple_
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor token can't be decoded for the requested ordering"""
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _decode_value(column, value):
+    if value is None:
+        return None
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return value
+
+
+def encode_cursor(values: Sequence) -> str:
+    """Encode sort key values into an opaque URL-safe token"""
+    payload = json.dumps([_encode_value(value) for value in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token: str, columns: Sequence) -> List:
+    """Decode a token produced by encode_cursor for the given key columns"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor('Malformed cursor') from e
+
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise InvalidCursor('Cursor does not match this ordering')
+
+    try:
+        return [_decode_value(column, value) for column, value in zip(columns, values)]
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor('Malformed cursor') from e
+
+
+def _after(keys, values):
+    """WHERE clause selecting rows that sort strictly after ``values``"""
+    columns = [column for column, _ in keys]
+    directions = {descending for _, descending in keys}
+
+    # A single direction can use a row-value comparison, which indexes serve directly
+    if len(directions) == 1:
+        if directions.pop():
+            return tuple_(*columns) < tuple_(*values)
+        return tuple_(*columns) > tuple_(*values)
+
+    clauses = []
+    for position, (column, descending) in enumerate(keys):
+        equal = [columns[i] == values[i] for i in range(position)]
+        beyond = column < values[position] if descending else column > values[position]
+        clauses.append(and_(*equal, beyond))
+    return or_(*clauses)
+
+
+class KeysetPage:
+    """One page of keyset-paginated results"""
+
+    def __init__(self, items, per_page, next_cursor):
+        self.items = items
+        self.per_page = per_page
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def to_dict(self):
+        return {
+            'per_page': self.per_page,
+            'next_cursor': self.next_cursor,
+            'has_next': self.has_next
+        }
+
+
+def keyset_paginate(query, keys: Sequence[Tuple], cursor: Optional[str], per_page: int) -> KeysetPage:
+    """Fetch the page after ``cursor`` ordered by ``keys``
+
+    ``keys`` is a sequence of ``(column, descending)`` pairs that must end in a
+    unique column (normally the primary key) so every row has a distinct
+    position. The query must not carry its own ORDER BY. ``per_page`` is
+    raised to at least 1; callers cap the maximum.
+    """
+    # 0 would leave no last item for the cursor, and SQLite reads a negative LIMIT as no limit
+    per_page = max(1, per_page)
+    if cursor:
+        values = decode_cursor(cursor, [column for column, _ in keys])
+        query = query.filter(_after(keys, values))
+
+    query = query.order_by(*[column.desc() if descending else column.asc() for column, descending in keys])
+    rows = query.limit(per_page + 1).all()
+    items = rows[:per_page]
+
+    next_cursor = None
+    if len(rows) > per_page:
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column, _ in keys])
+
+    return KeysetPage(items, per_page, next_cursor)
@@ -0,0 +1,86 @@
+"""
+Reference number allocation for SOBRE - Premium Healthy Cocktails
+
+References are random strings drawn with ``secrets``. Uniqueness is left to
+the column's unique constraint: the row is inserted inside a savepoint and,
+on the rare collision, rolled back to it and retried with a fresh reference.
+Nothing is read before the write, so concurrent allocations cannot race
+between a check and the insert. A collision is recognized from the driver's
+error diagnostics: a unique violation (SQLITE_CONSTRAINT_UNIQUE, or SQLSTATE
+23505 on PostgreSQL) on the reference column's own constraint.
+"""
+
+import secrets
+import string
+
+from sqlalchemy import UniqueConstraint, inspect
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+
+REFERENCE_ALPHABET = string.ascii_uppercase + string.digits
+
+SQLITE_CONSTRAINT_UNIQUE = 2067
+
+UNIQUE_VIOLATION = '23505'
+
+
+class ReferenceExhausted(RuntimeError):
+    """Raised when every attempt to allocate a reference collided"""
+
+
+def new_reference(length: int = 8, prefix: str = '') -> str:
+    """A random reference of ``length`` characters after ``prefix``"""
+    return prefix + ''.join(secrets.choice(REFERENCE_ALPHABET) for _ in range(length))
+
+
+def _unique_names(column) -> set:
+    """Names the database may report for a unique constraint on ``column`` alone"""
+    table = column.table
+    # PostgreSQL's name for an unnamed UNIQUE column constraint
+    names = {f'{table.name}_{column.name}_key'}
+    for constraint in table.constraints:
+        if isinstance(constraint, UniqueConstraint) and list(constraint.columns) == [column] and constraint.name:
+            names.add(constraint.name)
+    for index in table.indexes:
+        if index.unique and list(index.columns) == [column] and index.name:
+            names.add(index.name)
+    return names
+
+
+def _is_collision(error: IntegrityError, column) -> bool:
+    orig = error.orig
+
+    # SQLite reports the extended result code and the "table.column" list of the violated constraint
+    if getattr(orig, 'sqlite_errorcode', None) == SQLITE_CONSTRAINT_UNIQUE:
+        failed = str(orig).partition('constraint failed:')[2]
+        return [name.strip() for name in failed.split(',')] == [f'{column.table.name}.{column.name}']
+
+    # psycopg 3 exposes sqlstate, psycopg2 pgcode; both carry the constraint name in diag
+    if (getattr(orig, 'sqlstate', None) or getattr(orig, 'pgcode', None)) == UNIQUE_VIOLATION:
+        return getattr(getattr(orig, 'diag', None), 'constraint_name', None) in _unique_names(column)
+
+    return False
+
+
+def add_with_reference(obj, attr: str, length: int = 8, prefix: str = '', attempts: int = 5, session=None):
+    """Add ``obj`` and flush it with a fresh unique reference in ``attr``
+
+    Only the savepoint is rolled back on a collision; the rest of the
+    session's transaction is kept. Other integrity errors propagate.
+    """
+    session = session or db.session
+    column = inspect(type(obj)).columns[attr]
+
+    for _ in range(attempts):
+        setattr(obj, attr, new_reference(length, prefix))
+        try:
+            with session.begin_nested():
+                session.add(obj)
+        except IntegrityError as e:
+            if not _is_collision(e, column):
+                raise
+            continue
+        return obj
+
+    raise ReferenceExhausted(f'No free {attr} after {attempts} attempts')
@@ -33,6 +33,36 @@ class Config:
     # Celery settings
     CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL') or 'redis://localhost:6379/0'
     CELERY_RESULT_BACKEND = os.environ.get('CELERY_RESULT_BACKEND') or 'redis://localhost:6379/0'
+    
+    # Search settings ('auto' picks FTS5/tsvector from the database, 'memory' forces the Python index)
+    SEARCH_BACKEND = os.environ.get('SEARCH_BACKEND') or 'auto'
+    SEARCH_MAX_RESULTS = int(os.environ.get('SEARCH_MAX_RESULTS') or 500)
+    
+    # Response cache settings (Redis at REDIS_URL backs the in-process LRU when reachable)
+    CACHE_ENABLED = os.environ.get('CACHE_ENABLED', 'true').lower() in ['true', 'on', '1']
+    CACHE_REDIS_ENABLED = os.environ.get('CACHE_REDIS_ENABLED', 'true').lower() in ['true', 'on', '1']
+    CACHE_DEFAULT_TTL = int(os.environ.get('CACHE_DEFAULT_TTL') or 300)
+    CACHE_LOCAL_MAX_ENTRIES = int(os.environ.get('CACHE_LOCAL_MAX_ENTRIES') or 1024)
+    # Without Redis, in-process indexes are rebuilt at least this often (seconds) to see other workers' writes
+    DERIVED_INDEX_MAX_AGE = int(os.environ.get('DERIVED_INDEX_MAX_AGE') or 60)
+    # Typeahead popularity ranks (ratings, recipe uses) are refreshed at least this often (seconds)
+    SUGGEST_RANKING_MAX_AGE = int(os.environ.get('SUGGEST_RANKING_MAX_AGE') or 300)
+    
+    # Authenticated user lookups (essential fields, dropped on any write to the user)
+    IDENTITY_CACHE_TTL = int(os.environ.get('IDENTITY_CACHE_TTL') or 60)
+    IDENTITY_CACHE_MAX_ENTRIES = int(os.environ.get('IDENTITY_CACHE_MAX_ENTRIES') or 4096)
+    
+    # Password hashing (werkzeug method string; hashes made otherwise are upgraded on login)
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD') or 'pbkdf2:sha256:600000'
+    PASSWORD_SALT_LENGTH = int(os.environ.get('PASSWORD_SALT_LENGTH') or 16)
+    PASSWORD_POOL_SIZE = int(os.environ.get('PASSWORD_POOL_SIZE') or 2)
+    PASSWORD_POOL_MAX_PENDING = int(os.environ.get('PASSWORD_POOL_MAX_PENDING') or 16)
+    PASSWORD_POOL_WAIT = float(os.environ.get('PASSWORD_POOL_WAIT') or 5)
+    
+    # Number of precomputed similar cocktails kept per cocktail
+    SIMILAR_COCKTAILS_TOP_K = int(os.environ.get('SIMILAR_COCKTAILS_TOP_K') or 12)
+    # Refresh them in a background thread after recipe writes commit (off: right after the commit)
+    SIMILARITY_REFRESH_ASYNC = os.environ.get('SIMILARITY_REFRESH_ASYNC', 'true').lower() in ['true', 'on', '1']
 
 class DevelopmentConfig(Config):
     """Development configuration"""
@@ -45,6 +75,8 @@ class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL') or 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
+    CACHE_REDIS_ENABLED = False
+    SIMILARITY_REFRESH_ASYNC = False
 
 class ProductionConfig(Config):
     """Production configuration"""
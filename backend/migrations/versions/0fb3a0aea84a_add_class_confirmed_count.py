@@ -0,0 +1,30 @@
+"""add confirmed booking count to virtual classes
+
+Revision ID: 0fb3a0aea84a
+Revises: c2cfddef5da3
+Create Date: 2026-10-17 23:02:41.180356
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0fb3a0aea84a'
+down_revision = 'c2cfddef5da3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('virtual_classes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('confirmed_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Seat checks read the counter, so it has to match the existing bookings before the first booking
+    from app.services import bookings
+    bookings.recompute_all(conn=op.get_bind())
+
+
+def downgrade():
+    with op.batch_alter_table('virtual_classes', schema=None) as batch_op:
+        batch_op.drop_column('confirmed_count')
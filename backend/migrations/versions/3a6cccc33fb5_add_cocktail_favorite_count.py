@@ -0,0 +1,29 @@
+"""add favorite count to cocktails
+
+Revision ID: 3a6cccc33fb5
+Revises: 0fb3a0aea84a
+Create Date: 2026-10-17 23:14:52.603918
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3a6cccc33fb5'
+down_revision = '0fb3a0aea84a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('cocktails', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('favorite_count', sa.Integer(), server_default='0', nullable=False))
+
+    from app.services import favorites
+    favorites.recompute_all(conn=op.get_bind())
+
+
+def downgrade():
+    with op.batch_alter_table('cocktails', schema=None) as batch_op:
+        batch_op.drop_column('favorite_count')
@@ -0,0 +1,26 @@
+"""add staff flag to users
+
+Revision ID: 4b7e21d9c0a6
+Revises: 6bc624ad8944
+Create Date: 2026-10-18 00:12:37.215940
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4b7e21d9c0a6'
+down_revision = '6bc624ad8944'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('is_admin', sa.Boolean(), server_default=sa.false(), nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('is_admin')
@@ -0,0 +1,40 @@
+"""add precomputed cocktail similarities
+
+Revision ID: 6bc624ad8944
+Revises: 3a6cccc33fb5
+Create Date: 2026-10-17 23:26:30.517462
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6bc624ad8944'
+down_revision = '3a6cccc33fb5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('cocktail_similarities',
+    sa.Column('cocktail_id', sa.Integer(), nullable=False),
+    sa.Column('rank', sa.Integer(), nullable=False),
+    sa.Column('similar_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['cocktail_id'], ['cocktails.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['similar_id'], ['cocktails.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('cocktail_id', 'rank')
+    )
+    with op.batch_alter_table('cocktail_similarities', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_cocktail_similarities_similar_id'), ['similar_id'], unique=False)
+
+    from app.services import similarity
+    similarity.rebuild(conn=op.get_bind())
+
+
+def downgrade():
+    with op.batch_alter_table('cocktail_similarities', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_cocktail_similarities_similar_id'))
+
+    op.drop_table('cocktail_similarities')
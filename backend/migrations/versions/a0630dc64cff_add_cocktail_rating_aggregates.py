@@ -0,0 +1,48 @@
+"""add review aggregates to cocktails
+
+Revision ID: a0630dc64cff
+Revises: ae6589a2834a
+Create Date: 2026-10-17 22:31:05.442790
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a0630dc64cff'
+down_revision = 'ae6589a2834a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('cocktails', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('rating_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('rating_sum', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('average_rating', sa.Float(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('rating_1_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('rating_2_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('rating_3_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('rating_4_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('rating_5_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.create_index(batch_op.f('ix_cocktails_rating_count'), ['rating_count'], unique=False)
+        batch_op.create_index(batch_op.f('ix_cocktails_average_rating'), ['average_rating'], unique=False)
+
+    # Existing approved reviews would otherwise count for nothing until the next review write
+    from app.services import ratings
+    ratings.recompute_all(conn=op.get_bind())
+
+
+def downgrade():
+    with op.batch_alter_table('cocktails', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_cocktails_average_rating'))
+        batch_op.drop_index(batch_op.f('ix_cocktails_rating_count'))
+        batch_op.drop_column('rating_5_count')
+        batch_op.drop_column('rating_4_count')
+        batch_op.drop_column('rating_3_count')
+        batch_op.drop_column('rating_2_count')
+        batch_op.drop_column('rating_1_count')
+        batch_op.drop_column('average_rating')
+        batch_op.drop_column('rating_sum')
+        batch_op.drop_column('rating_count')
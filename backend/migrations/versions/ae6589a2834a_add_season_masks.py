@@ -0,0 +1,40 @@
+"""add season masks to ingredients and cocktails
+
+Revision ID: ae6589a2834a
+Revises: cc88be503fa6
+Create Date: 2026-10-17 22:05:47.902113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ae6589a2834a'
+down_revision = 'cc88be503fa6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('ingredients', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('season_mask', sa.Integer(), server_default='4095', nullable=False))
+        batch_op.create_index(batch_op.f('ix_ingredients_season_mask'), ['season_mask'], unique=False)
+
+    with op.batch_alter_table('cocktails', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('season_mask', sa.Integer(), server_default='4095', nullable=False))
+        batch_op.create_index(batch_op.f('ix_cocktails_season_mask'), ['season_mask'], unique=False)
+
+    # The server default marks everything as in season all year until computed from peak_season_months
+    from app.services import seasons
+    seasons.sync_all(conn=op.get_bind())
+
+
+def downgrade():
+    with op.batch_alter_table('cocktails', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_cocktails_season_mask'))
+        batch_op.drop_column('season_mask')
+
+    with op.batch_alter_table('ingredients', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_ingredients_season_mask'))
+        batch_op.drop_column('season_mask')
@@ -0,0 +1,47 @@
+"""add per-serving nutrition to cocktails
+
+Revision ID: c2cfddef5da3
+Revises: a0630dc64cff
+Create Date: 2026-10-17 22:48:19.736514
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2cfddef5da3'
+down_revision = 'a0630dc64cff'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('cocktails', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('nutrition_calories', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('nutrition_protein_g', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('nutrition_carbs_g', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('nutrition_fiber_g', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('nutrition_sugar_g', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('nutrition_fat_g', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('nutrition_sodium_mg', sa.Float(), nullable=True))
+        batch_op.add_column(sa.Column('nutrition_micronutrients', sa.JSON(), nullable=True))
+        batch_op.add_column(sa.Column('nutrition_complete', sa.Boolean(), nullable=True))
+        batch_op.add_column(sa.Column('nutrition_computed_at', sa.DateTime(), nullable=True))
+
+    from app.services import nutrition
+    nutrition.recompute_all(conn=op.get_bind())
+
+
+def downgrade():
+    with op.batch_alter_table('cocktails', schema=None) as batch_op:
+        batch_op.drop_column('nutrition_computed_at')
+        batch_op.drop_column('nutrition_complete')
+        batch_op.drop_column('nutrition_micronutrients')
+        batch_op.drop_column('nutrition_sodium_mg')
+        batch_op.drop_column('nutrition_fat_g')
+        batch_op.drop_column('nutrition_sugar_g')
+        batch_op.drop_column('nutrition_fiber_g')
+        batch_op.drop_column('nutrition_carbs_g')
+        batch_op.drop_column('nutrition_protein_g')
+        batch_op.drop_column('nutrition_calories')
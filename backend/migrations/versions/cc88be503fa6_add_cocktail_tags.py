@@ -0,0 +1,49 @@
+"""add tag vocabulary and cocktail tags
+
+Revision ID: cc88be503fa6
+Revises: dbcd53bf4a47
+Create Date: 2026-10-17 21:40:12.318274
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'cc88be503fa6'
+down_revision = 'dbcd53bf4a47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('tags',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=20), nullable=False),
+    sa.Column('slug', sa.String(length=120), nullable=False),
+    sa.Column('name', sa.String(length=120), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('kind', 'slug', name='uq_tags_kind_slug')
+    )
+    op.create_table('cocktail_tags',
+    sa.Column('cocktail_id', sa.Integer(), nullable=False),
+    sa.Column('tag_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['cocktail_id'], ['cocktails.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['tag_id'], ['tags.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('cocktail_id', 'tag_id')
+    )
+    with op.batch_alter_table('cocktail_tags', schema=None) as batch_op:
+        batch_op.create_index('ix_cocktail_tags_tag_id_cocktail_id', ['tag_id', 'cocktail_id'], unique=False)
+
+    # Existing cocktails only carry their tags in the JSON fields
+    from app.services import tags
+    tags.sync_all(conn=op.get_bind())
+
+
+def downgrade():
+    with op.batch_alter_table('cocktail_tags', schema=None) as batch_op:
+        batch_op.drop_index('ix_cocktail_tags_tag_id_cocktail_id')
+
+    op.drop_table('cocktail_tags')
+    op.drop_table('tags')
@@ -0,0 +1,416 @@
+"""baseline schema
+
+The tables as created by ``flask init-db`` before the project used
+migrations. A database created that way is already at this revision: run
+``flask db stamp dbcd53bf4a47`` once, then ``flask db upgrade``.
+
+Revision ID: dbcd53bf4a47
+Revises:
+Create Date: 2026-10-17 21:02:22.069807
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'dbcd53bf4a47'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('cocktails',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('slug', sa.String(length=120), nullable=False),
+    sa.Column('description', sa.Text(), nullable=False),
+    sa.Column('instructions', sa.Text(), nullable=False),
+    sa.Column('calories_per_serving', sa.Integer(), nullable=False),
+    sa.Column('servings', sa.Integer(), nullable=True),
+    sa.Column('prep_time_minutes', sa.Integer(), nullable=False),
+    sa.Column('health_benefits', sa.JSON(), nullable=True),
+    sa.Column('dietary_tags', sa.JSON(), nullable=True),
+    sa.Column('wellness_category', sa.String(length=50), nullable=True),
+    sa.Column('difficulty_level', sa.String(length=20), nullable=True),
+    sa.Column('flavor_profile', sa.JSON(), nullable=True),
+    sa.Column('color_hex', sa.String(length=7), nullable=True),
+    sa.Column('image_url', sa.String(length=255), nullable=True),
+    sa.Column('video_url', sa.String(length=255), nullable=True),
+    sa.Column('is_featured', sa.Boolean(), nullable=True),
+    sa.Column('is_seasonal', sa.Boolean(), nullable=True),
+    sa.Column('is_premium', sa.Boolean(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('meta_title', sa.String(length=60), nullable=True),
+    sa.Column('meta_description', sa.String(length=160), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('cocktails', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_cocktails_name'), ['name'], unique=False)
+        batch_op.create_index(batch_op.f('ix_cocktails_slug'), ['slug'], unique=True)
+
+    op.create_table('event_packages',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('slug', sa.String(length=50), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('price_per_person', sa.Numeric(precision=10, scale=2), nullable=False),
+    sa.Column('features', sa.JSON(), nullable=True),
+    sa.Column('max_guests', sa.Integer(), nullable=True),
+    sa.Column('min_guests', sa.Integer(), nullable=True),
+    sa.Column('service_hours', sa.Integer(), nullable=True),
+    sa.Column('cocktail_count', sa.Integer(), nullable=True),
+    sa.Column('includes_bartender', sa.Boolean(), nullable=True),
+    sa.Column('includes_ingredients', sa.Boolean(), nullable=True),
+    sa.Column('includes_equipment', sa.Boolean(), nullable=True),
+    sa.Column('custom_menu_design', sa.Boolean(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('is_featured', sa.Boolean(), nullable=True),
+    sa.Column('sort_order', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('slug')
+    )
+    op.create_table('event_testimonials',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('client_name', sa.String(length=100), nullable=False),
+    sa.Column('client_role', sa.String(length=100), nullable=True),
+    sa.Column('client_company', sa.String(length=100), nullable=True),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('rating', sa.Integer(), nullable=True),
+    sa.Column('event_type', sa.String(length=50), nullable=True),
+    sa.Column('event_date', sa.Date(), nullable=True),
+    sa.Column('is_featured', sa.Boolean(), nullable=True),
+    sa.Column('is_approved', sa.Boolean(), nullable=True),
+    sa.Column('display_order', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('ingredients',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('slug', sa.String(length=120), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('category', sa.String(length=50), nullable=False),
+    sa.Column('subcategory', sa.String(length=50), nullable=True),
+    sa.Column('origin', sa.String(length=100), nullable=True),
+    sa.Column('calories_per_100g', sa.Integer(), nullable=True),
+    sa.Column('protein_g', sa.Float(), nullable=True),
+    sa.Column('carbs_g', sa.Float(), nullable=True),
+    sa.Column('fiber_g', sa.Float(), nullable=True),
+    sa.Column('sugar_g', sa.Float(), nullable=True),
+    sa.Column('fat_g', sa.Float(), nullable=True),
+    sa.Column('sodium_mg', sa.Float(), nullable=True),
+    sa.Column('vitamins', sa.JSON(), nullable=True),
+    sa.Column('minerals', sa.JSON(), nullable=True),
+    sa.Column('health_benefits', sa.JSON(), nullable=True),
+    sa.Column('antioxidant_level', sa.String(length=20), nullable=True),
+    sa.Column('glycemic_index', sa.Integer(), nullable=True),
+    sa.Column('flavor_profile', sa.JSON(), nullable=True),
+    sa.Column('aroma_notes', sa.JSON(), nullable=True),
+    sa.Column('color_hex', sa.String(length=7), nullable=True),
+    sa.Column('is_organic', sa.Boolean(), nullable=True),
+    sa.Column('is_fair_trade', sa.Boolean(), nullable=True),
+    sa.Column('is_local', sa.Boolean(), nullable=True),
+    sa.Column('sustainability_score', sa.Integer(), nullable=True),
+    sa.Column('is_seasonal', sa.Boolean(), nullable=True),
+    sa.Column('peak_season_months', sa.JSON(), nullable=True),
+    sa.Column('availability_regions', sa.JSON(), nullable=True),
+    sa.Column('preparation_methods', sa.JSON(), nullable=True),
+    sa.Column('storage_instructions', sa.Text(), nullable=True),
+    sa.Column('shelf_life_days', sa.Integer(), nullable=True),
+    sa.Column('cost_per_unit', sa.Float(), nullable=True),
+    sa.Column('unit_type', sa.String(length=20), nullable=True),
+    sa.Column('supplier_info', sa.JSON(), nullable=True),
+    sa.Column('image_url', sa.String(length=255), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('is_premium', sa.Boolean(), nullable=True),
+    sa.Column('meta_title', sa.String(length=60), nullable=True),
+    sa.Column('meta_description', sa.String(length=160), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('ingredients', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_ingredients_name'), ['name'], unique=False)
+        batch_op.create_index(batch_op.f('ix_ingredients_slug'), ['slug'], unique=True)
+
+    op.create_table('locations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('slug', sa.String(length=50), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('street_address', sa.String(length=200), nullable=False),
+    sa.Column('city', sa.String(length=100), nullable=False),
+    sa.Column('postal_code', sa.String(length=20), nullable=False),
+    sa.Column('country', sa.String(length=100), nullable=False),
+    sa.Column('latitude', sa.Float(), nullable=False),
+    sa.Column('longitude', sa.Float(), nullable=False),
+    sa.Column('phone', sa.String(length=20), nullable=True),
+    sa.Column('email', sa.String(length=120), nullable=True),
+    sa.Column('website', sa.String(length=200), nullable=True),
+    sa.Column('business_hours', sa.JSON(), nullable=True),
+    sa.Column('social_media', sa.JSON(), nullable=True),
+    sa.Column('parking_info', sa.Text(), nullable=True),
+    sa.Column('public_transport_info', sa.Text(), nullable=True),
+    sa.Column('driving_directions', sa.Text(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('is_primary', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('slug')
+    )
+    op.create_table('private_event_inquiries',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('event_type', sa.String(length=50), nullable=False),
+    sa.Column('event_date', sa.Date(), nullable=False),
+    sa.Column('event_time', sa.Time(), nullable=False),
+    sa.Column('number_of_guests', sa.Integer(), nullable=False),
+    sa.Column('drink_categories', sa.JSON(), nullable=True),
+    sa.Column('dietary_requirements', sa.Text(), nullable=True),
+    sa.Column('contact_name', sa.String(length=100), nullable=False),
+    sa.Column('contact_email', sa.String(length=120), nullable=False),
+    sa.Column('contact_phone', sa.String(length=20), nullable=False),
+    sa.Column('message', sa.Text(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('priority', sa.String(length=10), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('admin_notes', sa.Text(), nullable=True),
+    sa.Column('estimated_quote', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(length=120), nullable=False),
+    sa.Column('username', sa.String(length=80), nullable=False),
+    sa.Column('password_hash', sa.String(length=255), nullable=False),
+    sa.Column('first_name', sa.String(length=50), nullable=False),
+    sa.Column('last_name', sa.String(length=50), nullable=False),
+    sa.Column('phone', sa.String(length=20), nullable=True),
+    sa.Column('date_of_birth', sa.Date(), nullable=True),
+    sa.Column('dietary_preferences', sa.JSON(), nullable=True),
+    sa.Column('health_goals', sa.JSON(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('is_verified', sa.Boolean(), nullable=True),
+    sa.Column('is_premium', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('last_login', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_users_email'), ['email'], unique=True)
+        batch_op.create_index(batch_op.f('ix_users_username'), ['username'], unique=True)
+
+    op.create_table('virtual_classes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=200), nullable=False),
+    sa.Column('description', sa.Text(), nullable=False),
+    sa.Column('instructor_name', sa.String(length=100), nullable=False),
+    sa.Column('instructor_bio', sa.Text(), nullable=True),
+    sa.Column('instructor_image_url', sa.String(length=255), nullable=True),
+    sa.Column('scheduled_datetime', sa.DateTime(), nullable=False),
+    sa.Column('duration_minutes', sa.Integer(), nullable=False),
+    sa.Column('timezone', sa.String(length=50), nullable=True),
+    sa.Column('max_participants', sa.Integer(), nullable=True),
+    sa.Column('price', sa.Float(), nullable=True),
+    sa.Column('currency', sa.String(length=3), nullable=True),
+    sa.Column('difficulty_level', sa.String(length=20), nullable=True),
+    sa.Column('cocktails_featured', sa.JSON(), nullable=True),
+    sa.Column('ingredients_needed', sa.JSON(), nullable=True),
+    sa.Column('equipment_needed', sa.JSON(), nullable=True),
+    sa.Column('meeting_platform', sa.String(length=50), nullable=True),
+    sa.Column('meeting_url', sa.String(length=500), nullable=True),
+    sa.Column('meeting_id', sa.String(length=100), nullable=True),
+    sa.Column('meeting_password', sa.String(length=50), nullable=True),
+    sa.Column('image_url', sa.String(length=255), nullable=True),
+    sa.Column('promo_video_url', sa.String(length=255), nullable=True),
+    sa.Column('class_recording_url', sa.String(length=255), nullable=True),
+    sa.Column('recipe_pdf_url', sa.String(length=255), nullable=True),
+    sa.Column('shopping_list_url', sa.String(length=255), nullable=True),
+    sa.Column('preparation_notes', sa.Text(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('is_premium', sa.Boolean(), nullable=True),
+    sa.Column('is_recorded', sa.Boolean(), nullable=True),
+    sa.Column('is_featured', sa.Boolean(), nullable=True),
+    sa.Column('meta_title', sa.String(length=60), nullable=True),
+    sa.Column('meta_description', sa.String(length=160), nullable=True),
+    sa.Column('tags', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('class_bookings',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('virtual_class_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('booking_reference', sa.String(length=20), nullable=False),
+    sa.Column('stripe_payment_intent_id', sa.String(length=100), nullable=True),
+    sa.Column('amount_paid', sa.Float(), nullable=True),
+    sa.Column('currency', sa.String(length=3), nullable=True),
+    sa.Column('attended', sa.Boolean(), nullable=True),
+    sa.Column('attendance_duration_minutes', sa.Integer(), nullable=True),
+    sa.Column('rating', sa.Integer(), nullable=True),
+    sa.Column('feedback', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('cancelled_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['virtual_class_id'], ['virtual_classes.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('booking_reference')
+    )
+    op.create_table('cocktail_ingredients',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('cocktail_id', sa.Integer(), nullable=False),
+    sa.Column('ingredient_id', sa.Integer(), nullable=False),
+    sa.Column('quantity', sa.Float(), nullable=False),
+    sa.Column('unit', sa.String(length=20), nullable=False),
+    sa.Column('preparation_note', sa.String(length=100), nullable=True),
+    sa.Column('order_index', sa.Integer(), nullable=True),
+    sa.Column('is_garnish', sa.Boolean(), nullable=True),
+    sa.Column('is_optional', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['cocktail_id'], ['cocktails.id'], ),
+    sa.ForeignKeyConstraint(['ingredient_id'], ['ingredients.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('cocktail_reviews',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('cocktail_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('rating', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=100), nullable=True),
+    sa.Column('comment', sa.Text(), nullable=True),
+    sa.Column('is_approved', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['cocktail_id'], ['cocktails.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('contact_inquiries',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('email', sa.String(length=120), nullable=False),
+    sa.Column('phone', sa.String(length=20), nullable=True),
+    sa.Column('subject', sa.String(length=200), nullable=False),
+    sa.Column('message', sa.Text(), nullable=False),
+    sa.Column('inquiry_type', sa.String(length=50), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('priority', sa.String(length=10), nullable=True),
+    sa.Column('location_id', sa.Integer(), nullable=True),
+    sa.Column('admin_response', sa.Text(), nullable=True),
+    sa.Column('responded_at', sa.DateTime(), nullable=True),
+    sa.Column('responded_by', sa.String(length=100), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('user_agent', sa.String(length=500), nullable=True),
+    sa.Column('ip_address', sa.String(length=45), nullable=True),
+    sa.ForeignKeyConstraint(['location_id'], ['locations.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('ingredient_interactions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('ingredient1_id', sa.Integer(), nullable=False),
+    sa.Column('ingredient2_id', sa.Integer(), nullable=False),
+    sa.Column('interaction_type', sa.String(length=20), nullable=False),
+    sa.Column('compatibility_score', sa.Integer(), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('flavor_impact', sa.String(length=100), nullable=True),
+    sa.Column('health_impact', sa.String(length=100), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['ingredient1_id'], ['ingredients.id'], ),
+    sa.ForeignKeyConstraint(['ingredient2_id'], ['ingredients.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('subscriptions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('plan_type', sa.String(length=20), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('stripe_subscription_id', sa.String(length=100), nullable=True),
+    sa.Column('stripe_customer_id', sa.String(length=100), nullable=True),
+    sa.Column('monthly_price', sa.Float(), nullable=False),
+    sa.Column('currency', sa.String(length=3), nullable=True),
+    sa.Column('start_date', sa.DateTime(), nullable=False),
+    sa.Column('end_date', sa.DateTime(), nullable=True),
+    sa.Column('next_billing_date', sa.DateTime(), nullable=True),
+    sa.Column('trial_end_date', sa.DateTime(), nullable=True),
+    sa.Column('monthly_ingredient_credits', sa.Integer(), nullable=True),
+    sa.Column('virtual_class_credits', sa.Integer(), nullable=True),
+    sa.Column('premium_recipes_access', sa.Boolean(), nullable=True),
+    sa.Column('personal_mixologist_access', sa.Boolean(), nullable=True),
+    sa.Column('ingredients_used_this_month', sa.Integer(), nullable=True),
+    sa.Column('classes_attended_this_month', sa.Integer(), nullable=True),
+    sa.Column('last_reset_date', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('cancelled_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('stripe_subscription_id')
+    )
+    op.create_table('user_favorite_cocktails',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('cocktail_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['cocktail_id'], ['cocktails.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'cocktail_id')
+    )
+    op.create_table('subscription_deliveries',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('subscription_id', sa.Integer(), nullable=False),
+    sa.Column('delivery_date', sa.DateTime(), nullable=False),
+    sa.Column('tracking_number', sa.String(length=100), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('ingredients_included', sa.JSON(), nullable=True),
+    sa.Column('recipes_included', sa.JSON(), nullable=True),
+    sa.Column('total_value', sa.Float(), nullable=True),
+    sa.Column('shipping_address', sa.JSON(), nullable=True),
+    sa.Column('carrier', sa.String(length=50), nullable=True),
+    sa.Column('estimated_delivery', sa.DateTime(), nullable=True),
+    sa.Column('actual_delivery', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['subscription_id'], ['subscriptions.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('subscription_deliveries')
+    op.drop_table('user_favorite_cocktails')
+    op.drop_table('subscriptions')
+    op.drop_table('ingredient_interactions')
+    op.drop_table('contact_inquiries')
+    op.drop_table('cocktail_reviews')
+    op.drop_table('cocktail_ingredients')
+    op.drop_table('class_bookings')
+    op.drop_table('virtual_classes')
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_users_username'))
+        batch_op.drop_index(batch_op.f('ix_users_email'))
+
+    op.drop_table('users')
+    op.drop_table('private_event_inquiries')
+    op.drop_table('locations')
+    with op.batch_alter_table('ingredients', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_ingredients_slug'))
+        batch_op.drop_index(batch_op.f('ix_ingredients_name'))
+
+    op.drop_table('ingredients')
+    op.drop_table('event_testimonials')
+    op.drop_table('event_packages')
+    with op.batch_alter_table('cocktails', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_cocktails_slug'))
+        batch_op.drop_index(batch_op.f('ix_cocktails_name'))
+
+    op.drop_table('cocktails')
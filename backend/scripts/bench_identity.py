@@ -0,0 +1,88 @@
+"""
+Benchmark of authenticated user lookups for SOBRE - Premium Healthy Cocktails
+
+Serves a handful of authenticated endpoints through the test client against a
+scratch SQLite database and reports, with the identity cache off
+(IDENTITY_CACHE_TTL=0) and on, how many statements each request makes, how
+many of them read ``users``, and the time per request.
+
+Usage, from the backend directory:
+
+    python scripts/bench_identity.py [--requests 300] [--ttl 60]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=300, help='timed requests per endpoint')
+    parser.add_argument('--ttl', type=int, default=60, help='identity cache TTL to compare against 0')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench-identity-')
+    os.environ['TEST_DATABASE_URL'] = f'sqlite:///{workdir}/bench.db'
+    os.environ.setdefault('PASSWORD_POOL_SIZE', '0')
+
+    from flask_jwt_extended import create_access_token, create_refresh_token
+    from sqlalchemy import event
+
+    from app import create_app, db
+    from app.models.cocktail import Cocktail
+    from app.models.user import User
+
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        user = User(email='bench@example.com', username='bench', password_hash='-', first_name='Bench', last_name='User')
+        db.session.add(user)
+        db.session.add(Cocktail(name='Bench', slug='bench', description='-', instructions='-',
+                                calories_per_serving=100, prep_time_minutes=5))
+        db.session.commit()
+        access = {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+        refresh = {'Authorization': f'Bearer {create_refresh_token(identity=str(user.id))}'}
+        engine = db.engine
+
+    endpoints = [
+        ('GET', '/api/auth/me', access),
+        ('POST', '/api/auth/refresh', refresh),
+        ('GET', '/api/users/profile', access),
+        ('GET', '/api/users/favorites', access),
+        ('GET', '/api/users/favorites/lookup?ids=1', access),
+        ('GET', '/api/classes/my-bookings', access),
+    ]
+
+    statements = []
+    event.listen(engine, 'before_cursor_execute', lambda conn, cursor, statement, *rest: statements.append(statement))
+
+    client = app.test_client()
+    for ttl in (0, args.ttl):
+        app.config['IDENTITY_CACHE_TTL'] = ttl
+        app.extensions['identity_cache'].clear()
+        print(f'IDENTITY_CACHE_TTL={ttl}')
+        for method, url, headers in endpoints:
+            client.open(url, method=method, headers=headers)  # Warm the caches
+
+            statements.clear()
+            status = client.open(url, method=method, headers=headers).status_code
+            user_reads = sum('FROM users' in statement for statement in statements)
+            count = len(statements)
+
+            start = time.perf_counter()
+            for _ in range(args.requests):
+                client.open(url, method=method, headers=headers)
+            per_request = (time.perf_counter() - start) / args.requests * 1000
+
+            print(f'  {method:4} {url:36} {status}  {count:2} statements  {user_reads} user reads  {per_request:6.2f} ms')
+
+    app.extensions['password_hasher'].shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark of password hashing under load for SOBRE - Premium Healthy Cocktails
+
+Starts the app on a threaded local server against a scratch SQLite database,
+runs concurrent logins for a fixed time while probing a cheap endpoint, and
+reports the login outcomes and the probe latency. Compare a run inline
+(``--pool-size 0``) with one through the process pool.
+
+Usage, from the backend directory:
+
+    python scripts/bench_passwords.py [--pool-size 2] [--logins 24] [--seconds 10]
+
+Pool processes are spawned, so everything runs under ``main()``.
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+USERS = 20
+
+PASSWORD = 'bench-password'
+
+
+def _post(url, body):
+    request = urllib.request.Request(url, data=json.dumps(body).encode(), headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def _get(url):
+    with urllib.request.urlopen(url, timeout=60) as response:
+        response.read()
+        return response.status
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pool-size', type=int, default=2, help='PASSWORD_POOL_SIZE (0 hashes inline)')
+    parser.add_argument('--max-pending', type=int, default=4, help='PASSWORD_POOL_MAX_PENDING')
+    parser.add_argument('--wait', type=float, default=2, help='PASSWORD_POOL_WAIT in seconds')
+    parser.add_argument('--logins', type=int, default=24, help='concurrent login loops')
+    parser.add_argument('--seconds', type=float, default=10, help='length of the run')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench-passwords-')
+    os.environ.update({
+        'TEST_DATABASE_URL': f'sqlite:///{workdir}/bench.db',
+        'PASSWORD_POOL_SIZE': str(args.pool_size),
+        'PASSWORD_POOL_MAX_PENDING': str(args.max_pending),
+        'PASSWORD_POOL_WAIT': str(args.wait),
+    })
+
+    from werkzeug.serving import make_server
+
+    from app import create_app, db
+    from app.models.ingredient import Ingredient
+    from app.models.user import User
+    from app.services.passwords import hash_password
+
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        password_hash = hash_password(PASSWORD)
+        for i in range(USERS):
+            db.session.add(User(email=f'bench{i}@example.com', username=f'bench{i}', password_hash=password_hash,
+                                first_name='Bench', last_name=str(i)))
+        db.session.add(Ingredient(name='Lime', slug='lime', category='fruit'))
+        db.session.commit()
+
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)  # No per-request access log
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{server.server_port}'
+
+    # Warm the catalog snapshot and the pool before timing
+    _get(f'{base}/api/ingredients/')
+    _post(f'{base}/api/auth/login', {'email': 'bench0@example.com', 'password': PASSWORD})
+
+    stop = time.monotonic() + args.seconds
+    logins, probes = [], []
+
+    def login_loop(i):
+        while time.monotonic() < stop:
+            logins.append(_post(f'{base}/api/auth/login', {'email': f'bench{i % USERS}@example.com', 'password': PASSWORD}))
+
+    def probe_loop():
+        while time.monotonic() < stop:
+            start = time.perf_counter()
+            _get(f'{base}/api/ingredients/')
+            probes.append(time.perf_counter() - start)
+            time.sleep(0.05)
+
+    threads = [threading.Thread(target=login_loop, args=(i,)) for i in range(args.logins)]
+    threads.append(threading.Thread(target=probe_loop))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    server.shutdown()
+    app.extensions['password_hasher'].shutdown()
+
+    p95 = statistics.quantiles(probes, n=20)[18] if len(probes) > 1 else probes[0]
+    print(f'pool size {args.pool_size}: logins by status {dict(Counter(logins))}')
+    print(f'  {len(probes)} probes  p50 {statistics.median(probes) * 1000:.0f} ms  '
+          f'p95 {p95 * 1000:.0f} ms  max {max(probes) * 1000:.0f} ms')
+
+
+if __name__ == '__main__':
+    main()
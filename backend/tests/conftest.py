@@ -0,0 +1,132 @@
+import itertools
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+# Hash passwords inline and cheaply; a spawned pool and 600k iterations per user would dominate the run time
+os.environ.setdefault('PASSWORD_POOL_SIZE', '0')
+os.environ.setdefault('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:1000')
+
+from flask_jwt_extended import create_access_token
+
+from app import create_app, db
+from app.models.cocktail import Cocktail, CocktailIngredient
+from app.models.ingredient import Ingredient
+from app.models.user import User
+from app.models.virtual_class import VirtualClass
+from config import TestingConfig
+
+_sequence = itertools.count(1)
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    # A database file per test, so every test starts from empty tables and search indexes
+    if not os.environ.get('TEST_DATABASE_URL'):
+        monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f'sqlite:///{tmp_path}/test.db')
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        if os.environ.get('TEST_DATABASE_URL'):
+            db.drop_all()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app):
+    def make_user(**values):
+        n = next(_sequence)
+        password = values.pop('password', 'password123')
+        user = User(
+            email=values.pop('email', f'user{n}@example.com'),
+            username=values.pop('username', f'user{n}'),
+            first_name=values.pop('first_name', 'Test'),
+            last_name=values.pop('last_name', f'User {n}'),
+            **values
+        )
+        user.set_password(password)
+        db.session.add(user)
+        db.session.commit()
+        return user
+    return make_user
+
+
+@pytest.fixture
+def auth_headers(app):
+    def auth_headers(user):
+        return {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+    return auth_headers
+
+
+@pytest.fixture
+def make_cocktail(app):
+    def make_cocktail(**values):
+        n = next(_sequence)
+        name = values.pop('name', f'Cocktail {n}')
+        cocktail = Cocktail(
+            name=name,
+            slug=values.pop('slug', f'cocktail-{n}'),
+            description=values.pop('description', f'{name} description'),
+            instructions=values.pop('instructions', 'Shake and strain.'),
+            calories_per_serving=values.pop('calories_per_serving', 120),
+            prep_time_minutes=values.pop('prep_time_minutes', 5),
+            **values
+        )
+        db.session.add(cocktail)
+        db.session.commit()
+        return cocktail
+    return make_cocktail
+
+
+@pytest.fixture
+def add_recipe_line(app):
+    def add_recipe_line(cocktail, ingredient, quantity=1.0, unit='oz', **values):
+        line = CocktailIngredient(
+            cocktail_id=cocktail.id, ingredient_id=ingredient.id, quantity=quantity, unit=unit, **values
+        )
+        db.session.add(line)
+        db.session.commit()
+        return line
+    return add_recipe_line
+
+
+@pytest.fixture
+def make_ingredient(app):
+    def make_ingredient(**values):
+        n = next(_sequence)
+        name = values.pop('name', f'Ingredient {n}')
+        ingredient = Ingredient(
+            name=name,
+            slug=values.pop('slug', f'ingredient-{n}'),
+            category=values.pop('category', 'fruit'),
+            **values
+        )
+        db.session.add(ingredient)
+        db.session.commit()
+        return ingredient
+    return make_ingredient
+
+
+@pytest.fixture
+def make_class(app):
+    def make_class(**values):
+        n = next(_sequence)
+        virtual_class = VirtualClass(
+            title=values.pop('title', f'Class {n}'),
+            description=values.pop('description', 'A mixology class'),
+            instructor_name=values.pop('instructor_name', 'Instructor'),
+            scheduled_datetime=values.pop('scheduled_datetime', datetime.utcnow() + timedelta(days=n)),
+            **values
+        )
+        db.session.add(virtual_class)
+        db.session.commit()
+        return virtual_class
+    return make_class
@@ -0,0 +1,40 @@
+import pytest
+
+from app import db
+from app.models.location import ContactInquiry
+
+ADMIN_ROUTES = [
+    ('get', '/api/location/admin/inquiries'),
+    ('get', '/api/location/admin/inquiries/export.csv'),
+    ('put', '/api/location/admin/inquiries/1'),
+    ('post', '/api/location/admin/locations'),
+    ('get', '/api/private-events/admin/inquiries'),
+    ('get', '/api/private-events/admin/inquiries/export.csv'),
+    ('put', '/api/private-events/admin/inquiries/1'),
+]
+
+
+@pytest.mark.parametrize('method, url', ADMIN_ROUTES)
+def test_admin_routes_need_a_token(client, method, url):
+    assert getattr(client, method)(url, json={}).status_code == 401
+
+
+@pytest.mark.parametrize('method, url', ADMIN_ROUTES)
+def test_admin_routes_refuse_other_users(client, make_user, auth_headers, method, url):
+    response = getattr(client, method)(url, json={}, headers=auth_headers(make_user()))
+
+    assert response.status_code == 403
+
+
+def test_admin_can_export_inquiries(client, make_user, auth_headers):
+    db.session.add(ContactInquiry(
+        name='Ana Test', email='ana@example.com', subject='Hello', message='Hi', inquiry_type='general'
+    ))
+    db.session.commit()
+
+    response = client.get('/api/location/admin/inquiries/export.csv', headers=auth_headers(make_user(is_admin=True)))
+
+    assert response.status_code == 200
+    body = response.get_data(as_text=True)
+    assert 'ana@example.com' in body
+
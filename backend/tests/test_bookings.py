@@ -0,0 +1,86 @@
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event, insert, select
+
+from app import db
+from app.models.user import User
+from app.models.virtual_class import ClassBooking, VirtualClass
+
+SEATS = 50
+
+BOOKERS = 500
+
+
+@pytest.fixture
+def crowded_class(app, make_class):
+    # Let concurrent writers queue on SQLite's lock instead of failing with "database is locked"
+    @event.listens_for(db.engine, 'connect')
+    def wait_for_lock(dbapi_connection, connection_record):
+        dbapi_connection.execute('PRAGMA busy_timeout = 60000')
+    db.engine.dispose()
+
+    db.session.execute(insert(User.__table__), [
+        {'email': f'booker{i}@example.com', 'username': f'booker{i}', 'password_hash': '-',
+         'first_name': 'Booker', 'last_name': str(i)}
+        for i in range(BOOKERS)
+    ])
+    db.session.commit()
+    user_ids = db.session.scalars(select(User.id).where(User.username.like('booker%'))).all()
+    tokens = [create_access_token(identity=str(user_id)) for user_id in user_ids]
+    return make_class(max_participants=SEATS).id, tokens
+
+
+def _book_all(app, class_id, tokens):
+    def book(token):
+        with app.test_client() as client:
+            response = client.post(f'/api/classes/{class_id}/book', headers={'Authorization': f'Bearer {token}'})
+            return response.status_code
+
+    with ThreadPoolExecutor(len(tokens)) as pool:
+        return Counter(pool.map(book, tokens))
+
+
+def _confirmed(class_id):
+    db.session.expire_all()
+    rows = db.session.scalar(
+        select(db.func.count()).select_from(ClassBooking)
+        .where(ClassBooking.virtual_class_id == class_id, ClassBooking.status == 'confirmed')
+    )
+    return rows, db.session.get(VirtualClass, class_id).confirmed_count
+
+
+def test_parallel_bookers_fill_every_seat_once(app, crowded_class):
+    class_id, tokens = crowded_class
+
+    statuses = _book_all(app, class_id, tokens)
+
+    assert statuses == {201: SEATS, 400: BOOKERS - SEATS}
+    assert _confirmed(class_id) == (SEATS, SEATS)
+
+
+def test_capacity_holds_without_the_early_full_check(app, crowded_class, monkeypatch):
+    # Every request gets past the read-side check, so only the guarded UPDATE stands in the way
+    monkeypatch.setattr(VirtualClass, 'is_full', lambda self: False)
+    class_id, tokens = crowded_class
+
+    statuses = _book_all(app, class_id, tokens)
+
+    assert statuses == {201: SEATS, 400: BOOKERS - SEATS}
+    rows, count = _confirmed(class_id)
+    assert count <= db.session.get(VirtualClass, class_id).max_participants
+    assert rows == count == SEATS
+
+
+def test_cancelling_frees_a_seat(app, client, make_user, make_class, auth_headers):
+    class_id = make_class(max_participants=1).id
+    first, second = make_user(), make_user()
+
+    assert client.post(f'/api/classes/{class_id}/book', headers=auth_headers(first)).status_code == 201
+    assert client.post(f'/api/classes/{class_id}/book', headers=auth_headers(second)).status_code == 400
+    assert client.delete(f'/api/classes/{class_id}/book', headers=auth_headers(first)).status_code == 200
+    assert client.post(f'/api/classes/{class_id}/book', headers=auth_headers(second)).status_code == 201
+
+    assert _confirmed(class_id) == (1, 1)
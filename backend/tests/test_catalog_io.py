@@ -0,0 +1,109 @@
+import io
+import json
+
+from sqlalchemy import select
+
+from app import db
+from app.models.cocktail import Cocktail
+from app.models.ingredient import Ingredient
+from app.models.tag import Tag, cocktail_tags
+from app.services import catalog_io
+
+
+def _import(kind, text, fmt='ndjson', **options):
+    return catalog_io.import_records(kind, catalog_io.read_records(io.StringIO(text), fmt), **options)
+
+
+def _ndjson(*records):
+    return ''.join(json.dumps(record) + '\n' for record in records)
+
+
+def _export(kind, fmt):
+    stream = io.StringIO()
+    catalog_io.write_records(stream, kind, catalog_io.export_records(kind), fmt)
+    return stream.getvalue()
+
+
+def test_csv_row_with_extra_cells_is_skipped(app):
+    result = _import('ingredients', 'name,slug,category\nLime,lime,citrus\nMint,mint,herb,EXTRA\n', 'csv')
+
+    assert (result.inserted, result.skipped) == (1, 1)
+    assert result.errors == ['line 3: Row has more cells than the header']
+    assert [ingredient.slug for ingredient in Ingredient.query.all()] == ['lime']
+
+
+def test_invalid_records_are_reported_and_the_rest_imported(app):
+    result = _import('ingredients', _ndjson(
+        {'name': 'Lime', 'slug': 'lime', 'category': 'citrus'},
+        {'name': 'Mint', 'category': 'herb'},
+        {'name': 'Basil', 'slug': 'basil', 'category': 'herb', 'colour': 'green'},
+        {'name': 'Ginger', 'slug': 'ginger', 'category': 'root', 'calories_per_100g': 'many'},
+        {'name': 'Sage', 'slug': 'sage'},
+    ) + 'not json\n')
+
+    assert (result.inserted, result.updated, result.skipped) == (1, 0, 5)
+    assert result.errors == [
+        'line 2: slug is required',
+        'line 3: Unknown fields: colour',
+        "line 4: calories_per_100g: invalid value 'many'",
+        'line 6: Record is not a JSON object',
+        'line 5: category required for a new Ingredient',
+    ]
+    assert Ingredient.query.count() == 1
+
+
+def test_import_upserts_by_slug(app, make_ingredient):
+    make_ingredient(name='Lime', slug='lime', category='citrus', sugar_g=1.0)
+
+    result = _import('ingredients', _ndjson(
+        {'slug': 'lime', 'sugar_g': 1.7},
+        {'name': 'Mint', 'slug': 'mint', 'category': 'herb'},
+        {'name': 'Fresh Mint', 'slug': 'mint', 'category': 'herb'},
+    ))
+
+    assert (result.inserted, result.updated, result.skipped) == (1, 1, 0)
+    db.session.expire_all()
+    lime = Ingredient.query.filter_by(slug='lime').one()
+    assert (lime.name, lime.category, lime.sugar_g) == ('Lime', 'citrus', 1.7)
+    # A slug repeated within a batch keeps its last record
+    assert Ingredient.query.filter_by(slug='mint').one().name == 'Fresh Mint'
+
+
+def test_cocktail_import_writes_recipes_and_derived_columns(app, make_ingredient):
+    make_ingredient(name='Lime', slug='lime', sugar_g=10.0, peak_season_months=[6, 7])
+    cocktail = {
+        'name': 'Lime Fizz', 'slug': 'lime-fizz', 'description': 'Fizzy', 'instructions': 'Stir',
+        'calories_per_serving': 80, 'prep_time_minutes': 3, 'dietary_tags': ['Vegan'],
+        'ingredients': [{'ingredient': 'lime', 'quantity': 100, 'unit': 'g'}]
+    }
+    unknown = dict(cocktail, slug='yuzu-fizz', ingredients=[{'ingredient': 'yuzu', 'quantity': 1, 'unit': 'oz'}])
+
+    result = _import('cocktails', _ndjson(cocktail, unknown))
+
+    assert (result.inserted, result.skipped) == (1, 1)
+    assert result.errors == ['line 2: Unknown ingredient: yuzu']
+    stored = Cocktail.query.filter_by(slug='lime-fizz').one()
+    assert [(line.ingredient.slug, line.quantity) for line in stored.ingredients] == [('lime', 100.0)]
+    assert stored.nutrition_sugar_g == 10.0
+    assert stored.season_mask == 0b1100000
+    tagged = db.session.execute(
+        select(Tag.slug).join(cocktail_tags, cocktail_tags.c.tag_id == Tag.id)
+        .where(cocktail_tags.c.cocktail_id == stored.id)
+    ).scalars().all()
+    assert tagged == ['vegan']
+
+
+def test_csv_round_trip(app, make_cocktail, make_ingredient, add_recipe_line):
+    lime = make_ingredient(name='Lime', slug='lime', vitamins={'vitamin_c': 29})
+    mint = make_ingredient(name='Mint', slug='mint')
+    cocktail = make_cocktail(name='Mojito, "Virgin"', slug='virgin-mojito', flavor_profile=['Citrus', 'Herbal'])
+    add_recipe_line(cocktail, lime, quantity=1.5, unit='oz')
+    add_recipe_line(cocktail, mint, quantity=6, unit='leaves', is_garnish=True)
+
+    for kind in ('ingredients', 'cocktails'):
+        exported = _export(kind, 'csv')
+        result = _import(kind, exported, 'csv')
+
+        assert (result.inserted, result.skipped) == (0, 0)
+        assert _export(kind, 'csv') == exported
+    assert 'virgin-mojito' in exported
@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+
+from app import db
+from app.models.cocktail import CocktailReview
+from app.models.subscription import Subscription
+from app.models.virtual_class import ClassBooking
+
+
+def _dashboard(client, headers):
+    response = client.get('/api/users/dashboard', headers=headers)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def _favorite(client, headers, cocktail):
+    assert client.post(f'/api/cocktails/{cocktail.id}/favorite', headers=headers).status_code == 200
+
+
+def _book(user, virtual_class, status='confirmed'):
+    booking = ClassBooking(
+        user_id=user.id, virtual_class_id=virtual_class.id, status=status,
+        booking_reference=f'REF{user.id}-{virtual_class.id}'
+    )
+    db.session.add(booking)
+    db.session.commit()
+    return booking
+
+
+def test_statistics_favorites_and_classes(client, make_user, auth_headers, make_cocktail, make_class):
+    user = make_user()
+    headers = auth_headers(user)
+    smash, julep, spritz = (make_cocktail(name=name) for name in ('Mint Smash', 'Mint Julep', 'Garden Spritz'))
+    for cocktail in (smash, julep, spritz):
+        _favorite(client, headers, cocktail)
+    db.session.add(CocktailReview(cocktail_id=smash.id, user_id=user.id, rating=5))
+    db.session.add_all([
+        Subscription(user_id=user.id, plan_type='premium', monthly_price=20, status='active'),
+        Subscription(user_id=user.id, plan_type='basic', monthly_price=10, status='cancelled')
+    ])
+    db.session.commit()
+    later = _book(user, make_class(title='Shrubs', scheduled_datetime=datetime.utcnow() + timedelta(days=9)))
+    sooner = _book(user, make_class(title='Tonics', scheduled_datetime=datetime.utcnow() + timedelta(days=2)))
+    _book(user, make_class(title='Bitters'), status='cancelled')
+    # Another user's activity doesn't count
+    _book(make_user(), make_class())
+
+    body = _dashboard(client, headers)
+
+    assert body['user']['id'] == user.id
+    assert body['statistics'] == {
+        'favorites_count': 3, 'reviews_count': 1, 'bookings_count': 3, 'active_subscriptions': 1
+    }
+    assert [cocktail['name'] for cocktail in body['recent_favorites']] == ['Garden Spritz', 'Mint Julep', 'Mint Smash']
+    assert [booking['id'] for booking in body['upcoming_classes']] == [sooner.id, later.id]
+    assert body['upcoming_classes'][0]['virtual_class']['title'] == 'Tonics'
+
+
+def test_writes_refresh_the_cached_dashboard(client, make_user, auth_headers, make_cocktail):
+    user = make_user()
+    headers = auth_headers(user)
+    cocktail = make_cocktail(name='Mint Smash')
+    assert _dashboard(client, headers)['statistics']['favorites_count'] == 0
+
+    _favorite(client, headers, cocktail)
+    body = _dashboard(client, headers)
+    assert body['statistics']['favorites_count'] == 1
+    assert [favorite['name'] for favorite in body['recent_favorites']] == ['Mint Smash']
+
+    cocktail.name = 'Basil Smash'
+    db.session.commit()
+    assert [favorite['name'] for favorite in _dashboard(client, headers)['recent_favorites']] == ['Basil Smash']
+
+    db.session.add(CocktailReview(cocktail_id=cocktail.id, user_id=user.id, rating=4))
+    db.session.commit()
+    assert _dashboard(client, headers)['statistics']['reviews_count'] == 1
+
+
+def test_dashboard_requires_login(client):
+    assert client.get('/api/users/dashboard').status_code == 401
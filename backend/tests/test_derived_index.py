@@ -0,0 +1,49 @@
+from sqlalchemy import insert
+
+from app import db
+from app.models.ingredient import Ingredient
+from app.services import catalog
+
+
+def _insert_from_another_worker():
+    # A Core write bypasses this process's flush hooks, like a write made by another worker
+    with db.engine.begin() as conn:
+        conn.execute(insert(Ingredient.__table__).values(name='Yuzu', slug='yuzu', category='fruit'))
+
+
+def _names():
+    return [item['name'] for item in catalog.snapshot().items]
+
+
+def test_local_writes_rebuild_at_once(app, make_ingredient):
+    app.config['DERIVED_INDEX_MAX_AGE'] = 3600
+    make_ingredient(name='Lime')
+    assert _names() == ['Lime']
+
+    make_ingredient(name='Basil')
+
+    assert _names() == ['Basil', 'Lime']
+
+
+def test_unshared_versions_expire_after_max_age(app, make_ingredient):
+    make_ingredient(name='Lime')
+
+    app.config['DERIVED_INDEX_MAX_AGE'] = 3600
+    assert _names() == ['Lime']
+    _insert_from_another_worker()
+    assert _names() == ['Lime']
+
+    app.config['DERIVED_INDEX_MAX_AGE'] = 0
+    assert _names() == ['Lime', 'Yuzu']
+
+
+def test_shared_versions_have_no_max_age(app, make_ingredient, monkeypatch):
+    monkeypatch.setattr(app.extensions['response_cache'], 'shares_versions', lambda: True)
+    app.config['DERIVED_INDEX_MAX_AGE'] = 0
+    make_ingredient(name='Lime')
+    assert _names() == ['Lime']
+
+    _insert_from_another_worker()
+
+    # Another worker's commit would have bumped the shared version
+    assert _names() == ['Lime']
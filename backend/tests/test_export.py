@@ -0,0 +1,17 @@
+import pytest
+
+from app.utils.export import _cell
+
+
+@pytest.mark.parametrize('value', [
+    '+33 6 12 34 56 78', '+1 (555) 123-4567', '+44.20.7946.0958', '-12.5', '+3', '-1e3', 'Lime', ''
+])
+def test_numbers_and_phone_numbers_are_kept(value):
+    assert _cell(value) == value
+
+
+@pytest.mark.parametrize('value', [
+    '=SUM(A1:A2)', '+SUM(A1)', '-2+A1', '@cmd', '+1 555 CALL NOW', '\t=1', '+33 6 12 34 56 78=A1'
+])
+def test_formulas_are_neutralized(value):
+    assert _cell(value) == "'" + value
@@ -0,0 +1,48 @@
+from app import db
+
+
+def _facets(client, **filters):
+    response = client.get('/api/cocktails/facets', query_string=filters)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def test_counts_per_facet_value(client, make_cocktail):
+    make_cocktail(wellness_category='detox', difficulty_level='easy', dietary_tags=['Vegan', 'Low Sugar'])
+    make_cocktail(wellness_category='detox', difficulty_level='hard', is_premium=True, dietary_tags=['Vegan'])
+    make_cocktail(wellness_category='energy', difficulty_level='easy')
+    make_cocktail(wellness_category='energy', is_active=False, dietary_tags=['Vegan'])
+
+    assert _facets(client) == {
+        'total': 3,
+        'facets': {
+            'category': {'detox': 2, 'energy': 1},
+            'difficulty': {'easy': 2, 'hard': 1},
+            'premium': {'premium': 1, 'standard': 2},
+            'dietary_tags': {'vegan': 2, 'low-sugar': 1}
+        }
+    }
+
+
+def test_counts_follow_the_catalog_filters(client, make_cocktail):
+    make_cocktail(wellness_category='detox', difficulty_level='easy', dietary_tags=['Vegan'])
+    make_cocktail(wellness_category='detox', difficulty_level='hard')
+    make_cocktail(wellness_category='energy', difficulty_level='easy', dietary_tags=['Vegan'])
+
+    body = _facets(client, category='detox')
+    assert body['total'] == 2
+    assert body['facets']['difficulty'] == {'easy': 1, 'hard': 1}
+    assert body['facets']['dietary_tags'] == {'vegan': 1}
+
+    body = _facets(client, dietary_tags='vegan')
+    assert body['total'] == 2
+    assert body['facets']['category'] == {'detox': 1, 'energy': 1}
+
+
+def test_counts_reflect_later_writes(client, make_cocktail):
+    cocktail = make_cocktail(wellness_category='detox')
+    assert _facets(client)['facets']['category'] == {'detox': 1}
+
+    cocktail.wellness_category = 'energy'
+    db.session.commit()
+    assert _facets(client)['facets']['category'] == {'energy': 1}
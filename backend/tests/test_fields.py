@@ -0,0 +1,62 @@
+def test_cocktail_list_projects_fields(client, make_cocktail):
+    make_cocktail(name='Green Glow')
+
+    response = client.get('/api/cocktails/', query_string={'fields': 'id,name'})
+
+    assert response.status_code == 200
+    assert [set(cocktail) for cocktail in response.get_json()['cocktails']] == [{'id', 'name'}]
+
+
+def test_cocktail_detail_projects_fields(client, make_cocktail):
+    cocktail = make_cocktail(name='Green Glow')
+
+    body = client.get(f'/api/cocktails/{cocktail.id}', query_string={'fields': 'name,slug'}).get_json()
+
+    assert body == {'name': 'Green Glow', 'slug': cocktail.slug}
+
+
+def test_cocktail_detail_includes_ingredients(client, make_cocktail, make_ingredient, add_recipe_line):
+    cocktail = make_cocktail()
+    add_recipe_line(cocktail, make_ingredient(name='Lime'), quantity=0.5)
+    add_recipe_line(cocktail, make_ingredient(name='Mint'), quantity=6, unit='leaves', order_index=1)
+
+    full = client.get(f'/api/cocktails/{cocktail.id}').get_json()
+    projected = client.get(f'/api/cocktails/{cocktail.id}', query_string={'fields': 'id,ingredients'}).get_json()
+
+    assert [line['ingredient']['name'] for line in full['ingredients']] == ['Lime', 'Mint']
+    assert set(projected) == {'id', 'ingredients'}
+    assert projected['ingredients'] == full['ingredients']
+
+
+def test_cocktail_detail_missing_is_404(client):
+    assert client.get('/api/cocktails/999').status_code == 404
+
+
+def test_featured_cocktails_project_fields(client, make_cocktail):
+    make_cocktail(name='Featured', is_featured=True)
+    make_cocktail(name='Regular')
+
+    response = client.get('/api/cocktails/featured', query_string={'fields': 'name'})
+
+    assert response.status_code == 200
+    assert response.get_json() == [{'name': 'Featured'}]
+
+
+def test_class_list_projects_fields(client, make_class):
+    make_class(title='Citrus Basics')
+
+    body = client.get('/api/classes/', query_string={'fields': 'title,current_participants'}).get_json()
+
+    assert body['classes'] == [{'title': 'Citrus Basics', 'current_participants': 0}]
+
+
+def test_ingredient_list_projects_fields(client, make_ingredient):
+    make_ingredient(name='Basil')
+
+    body = client.get('/api/ingredients/', query_string={'fields': 'name'}).get_json()
+
+    assert body['ingredients'] == [{'name': 'Basil'}]
+
+
+def test_unknown_field_is_rejected(client):
+    assert client.get('/api/cocktails/', query_string={'fields': 'name,secret'}).status_code == 400
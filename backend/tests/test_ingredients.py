@@ -0,0 +1,43 @@
+def _names(response):
+    assert response.status_code == 200, response.get_json()
+    return [ingredient['name'] for ingredient in response.get_json()['ingredients']]
+
+
+def test_nutrient_range_filter(client, make_ingredient):
+    make_ingredient(name='Orange', vitamins={'Vitamin C': 53})
+    make_ingredient(name='Kiwi', vitamins={'vitamin_c': 93})
+    make_ingredient(name='Banana', vitamins={'vitamin_c': 9})
+    make_ingredient(name='Water')
+
+    response = client.get('/api/ingredients/', query_string={'nutrient': 'vitamin_c>40'})
+
+    assert _names(response) == ['Kiwi', 'Orange']
+    assert response.get_json()['pagination']['total'] == 2
+
+
+def test_nutrient_ranges_combine(client, make_ingredient):
+    make_ingredient(name='Lime', sugar_g=1.7, fiber_g=2.8)
+    make_ingredient(name='Mango', sugar_g=14.0, fiber_g=1.6)
+    make_ingredient(name='Raspberry', sugar_g=4.4, fiber_g=6.5)
+
+    response = client.get('/api/ingredients/', query_string={'nutrient': 'sugar_g<5,fiber_g>=2.8'})
+
+    assert _names(response) == ['Lime', 'Raspberry']
+
+
+def test_invalid_nutrient_filter_is_rejected(client):
+    assert client.get('/api/ingredients/', query_string={'nutrient': 'sugar_g~5'}).status_code == 400
+
+
+def test_sort_by_nutrient(client, make_ingredient):
+    make_ingredient(name='Mango', sugar_g=14.0)
+    make_ingredient(name='Lime', sugar_g=1.7)
+    make_ingredient(name='Mint')
+    make_ingredient(name='Raspberry', sugar_g=4.4)
+
+    ascending = _names(client.get('/api/ingredients/', query_string={'sort': 'sugar_g'}))
+    descending = _names(client.get('/api/ingredients/', query_string={'sort': '-sugar_g'}))
+
+    # Ingredients without a value come last either way
+    assert ascending == ['Lime', 'Raspberry', 'Mango', 'Mint']
+    assert descending == ['Mango', 'Raspberry', 'Lime', 'Mint']
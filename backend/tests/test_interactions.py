@@ -0,0 +1,79 @@
+import pytest
+
+from app import db
+from app.models.ingredient import IngredientInteraction
+
+
+@pytest.fixture
+def pairings(make_ingredient):
+    """Ingredients keyed by name, with lime pairing well and clashing with milk"""
+    ingredients = {name: make_ingredient(name=name) for name in ('Lime', 'Mint', 'Ginger', 'Milk', 'Honey')}
+    for first, second, interaction_type, score in [
+        ('Lime', 'Mint', 'synergy', 9),
+        ('Lime', 'Ginger', 'complement', None),
+        ('Mint', 'Honey', 'complement', 5),
+        ('Ginger', 'Honey', 'synergy', 7),
+        ('Lime', 'Milk', 'avoid', 10),
+    ]:
+        db.session.add(IngredientInteraction(
+            ingredient1_id=ingredients[first].id, ingredient2_id=ingredients[second].id,
+            interaction_type=interaction_type, compatibility_score=score
+        ))
+    db.session.commit()
+    return ingredients
+
+
+def _get(client, path, ingredients, **args):
+    ids = ','.join(str(ingredient.id) for ingredient in ingredients)
+    response = client.get(f'/api/ingredients/{path}', query_string=dict(args, ids=ids))
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def test_compatibility_scores_known_pairs(client, pairings):
+    body = _get(client, 'compatibility', [pairings['Lime'], pairings['Mint'], pairings['Ginger']])
+
+    assert [(pair['interaction_type'], pair['compatibility_score']) for pair in body['pairs']] == [
+        ('synergy', 9), ('complement', 6)
+    ]
+    # Lime-Ginger has no score, so a complement's default applies
+    assert body['score'] == 7.5
+    assert body['coverage'] == pytest.approx(2 / 3, abs=0.001)
+    assert body['is_compatible'] and body['conflicts'] == []
+    assert sorted(ingredient['name'] for ingredient in body['ingredients']) == ['Ginger', 'Lime', 'Mint']
+
+
+def test_avoid_pairs_are_conflicts(client, pairings):
+    body = _get(client, 'compatibility', [pairings['Lime'], pairings['Mint'], pairings['Milk']])
+
+    assert not body['is_compatible']
+    assert [(conflict['ingredient1_id'], conflict['ingredient2_id']) for conflict in body['conflicts']] == [
+        tuple(sorted((pairings['Lime'].id, pairings['Milk'].id)))
+    ]
+    assert body['score'] == -0.5
+
+
+def test_suggestions_skip_conflicts_and_chosen_ingredients(client, pairings):
+    body = _get(client, 'suggest-next', [pairings['Lime']])
+
+    assert [(item['name'], item['compatibility_score']) for item in body] == [('Mint', 9.0), ('Ginger', 6.0)]
+
+    body = _get(client, 'suggest-next', [pairings['Mint'], pairings['Ginger']])
+    assert [(item['name'], item['compatibility_score'], item['interaction_count']) for item in body] == [
+        ('Lime', 15.0, 2), ('Honey', 12.0, 2)
+    ]
+
+
+def test_inactive_ingredients_drop_out_of_the_graph(client, pairings):
+    pairings['Mint'].is_active = False
+    db.session.commit()
+
+    body = _get(client, 'suggest-next', [pairings['Lime']])
+
+    assert [item['name'] for item in body] == ['Ginger']
+
+
+def test_compatibility_needs_two_ingredients(client, pairings):
+    response = client.get('/api/ingredients/compatibility', query_string={'ids': str(pairings['Lime'].id)})
+
+    assert response.status_code == 400
@@ -0,0 +1,188 @@
+import json
+
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from flask_migrate import upgrade
+from sqlalchemy import text
+
+from app import create_app, db
+from config import TestingConfig
+
+BASELINE = 'dbcd53bf4a47'
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    # No create_all here: the migrations build the schema, as on a deployed database
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f'sqlite:///{tmp_path}/migrated.db')
+    app = create_app('testing')
+    with app.app_context():
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+def _insert(table, **row):
+    row = {key: json.dumps(value) if isinstance(value, (list, dict)) else value for key, value in row.items()}
+    result = db.session.execute(
+        text(f"INSERT INTO {table} ({', '.join(row)}) VALUES ({', '.join(':' + key for key in row)})"),
+        row
+    )
+    db.session.commit()
+    return result.lastrowid
+
+
+def _insert_cocktail(name, **values):
+    row = {
+        'name': name, 'slug': name.lower().replace(' ', '-'), 'description': name, 'instructions': 'Stir',
+        'calories_per_serving': 100, 'servings': 1, 'prep_time_minutes': 5, 'is_active': True
+    }
+    return _insert('cocktails', **dict(row, **values))
+
+
+def _insert_ingredient(name, **values):
+    return _insert('ingredients', name=name, slug=name.lower().replace(' ', '-'), category='fruit', **values)
+
+
+def _insert_line(cocktail_id, ingredient_id, **values):
+    return _insert(
+        'cocktail_ingredients', cocktail_id=cocktail_id, ingredient_id=ingredient_id,
+        quantity=values.pop('quantity', 1.0), unit=values.pop('unit', 'oz'), **values
+    )
+
+
+def _insert_user(name):
+    return _insert(
+        'users', email=f'{name}@example.com', username=name, password_hash='x',
+        first_name=name, last_name='Test'
+    )
+
+
+def test_upgrade_matches_models(app):
+    upgrade()
+
+    with db.engine.connect() as conn:
+        context = MigrationContext.configure(conn, opts={'compare_server_default': True})
+        assert compare_metadata(context, db.metadata) == []
+
+
+def test_upgrade_backfills_cocktail_tags(app):
+    upgrade(revision=BASELINE)
+    garden = _insert_cocktail('Garden Spritz', dietary_tags=['Vegan', 'Low Sugar'], flavor_profile=['Herbal'])
+    _insert_cocktail('Plain Tonic')
+
+    upgrade(revision='cc88be503fa6')
+
+    tagged = db.session.execute(text(
+        'SELECT ct.cocktail_id, t.kind, t.slug FROM cocktail_tags ct JOIN tags t ON t.id = ct.tag_id'
+    )).all()
+    assert sorted(tagged) == [
+        (garden, 'dietary', 'low-sugar'),
+        (garden, 'dietary', 'vegan'),
+        (garden, 'flavor', 'herbal'),
+    ]
+
+
+def test_upgrade_computes_season_masks(app):
+    upgrade(revision=BASELINE)
+    strawberry = _insert_ingredient('Strawberry', peak_season_months=[5, 6, 7])
+    mint = _insert_ingredient('Mint', peak_season_months=[6, 7, 8])
+    lime = _insert_ingredient('Lime')
+    smash = _insert_cocktail('Summer Smash')
+    _insert_line(smash, strawberry)
+    _insert_line(smash, mint)
+    _insert_line(smash, lime)
+    plain = _insert_cocktail('Plain Tonic')
+
+    upgrade(revision='ae6589a2834a')
+
+    ingredient_masks = dict(db.session.execute(text('SELECT id, season_mask FROM ingredients')).all())
+    cocktail_masks = dict(db.session.execute(text('SELECT id, season_mask FROM cocktails')).all())
+    assert ingredient_masks == {strawberry: 0b1110000, mint: 0b11100000, lime: 4095}
+    assert cocktail_masks == {smash: 0b1100000, plain: 4095}
+
+
+def test_upgrade_computes_rating_aggregates(app):
+    upgrade(revision=BASELINE)
+    smash = _insert_cocktail('Summer Smash')
+    plain = _insert_cocktail('Plain Tonic')
+    for name, rating, approved in [('ana', 5, True), ('ben', 2, True), ('cy', 1, False)]:
+        _insert('cocktail_reviews', cocktail_id=smash, user_id=_insert_user(name), rating=rating, is_approved=approved)
+
+    upgrade(revision='a0630dc64cff')
+
+    rows = {row.id: row for row in db.session.execute(text(
+        'SELECT id, rating_count, rating_sum, average_rating, rating_1_count, rating_2_count, rating_5_count '
+        'FROM cocktails'
+    ))}
+    assert tuple(rows[smash])[1:] == (2, 7, 3.5, 0, 1, 1)
+    assert tuple(rows[plain])[1:] == (0, 0, 0.0, 0, 0, 0)
+
+
+def test_upgrade_computes_cocktail_nutrition(app):
+    upgrade(revision=BASELINE)
+    lime = _insert_ingredient('Lime', calories_per_100g=30, sugar_g=1.7, vitamins={'Vitamin C': 29})
+    mint = _insert_ingredient('Mint', calories_per_100g=70)
+    smash = _insert_cocktail('Summer Smash', servings=2)
+    _insert_line(smash, lime, quantity=200, unit='g')
+    _insert_line(smash, mint, quantity=3, unit='leaves')
+
+    upgrade(revision='c2cfddef5da3')
+
+    row = db.session.execute(text(
+        'SELECT nutrition_calories, nutrition_sugar_g, nutrition_micronutrients, nutrition_complete, '
+        'nutrition_computed_at FROM cocktails'
+    )).one()
+    assert row.nutrition_calories == 30
+    assert row.nutrition_sugar_g == 1.7
+    assert json.loads(row.nutrition_micronutrients) == {'vitamin_c': 29.0}
+    # Mint is measured in leaves, which have no weight
+    assert not row.nutrition_complete
+    assert row.nutrition_computed_at is not None
+
+
+def test_upgrade_counts_confirmed_bookings(app):
+    upgrade(revision=BASELINE)
+    class_id = _insert(
+        'virtual_classes', title='Shrubs', description='Shrubs', instructor_name='Ana',
+        scheduled_datetime='2026-11-01 18:00:00.000000', duration_minutes=60, max_participants=10
+    )
+    for n, status in enumerate(['confirmed', 'confirmed', 'cancelled', 'pending']):
+        _insert(
+            'class_bookings', user_id=_insert_user(f'guest{n}'), virtual_class_id=class_id,
+            status=status, booking_reference=f'REF{n}'
+        )
+
+    upgrade(revision='0fb3a0aea84a')
+
+    assert db.session.execute(text('SELECT confirmed_count FROM virtual_classes')).scalar() == 2
+
+
+def test_upgrade_counts_favorites(app):
+    upgrade(revision=BASELINE)
+    smash = _insert_cocktail('Summer Smash')
+    plain = _insert_cocktail('Plain Tonic')
+    for name in ['ana', 'ben']:
+        _insert('user_favorite_cocktails', user_id=_insert_user(name), cocktail_id=smash)
+
+    upgrade(revision='3a6cccc33fb5')
+
+    counts = dict(db.session.execute(text('SELECT id, favorite_count FROM cocktails')).all())
+    assert counts == {smash: 2, plain: 0}
+
+
+def test_upgrade_computes_similarities(app):
+    upgrade(revision=BASELINE)
+    lime = _insert_ingredient('Lime')
+    mint = _insert_ingredient('Mint')
+    smash = _insert_cocktail('Summer Smash', flavor_profile=['Citrus'])
+    mojito = _insert_cocktail('Virgin Mojito', flavor_profile=['Citrus'])
+    for cocktail_id in (smash, mojito):
+        _insert_line(cocktail_id, lime)
+        _insert_line(cocktail_id, mint)
+
+    upgrade(revision='6bc624ad8944')
+
+    pairs = db.session.execute(text('SELECT cocktail_id, rank, similar_id FROM cocktail_similarities')).all()
+    assert sorted(pairs) == sorted([(smash, 1, mojito), (mojito, 1, smash)])
@@ -0,0 +1,42 @@
+def _nutrition(client, cocktail):
+    response = client.get(f'/api/cocktails/{cocktail.id}', query_string={'fields': 'nutrition'})
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()['nutrition']
+
+
+def test_per_serving_totals(client, make_cocktail, make_ingredient, add_recipe_line):
+    cocktail = make_cocktail(servings=2)
+    add_recipe_line(cocktail, make_ingredient(sugar_g=10.0, calories_per_100g=40), quantity=100, unit='ml')
+    add_recipe_line(cocktail, make_ingredient(sugar_g=5.0), quantity=2, unit='cl')
+
+    nutrition = _nutrition(client, cocktail)
+
+    assert nutrition['sugar_g'] == 5.5
+    assert nutrition['calories'] == 20
+    assert nutrition['is_complete'] is True
+
+
+def test_micronutrient_spellings_are_merged(client, make_cocktail, make_ingredient, add_recipe_line):
+    cocktail = make_cocktail()
+    add_recipe_line(cocktail, make_ingredient(vitamins={'Vitamin C': 50}), quantity=100, unit='g')
+    add_recipe_line(cocktail, make_ingredient(vitamins={'vitamin_c': 10}, minerals={'Potassium ': 200}),
+                    quantity=100, unit='g')
+
+    assert _nutrition(client, cocktail)['micronutrients'] == {'vitamin_c': 60.0, 'potassium': 200.0}
+
+
+def test_unparseable_amount_marks_nutrition_incomplete(client, make_cocktail, make_ingredient, add_recipe_line):
+    cocktail = make_cocktail()
+    add_recipe_line(cocktail, make_ingredient(vitamins={'vitamin_c': 'lots'}, sugar_g=4.0), quantity=100, unit='g')
+
+    nutrition = _nutrition(client, cocktail)
+
+    assert nutrition['is_complete'] is False
+    assert nutrition['sugar_g'] == 4.0
+
+
+def test_unconvertible_unit_marks_nutrition_incomplete(client, make_cocktail, make_ingredient, add_recipe_line):
+    cocktail = make_cocktail()
+    add_recipe_line(cocktail, make_ingredient(sugar_g=1.0), quantity=6, unit='leaves')
+
+    assert _nutrition(client, cocktail)['is_complete'] is False
@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.models.cocktail import CocktailReview
+
+
+def _walk(client, url, key, per_page=2):
+    """Follow next_cursor from the first page to the last; the ids of every page"""
+    pages = []
+    cursor = ''
+    while cursor is not None:
+        response = client.get(url, query_string={'cursor': cursor, 'per_page': per_page})
+        assert response.status_code == 200, response.get_json()
+        body = response.get_json()
+        assert set(body) >= {key, 'pagination'}
+        pages.append([item['id'] for item in body[key]])
+        cursor = body['pagination']['next_cursor']
+        assert body['pagination']['has_next'] == (cursor is not None)
+    return pages
+
+
+def test_cocktail_list_follows_next_cursor(client, make_cocktail):
+    cocktails = [make_cocktail() for _ in range(5)]
+
+    pages = _walk(client, '/api/cocktails/', 'cocktails')
+
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert sorted(sum(pages, [])) == sorted(cocktail.id for cocktail in cocktails)
+
+
+@pytest.mark.parametrize('per_page', [0, -5])
+def test_cursor_pages_hold_at_least_one_row(client, make_cocktail, per_page):
+    for _ in range(3):
+        make_cocktail()
+
+    response = client.get('/api/cocktails/', query_string={'cursor': '', 'per_page': per_page})
+
+    assert response.status_code == 200, response.get_json()
+    body = response.get_json()
+    assert len(body['cocktails']) == 1
+    assert body['pagination']['per_page'] == 1
+    assert body['pagination']['has_next'] is True
+
+
+def test_cocktail_list_page_mode_returns_envelope(client, make_cocktail):
+    make_cocktail(name='Sunrise Tonic')
+
+    body = client.get('/api/cocktails/').get_json()
+
+    assert body['cocktails'][0]['name'] == 'Sunrise Tonic'
+    assert body['pagination']['total'] == 1
+
+
+def test_cocktail_reviews_follow_next_cursor(client, make_cocktail, make_user):
+    cocktail = make_cocktail()
+    now = datetime.utcnow()
+    for i in range(5):
+        db.session.add(CocktailReview(
+            cocktail_id=cocktail.id, user_id=make_user().id, rating=4, is_approved=True,
+            created_at=now - timedelta(minutes=i)
+        ))
+    db.session.commit()
+
+    pages = _walk(client, f'/api/cocktails/{cocktail.id}/reviews', 'reviews')
+
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert len(set(sum(pages, []))) == 5
+
+
+def test_ingredient_list_follows_next_cursor(client, make_ingredient):
+    ingredients = [make_ingredient(name=name) for name in ('Basil', 'Lime', 'Mint', 'Ginger', 'Apple')]
+
+    pages = _walk(client, '/api/ingredients/', 'ingredients')
+
+    by_name = sorted(ingredients, key=lambda ingredient: ingredient.name)
+    assert sum(pages, []) == [ingredient.id for ingredient in by_name]
+    assert [len(page) for page in pages] == [2, 2, 1]
+
+
+def test_class_list_follows_next_cursor(client, make_class):
+    classes = [make_class() for _ in range(3)]
+
+    pages = _walk(client, '/api/classes/', 'classes')
+
+    assert sum(pages, []) == [virtual_class.id for virtual_class in classes]
+
+
+@pytest.mark.parametrize('url', ['/api/cocktails/', '/api/ingredients/', '/api/classes/'])
+def test_malformed_cursor_is_rejected(client, url):
+    assert client.get(url, query_string={'cursor': 'not-a-cursor'}).status_code == 400
+
+
+def test_ingredient_cursor_pages_follow_python_name_order(client, make_ingredient):
+    # Collations such as en_US order these differently from Python's comparison the cursor relies on
+    names = ('cherry', 'apple', 'Éclair', 'Banana', 'banana', 'Zest')
+    ingredients = [make_ingredient(name=name) for name in names]
+
+    pages = _walk(client, '/api/ingredients/', 'ingredients')
+
+    by_name = sorted(ingredients, key=lambda ingredient: (ingredient.name, ingredient.id))
+    assert sum(pages, []) == [ingredient.id for ingredient in by_name]
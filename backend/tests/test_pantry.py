@@ -0,0 +1,79 @@
+import pytest
+
+from app import db
+
+
+@pytest.fixture
+def bar(make_cocktail, make_ingredient, add_recipe_line):
+    """A small catalog: ``(cocktails, ingredients)`` keyed by name"""
+    ingredients = {name: make_ingredient(name=name) for name in ('Lime', 'Mint', 'Soda', 'Ginger', 'Honey')}
+    cocktails = {}
+    for name, rating, recipe in [
+        ('Mint Soda', 4.0, ['Mint', 'Soda']),
+        ('Lime Soda', 4.5, ['Lime', 'Soda']),
+        ('Ginger Mule', 3.0, ['Ginger', 'Lime', 'Soda']),
+        ('Honey Ginger', 5.0, ['Ginger', 'Honey', 'Lime']),
+    ]:
+        cocktail = cocktails[name] = make_cocktail(name=name, average_rating=rating)
+        for ingredient in recipe:
+            add_recipe_line(cocktail, ingredients[ingredient])
+    return cocktails, ingredients
+
+
+def _makeable(client, ingredients, **args):
+    ids = ','.join(str(ingredient.id) for ingredient in ingredients)
+    response = client.get('/api/cocktails/makeable', query_string=dict(args, ingredients=ids))
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def test_exact_matches_best_rated_first(client, bar):
+    _, ingredients = bar
+
+    body = _makeable(client, [ingredients['Lime'], ingredients['Mint'], ingredients['Soda']], max_missing=0)
+
+    assert [cocktail['name'] for cocktail in body['cocktails']] == ['Lime Soda', 'Mint Soda']
+    assert body['counts'] == {'0': 2}
+    assert body['total'] == 2
+
+
+def test_near_matches_name_what_is_missing(client, bar):
+    _, ingredients = bar
+
+    body = _makeable(client, [ingredients['Lime'], ingredients['Soda']], max_missing=1)
+
+    assert [(cocktail['name'], cocktail['missing_count']) for cocktail in body['cocktails']] == [
+        ('Lime Soda', 0), ('Mint Soda', 1), ('Ginger Mule', 1)
+    ]
+    assert body['cocktails'][2]['missing_ingredients'] == [
+        {'id': ingredients['Ginger'].id, 'name': 'Ginger', 'slug': ingredients['Ginger'].slug}
+    ]
+    assert body['counts'] == {'0': 1, '1': 2}
+
+
+def test_optional_and_garnish_lines_are_not_required(client, bar, make_ingredient, add_recipe_line):
+    cocktails, ingredients = bar
+    add_recipe_line(cocktails['Lime Soda'], make_ingredient(name='Salt'), is_optional=True)
+    add_recipe_line(cocktails['Lime Soda'], make_ingredient(name='Lime Wheel'), is_garnish=True)
+
+    body = _makeable(client, [ingredients['Lime'], ingredients['Soda']], max_missing=0)
+
+    assert [cocktail['name'] for cocktail in body['cocktails']] == ['Lime Soda']
+
+
+def test_recipe_changes_rebuild_the_index(client, bar):
+    cocktails, ingredients = bar
+    pantry = [ingredients['Mint'], ingredients['Soda']]
+    assert [cocktail['name'] for cocktail in _makeable(client, pantry, max_missing=0)['cocktails']] == ['Mint Soda']
+
+    cocktails['Mint Soda'].is_active = False
+    db.session.commit()
+
+    assert _makeable(client, pantry, max_missing=0)['cocktails'] == []
+
+
+@pytest.mark.parametrize('ingredients', ['', 'lime'])
+def test_ingredient_ids_are_required(client, ingredients):
+    response = client.get('/api/cocktails/makeable', query_string={'ingredients': ingredients})
+
+    assert response.status_code == 400
@@ -0,0 +1,55 @@
+import pytest
+from werkzeug.security import generate_password_hash
+
+from app.services.passwords import PasswordHasher, spelled_method
+
+
+class _App:
+    def __init__(self, **config):
+        self.config = dict({'PASSWORD_POOL_SIZE': 0}, **config)
+
+
+@pytest.mark.parametrize('method', ['pbkdf2:sha256', 'pbkdf2:sha256:1000', 'pbkdf2'])
+def test_fresh_hashes_need_no_rehash(method):
+    hasher = PasswordHasher(_App(PASSWORD_HASH_METHOD=method))
+
+    assert not hasher.needs_rehash(hasher.hash('secret'))
+
+
+def test_default_spelling_matches_the_explicit_one():
+    hasher = PasswordHasher(_App(PASSWORD_HASH_METHOD='pbkdf2:sha256'))
+    explicit = PasswordHasher(_App(PASSWORD_HASH_METHOD=hasher.stored_method))
+
+    assert not hasher.needs_rehash(explicit.hash('secret'))
+
+
+@pytest.mark.parametrize('method', [
+    'pbkdf2', 'pbkdf2:sha256', 'pbkdf2:sha512', 'pbkdf2:sha256:1000', 'scrypt', 'scrypt:1024:8:1'
+])
+def test_spelled_method_matches_what_werkzeug_stores(method):
+    assert spelled_method(method) == generate_password_hash('', method).partition('$')[0]
+
+
+@pytest.mark.parametrize('method, salt_length', [('pbkdf2:sha256:1000', 8), ('pbkdf2:sha256:2000', 16)])
+def test_other_parameters_need_rehash(method, salt_length):
+    hasher = PasswordHasher(_App(PASSWORD_HASH_METHOD='pbkdf2:sha256:1000'))
+
+    assert hasher.needs_rehash(generate_password_hash('secret', method, salt_length))
+    assert hasher.needs_rehash(None)
+
+
+def test_login_rehashes_only_outdated_hashes(app, client, make_user):
+    from app import db
+
+    user = make_user(email='old@example.com', password='secret')
+    user.password_hash = generate_password_hash('secret', 'pbkdf2:sha256:500', 8)
+    db.session.commit()
+
+    assert client.post('/api/auth/login', json={'email': 'old@example.com', 'password': 'secret'}).status_code == 200
+    db.session.refresh(user)
+    upgraded = user.password_hash
+    assert upgraded.startswith(app.config['PASSWORD_HASH_METHOD'] + '$')
+
+    assert client.post('/api/auth/login', json={'email': 'old@example.com', 'password': 'secret'}).status_code == 200
+    db.session.refresh(user)
+    assert user.password_hash == upgraded
@@ -0,0 +1,69 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from app import db
+from app.models.cocktail import Cocktail
+
+
+@contextmanager
+def count_statements():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+
+@pytest.fixture
+def add_lines(make_ingredient, add_recipe_line):
+    def add_lines(cocktail_id, n):
+        cocktail = db.session.get(Cocktail, cocktail_id)
+        for i in range(n):
+            add_recipe_line(cocktail, make_ingredient(), order_index=i)
+    return add_lines
+
+
+def _detail_statements(client, cocktail_id):
+    db.session.expunge_all()
+    with count_statements() as statements:
+        response = client.get(f'/api/cocktails/{cocktail_id}')
+    assert response.status_code == 200
+    return len(statements), len(response.get_json()['ingredients'])
+
+
+def _list_statements():
+    db.session.expunge_all()
+    with count_statements() as statements:
+        data = [cocktail.to_dict(include_ingredients=True) for cocktail in Cocktail.query_with_recipe().all()]
+    return len(statements), sum(len(cocktail['ingredients']) for cocktail in data)
+
+
+def test_detail_statements_do_not_grow_with_the_recipe(client, make_cocktail, add_lines):
+    cocktail_id = make_cocktail().id
+    add_lines(cocktail_id, 1)
+    baseline, lines = _detail_statements(client, cocktail_id)
+    assert lines == 1
+
+    add_lines(cocktail_id, 7)
+
+    assert _detail_statements(client, cocktail_id) == (baseline, 8)
+
+
+def test_list_statements_do_not_grow_with_recipes(app, make_cocktail, add_lines):
+    first_id = make_cocktail().id
+    add_lines(first_id, 1)
+    baseline, lines = _list_statements()
+    assert (baseline, lines) == (2, 1)
+
+    add_lines(first_id, 4)
+    for _ in range(3):
+        add_lines(make_cocktail().id, 3)
+
+    assert _list_statements() == (baseline, 14)
@@ -0,0 +1,74 @@
+import pytest
+
+from app import db
+from app.models.cocktail import CocktailReview
+
+
+@pytest.fixture
+def rate(make_user):
+    def rate(cocktail, *ratings, approved=True):
+        for rating in ratings:
+            db.session.add(CocktailReview(
+                cocktail_id=cocktail.id, user_id=make_user().id, rating=rating, is_approved=approved
+            ))
+        db.session.commit()
+    return rate
+
+
+def _names(response):
+    assert response.status_code == 200, response.get_json()
+    return [cocktail['name'] for cocktail in response.get_json()['cocktails']]
+
+
+def test_list_reports_rating_aggregates(client, make_cocktail, rate):
+    cocktail = make_cocktail()
+    rate(cocktail, 5, 4)
+    rate(cocktail, 1, approved=False)
+
+    body = client.get('/api/cocktails/').get_json()
+
+    assert body['cocktails'][0]['average_rating'] == 4.5
+    assert body['cocktails'][0]['rating_count'] == 2
+
+
+def test_sort_by_rating(client, make_cocktail, rate):
+    rate(make_cocktail(name='Fine'), 3, 4)
+    rate(make_cocktail(name='Best'), 5, 5)
+    rate(make_cocktail(name='Good'), 4, 5)
+    make_cocktail(name='Unrated')
+
+    assert _names(client.get('/api/cocktails/', query_string={'sort': 'rating'})) == ['Best', 'Good', 'Fine', 'Unrated']
+
+
+def test_sort_by_rating_follows_cursor(client, make_cocktail, rate):
+    for name, rating in (('One', 1), ('Two', 2), ('Three', 3)):
+        rate(make_cocktail(name=name), rating)
+
+    first = client.get('/api/cocktails/', query_string={'sort': 'rating', 'cursor': '', 'per_page': 2}).get_json()
+    rest = client.get('/api/cocktails/', query_string={
+        'sort': 'rating', 'cursor': first['pagination']['next_cursor'], 'per_page': 2
+    }).get_json()
+
+    assert [cocktail['name'] for cocktail in first['cocktails'] + rest['cocktails']] == ['Three', 'Two', 'One']
+    assert rest['pagination']['next_cursor'] is None
+
+
+def test_min_rating_filter(client, make_cocktail, rate):
+    rate(make_cocktail(name='Loved'), 5, 4)
+    rate(make_cocktail(name='Mixed'), 2, 4)
+    make_cocktail(name='Unrated')
+
+    assert _names(client.get('/api/cocktails/', query_string={'min_rating': 3.5})) == ['Loved']
+
+
+def test_reviews_report_histogram(client, make_cocktail, rate):
+    cocktail = make_cocktail()
+    rate(cocktail, 5, 5, 3)
+    rate(cocktail, 1, approved=False)
+
+    body = client.get(f'/api/cocktails/{cocktail.id}/reviews').get_json()
+
+    assert len(body['reviews']) == 3
+    assert body['rating_count'] == 3
+    assert body['average_rating'] == pytest.approx(13 / 3)
+    assert body['rating_histogram'] == {'1': 0, '2': 0, '3': 1, '4': 0, '5': 2}
@@ -0,0 +1,83 @@
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models.virtual_class import ClassBooking
+from app.utils import references
+from app.utils.references import ReferenceExhausted, _is_collision, add_with_reference
+
+COLUMN = ClassBooking.__table__.c.booking_reference
+
+
+class _SQLiteError(Exception):
+    def __init__(self, message, code):
+        super().__init__(message)
+        self.sqlite_errorcode = code
+
+
+class _PostgresError(Exception):
+    def __init__(self, sqlstate, constraint_name):
+        super().__init__(f'duplicate key value violates unique constraint "{constraint_name}"')
+        self.pgcode = sqlstate
+        self.diag = SimpleNamespace(constraint_name=constraint_name)
+
+
+def _error(orig):
+    return IntegrityError('INSERT ...', {}, orig)
+
+
+@pytest.mark.parametrize('orig, expected', [
+    (_SQLiteError('UNIQUE constraint failed: class_bookings.booking_reference', 2067), True),
+    (_SQLiteError('UNIQUE constraint failed: class_bookings.other_booking_reference', 2067), False),
+    (_SQLiteError('NOT NULL constraint failed: class_bookings.booking_reference', 1299), False),
+    (_PostgresError('23505', 'class_bookings_booking_reference_key'), True),
+    (_PostgresError('23505', 'class_bookings_pkey'), False),
+    (_PostgresError('23502', 'class_bookings_booking_reference_key'), False),
+])
+def test_is_collision(orig, expected):
+    assert _is_collision(_error(orig), COLUMN) is expected
+
+
+@pytest.fixture
+def booking(make_user, make_class):
+    user, virtual_class = make_user(), make_class()
+
+    def booking():
+        return ClassBooking(user_id=user.id, virtual_class_id=virtual_class.id, status='confirmed')
+    return booking
+
+
+def test_collision_is_retried(app, booking, monkeypatch):
+    first = booking()
+    first.booking_reference = 'TAKEN001'
+    db.session.add(first)
+    db.session.commit()
+
+    drawn = iter(['TAKEN001', 'FREE0001'])
+    monkeypatch.setattr(references, 'new_reference', lambda length, prefix: next(drawn))
+
+    second = add_with_reference(booking(), 'booking_reference')
+    db.session.commit()
+
+    assert second.booking_reference == 'FREE0001'
+
+
+def test_exhausted_attempts(app, booking, monkeypatch):
+    first = booking()
+    first.booking_reference = 'TAKEN001'
+    db.session.add(first)
+    db.session.commit()
+    monkeypatch.setattr(references, 'new_reference', lambda length, prefix: 'TAKEN001')
+
+    with pytest.raises(ReferenceExhausted):
+        add_with_reference(booking(), 'booking_reference', attempts=3)
+
+
+def test_other_integrity_errors_propagate(app, booking):
+    orphan = booking()
+    orphan.user_id = None
+
+    with pytest.raises(IntegrityError):
+        add_with_reference(orphan, 'booking_reference')
@@ -0,0 +1,68 @@
+import pytest
+
+from app import db
+from app.services import search
+
+
+@pytest.fixture(params=['auto', 'memory'])
+def search_backend(request, app):
+    # 'auto' picks FTS5 on the test database; 'memory' is the fallback index
+    app.config['SEARCH_BACKEND'] = request.param
+    search.init_app(app)
+    return request.param
+
+
+def _search(client, query):
+    response = client.get('/api/cocktails/search', query_string={'q': query})
+    assert response.status_code == 200, response.get_json()
+    return [cocktail['name'] for cocktail in response.get_json()]
+
+
+def test_name_matches_rank_above_other_fields(search_backend, client, make_cocktail):
+    make_cocktail(name='Garden Spritz', description='A mint and cucumber cooler')
+    make_cocktail(name='Mint Smash', description='Crushed and stirred')
+
+    assert _search(client, 'mint') == ['Mint Smash', 'Garden Spritz']
+
+
+def test_ingredients_and_health_benefits_are_searched(search_backend, client, make_cocktail,
+                                                      make_ingredient, add_recipe_line):
+    fizz = make_cocktail(name='Evening Fizz', health_benefits=['Better Sleep'])
+    add_recipe_line(fizz, make_ingredient(name='Chamomile'))
+    make_cocktail(name='Morning Tonic')
+
+    assert _search(client, 'chamomile') == ['Evening Fizz']
+    assert _search(client, 'sleep') == ['Evening Fizz']
+
+
+def test_queries_match_prefixes_without_case_or_accents(search_backend, client, make_cocktail):
+    make_cocktail(name='Açaí Bowl Smoothie')
+
+    assert _search(client, 'ACAI') == ['Açaí Bowl Smoothie']
+    assert _search(client, 'smoo') == ['Açaí Bowl Smoothie']
+    assert _search(client, 'acai tonic') == []
+
+
+def test_writes_are_searchable_once_committed(search_backend, client, make_cocktail):
+    cocktail = make_cocktail(name='Mint Smash', description='Crushed and stirred')
+    assert _search(client, 'mint') == ['Mint Smash']
+
+    cocktail.name = 'Basil Smash'
+    db.session.commit()
+    assert _search(client, 'mint') == []
+    assert _search(client, 'basil') == ['Basil Smash']
+
+    cocktail.is_active = False
+    db.session.commit()
+    assert _search(client, 'basil') == []
+
+
+def test_ingredient_list_filters_by_search(search_backend, client, make_ingredient):
+    make_ingredient(name='Ginger Root', category='root')
+    make_ingredient(name='Lime', category='citrus', health_benefits=['Ginger pairing'])
+    make_ingredient(name='Mint', category='herb')
+
+    response = client.get('/api/ingredients/', query_string={'search': 'ginger'})
+
+    assert response.status_code == 200, response.get_json()
+    assert sorted(item['name'] for item in response.get_json()['ingredients']) == ['Ginger Root', 'Lime']
@@ -0,0 +1,40 @@
+import pytest
+
+
+@pytest.fixture
+def seasonal(make_cocktail, make_ingredient, add_recipe_line):
+    strawberry = make_ingredient(name='Strawberry', peak_season_months=[5, 6, 7])
+    lime = make_ingredient(name='Lime')
+
+    summer = make_cocktail(name='Strawberry Smash')
+    add_recipe_line(summer, strawberry)
+    add_recipe_line(summer, lime)
+
+    everyday = make_cocktail(name='Lime Fizz')
+    add_recipe_line(everyday, lime)
+
+    garnished = make_cocktail(name='Lime Cooler')
+    add_recipe_line(garnished, lime)
+    add_recipe_line(garnished, strawberry, is_optional=True)
+
+
+def _names(client, url, key, **args):
+    response = client.get(url, query_string=args)
+    assert response.status_code == 200, response.get_json()
+    return sorted(item['name'] for item in response.get_json()[key])
+
+
+@pytest.mark.parametrize('month', ['january', 'Jan', '1'])
+def test_cocktails_in_season_out_of_peak(client, seasonal, month):
+    assert _names(client, '/api/cocktails/', 'cocktails', in_season=month) == ['Lime Cooler', 'Lime Fizz']
+
+
+def test_cocktails_in_season_at_peak(client, seasonal):
+    assert _names(client, '/api/cocktails/', 'cocktails', in_season='june') == [
+        'Lime Cooler', 'Lime Fizz', 'Strawberry Smash'
+    ]
+
+
+def test_ingredients_in_season(client, seasonal):
+    assert _names(client, '/api/ingredients/', 'ingredients', in_season='december') == ['Lime']
+    assert _names(client, '/api/ingredients/', 'ingredients', in_season='may') == ['Lime', 'Strawberry']
@@ -0,0 +1,113 @@
+import pytest
+from sqlalchemy import event
+
+from app import db
+from app.models.cocktail import CocktailIngredient, CocktailSimilarity
+from app.services import cache, similarity
+
+
+@pytest.fixture
+def recipes(make_cocktail, make_ingredient, add_recipe_line):
+    lime, mint, ginger = (make_ingredient(name=name) for name in ('Lime', 'Mint', 'Ginger'))
+    mojito = make_cocktail(name='Mojito')
+    add_recipe_line(mojito, lime)
+    add_recipe_line(mojito, mint)
+    smash = make_cocktail(name='Mint Smash')
+    add_recipe_line(smash, mint)
+    mule = make_cocktail(name='Mule')
+    add_recipe_line(mule, ginger)
+    return {'mojito': mojito, 'smash': smash, 'mule': mule, 'lime': lime, 'ginger': ginger}
+
+
+def _similar(client, cocktail):
+    response = client.get(f'/api/cocktails/{cocktail.id}/similar', query_string={'fields': 'name'})
+    assert response.status_code == 200, response.get_json()
+    return [item['name'] for item in response.get_json()]
+
+
+def test_lists_follow_recipe_writes(client, recipes, add_recipe_line):
+    assert _similar(client, recipes['mojito']) == ['Mint Smash']
+    assert _similar(client, recipes['mule']) == []
+
+    add_recipe_line(recipes['mule'], recipes['lime'])
+
+    assert _similar(client, recipes['mule']) == ['Mojito']
+    assert _similar(client, recipes['mojito']) == ['Mint Smash', 'Mule']
+
+
+def test_refresh_runs_after_the_writer_commits(app, recipes):
+    statements = []
+
+    @event.listens_for(db.engine, 'before_cursor_execute')
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    db.session.add(CocktailIngredient(
+        cocktail_id=recipes['mule'].id, ingredient_id=recipes['lime'].id, quantity=1, unit='oz'
+    ))
+    db.session.flush()
+    flushed = len(statements)
+    db.session.commit()
+    event.remove(db.engine, 'before_cursor_execute', record)
+
+    # The flush itself only writes the recipe line's own rows
+    assert not any('cocktail_similarities' in statement for statement in statements[:flushed])
+    assert any('cocktail_similarities' in statement for statement in statements[flushed:])
+
+
+def test_rolled_back_writes_are_not_refreshed(app, client, recipes):
+    db.session.add(CocktailIngredient(
+        cocktail_id=recipes['mule'].id, ingredient_id=recipes['lime'].id, quantity=1, unit='oz'
+    ))
+    db.session.flush()
+    db.session.rollback()
+
+    assert _similar(client, recipes['mule']) == []
+
+
+def test_background_refresh(app, client, recipes, add_recipe_line, monkeypatch):
+    monkeypatch.setattr(app.extensions['similarity'], 'background', True)
+
+    add_recipe_line(recipes['mule'], recipes['lime'])
+
+    assert similarity.wait_for_refresh(timeout=10)
+    assert _similar(client, recipes['mule']) == ['Mojito']
+
+
+def _stored_lists():
+    return sorted(db.session.query(
+        CocktailSimilarity.cocktail_id, CocktailSimilarity.rank, CocktailSimilarity.similar_id
+    ).all())
+
+
+def _feature_reads(write):
+    """Statements reading cocktail features while ``write`` runs"""
+    statements = []
+
+    @event.listens_for(db.engine, 'before_cursor_execute')
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    try:
+        write()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    return [statement for statement in statements if statement.startswith('SELECT cocktails.id, cocktails.flavor_profile')]
+
+
+def test_refresh_only_reads_changed_cocktails(app, recipes, add_recipe_line):
+    reads = _feature_reads(lambda: add_recipe_line(recipes['smash'], recipes['ginger']))
+
+    assert reads and all('IN (' in statement for statement in reads)
+    patched = _stored_lists()
+    similarity.rebuild()
+    assert _stored_lists() == patched
+
+
+def test_refresh_rereads_catalog_after_unseen_writes(app, recipes, add_recipe_line):
+    # What another process's write looks like from here
+    cache.invalidate(similarity.FEATURES_TAG)
+
+    reads = _feature_reads(lambda: add_recipe_line(recipes['smash'], recipes['ginger']))
+
+    assert any('IN (' not in statement for statement in reads)
@@ -0,0 +1,77 @@
+from app import db
+from app.models.cocktail import CocktailReview
+
+
+def _suggest(client, query, **args):
+    response = client.get('/api/suggest', query_string=dict(args, q=query))
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def _names(client, query, suggestion_type='cocktails'):
+    return [item['name'] for item in _suggest(client, query, types=suggestion_type)[suggestion_type]]
+
+
+def test_every_word_is_a_match_point(client, make_cocktail):
+    make_cocktail(name='Virgin Mojito')
+    make_cocktail(name='Café Tonic')
+    make_cocktail(name='Mule')
+
+    assert _names(client, 'moj') == ['Virgin Mojito']
+    assert _names(client, 'CAFE t') == ['Café Tonic']
+    assert _names(client, 'm') == ['Mule', 'Virgin Mojito']
+    assert _names(client, 'zzz') == []
+
+
+def test_inactive_cocktails_are_not_suggested(client, make_cocktail):
+    make_cocktail(name='Mint Smash', is_active=False)
+
+    assert _names(client, 'mint') == []
+
+
+def test_cocktails_rank_by_rating_count(app, client, make_cocktail, make_user):
+    make_cocktail(name='Mint Julep')
+    smash = make_cocktail(name='Mint Smash')
+    assert _names(client, 'mint') == ['Mint Julep', 'Mint Smash']
+
+    db.session.add(CocktailReview(cocktail_id=smash.id, user_id=make_user().id, rating=5, is_approved=True))
+    db.session.commit()
+    assert _names(client, 'mint') == ['Mint Julep', 'Mint Smash']
+
+    # Ratings don't rebuild the partition; it is re-ranked once it is older than this
+    app.config['SUGGEST_RANKING_MAX_AGE'] = 0
+    assert _names(client, 'mint') == ['Mint Smash', 'Mint Julep']
+
+
+def test_ingredients_and_health_benefits(client, make_cocktail, make_ingredient):
+    make_ingredient(name='Ginger Root', category='root', health_benefits=['digestion'])
+    make_cocktail(name='Ginger Fizz', health_benefits=['Digestion', 'Immunity'])
+    make_cocktail(name='Turmeric Tonic', health_benefits=['Immunity'])
+
+    body = _suggest(client, 'gin')
+    assert [item['name'] for item in body['ingredients']] == ['Ginger Root']
+    assert body['ingredients'][0]['category'] == 'root'
+    assert [item['name'] for item in body['cocktails']] == ['Ginger Fizz']
+
+    benefits = _suggest(client, 'i', types='health_benefits')['health_benefits']
+    assert benefits == [{'term': 'Immunity', 'count': 2}]
+    assert _suggest(client, 'dig', types='health_benefits')['health_benefits'] == [
+        {'term': 'Digestion', 'count': 2}
+    ]
+
+
+def test_only_label_writes_rebuild_the_cocktail_partition(app, client, make_cocktail, make_user):
+    cocktail = make_cocktail(name='Virgin Mojito')
+    assert _names(client, 'moj') == ['Virgin Mojito']
+    partition = app.extensions['suggest']['cocktails']
+    built = partition.current()
+
+    db.session.add(CocktailReview(cocktail_id=cocktail.id, user_id=make_user().id, rating=4, is_approved=True))
+    cocktail.calories_per_serving = 90
+    db.session.commit()
+    assert partition.current() is built
+
+    cocktail.name = 'Nojito'
+    db.session.commit()
+    assert _names(client, 'moj') == []
+    assert _names(client, 'noj') == ['Nojito']
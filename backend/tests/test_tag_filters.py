@@ -0,0 +1,39 @@
+import pytest
+
+
+@pytest.fixture
+def tagged(make_cocktail):
+    make_cocktail(name='Detox Green', health_benefits=['Detox', 'Immunity'], flavor_profile=['herbal', 'sour'])
+    make_cocktail(name='Berry Boost', health_benefits=['Immunity'], flavor_profile=['sweet'])
+    make_cocktail(name='Ginger Kick', health_benefits=['Digestion'], flavor_profile=['spicy', 'sour'])
+
+
+def _names(client, **args):
+    response = client.get('/api/cocktails/', query_string=args)
+    assert response.status_code == 200, response.get_json()
+    return sorted(cocktail['name'] for cocktail in response.get_json()['cocktails'])
+
+
+def test_health_benefits_filter(client, tagged):
+    assert _names(client, health_benefits='immunity') == ['Berry Boost', 'Detox Green']
+
+
+def test_flavors_filter(client, tagged):
+    assert _names(client, flavors='Sour') == ['Detox Green', 'Ginger Kick']
+
+
+def test_tag_match_all_is_the_default(client, tagged):
+    assert _names(client, health_benefits=['detox', 'immunity']) == ['Detox Green']
+    assert _names(client, flavors=['sweet', 'sour']) == []
+
+
+def test_tag_match_any(client, tagged):
+    assert _names(client, flavors=['sweet', 'spicy'], tag_match='any') == ['Berry Boost', 'Ginger Kick']
+
+
+def test_unknown_tag_matches_nothing(client, tagged):
+    assert _names(client, health_benefits='hangover') == []
+
+
+def test_tag_filters_combine(client, tagged):
+    assert _names(client, health_benefits='immunity', flavors='sour') == ['Detox Green']